@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""Long fluent Builder chains with and without the memoized source/compile.
+
+``Uncached`` renders the whole query on every get() and recompiles on
+every match, which is what each step cost before get() and compile() were
+memoized. Each chain step appends a lazy quantified clause and then asks
+for the source and a match, as interactive or incremental users do.
+
+    $ python benchmarks/bench_builder_chains.py
+"""
+
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from srl.builder import Builder
+from srl.emitter import emit
+
+class Uncached(Builder):
+
+    def get(self, implode=r''):
+        return self.group % emit(self.nodes)
+
+    def compile(self):
+        self.compiled = re.compile(self.get(), self.flags)
+        return self
+
+def chain(cls, steps, lookups):
+    builder = cls()
+    for _ in range(steps):
+        builder.letter().onceOrMore().firstMatch().literally(',')
+        for _ in range(lookups):
+            builder.get()
+        builder.match('a,')
+    return builder
+
+def timed(cls, steps, lookups):
+    best = None
+    for _ in range(3):
+        re.purge()
+        start = time.time()
+        chain(cls, steps, lookups)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    for steps in (10, 100, 400):
+        for lookups in (1, 10):
+            before = timed(Uncached, steps, lookups)
+            after = timed(Builder, steps, lookups)
+            print('%4d steps, %2d get()/step: uncached %8.2f ms  memoized %8.2f ms  %5.2fx'
+                  % (steps, lookups, before * 1000, after * 1000, before / after))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""Cost of SRL(dsl) with and without the compiled-pattern cache.
+
+    $ python benchmarks/bench_cache.py
+"""
+
+import sys
+import os
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import srl
+from srl import SRL
+
+QUERIES = [
+    'literally "abc"',
+    'digit exactly 3 times',
+    'letter from a to f once or more',
+    'capture (digit once or more) as "number"',
+    'begin with any of (literally "sample") must end',
+]
+
+def construct_all():
+    for query in QUERIES:
+        SRL(query)
+
+def bench(number):
+    construct_all()
+    best = min(timeit.repeat(construct_all, number=number, repeat=3))
+    return best / (number * len(QUERIES))
+
+def main():
+    srl.set_cache_size(0)
+    uncached = bench(500)
+    srl.set_cache_size(srl.cache.DEFAULT_CACHE_SIZE)
+    srl.cache_clear()
+    cached = bench(20000)
+    print('SRL() without cache: %8.2f us' % (uncached * 1e6))
+    print('SRL() with cache:    %8.2f us' % (cached * 1e6))
+    print('speedup:             %8.1fx' % (uncached / cached))
+    print(srl.cache_info())
+
+if __name__ == '__main__':
+    main()
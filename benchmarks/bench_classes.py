@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Sharing of character-class tables between automaton patterns.
+
+Compiles 10, 100, 1,000 and 5,000 random queries built from digit,
+letter, uppercaseLetter and oneOf with the pike engine and prints the
+memory report of srl.engines.classes: how many tables exist, how many
+instructions use them, and the bytes they hold against the bytes one
+table per instruction would hold.
+
+    $ python benchmarks/bench_classes.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from srl import SRL
+from srl.engines.classes import memory_report
+
+PARTS = [
+    'digit', 'letter', 'uppercase letter', 'digit from 0 to 7', 'letter from a to f',
+    'one of "abc"', 'one of "xyz_"', 'one of "+-"', 'whitespace', 'any character',
+]
+
+def query(rng):
+    return ' '.join('%s %s' % (rng.choice(PARTS), rng.choice(['', 'once or more', 'optional',
+                                                             'exactly 2 times']))
+                    for _ in range(rng.randint(2, 6)))
+
+def main():
+    rng = random.Random(4)
+    compiled = []
+    print('%8s %8s %8s %10s %16s %10s' % ('queries', 'tables', 'uses', 'bytes',
+                                          'unshared bytes', 'compile s'))
+    for total in (10, 100, 1000, 5000):
+        start = time.time()
+        while len(compiled) < total:
+            compiled.append(SRL('%s literally "%d"' % (query(rng), len(compiled)), engine='pike'))
+        seconds = time.time() - start
+        report = memory_report()
+        print('%8d %8d %8d %10d %16d %10.2f' % (total, report.tables, report.uses, report.bytes,
+                                                report.unshared_bytes, seconds))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""Lazy DFA engine versus re, on benign and on hostile inputs.
+
+Benign: log lines searched with ordinary queries, where sre's C loop wins
+by a constant factor. Hostile: nested or overlapping repeats on a run of
+"a" that never completes a match; sre backtracks exponentially (or
+quadratically) while the DFA stays linear. re runs are skipped once a
+single call takes more than 50 ms.
+
+    $ python benchmarks/bench_dfa.py
+"""
+
+import os
+import random
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from srl import SRL
+
+BENIGN = [
+    ('timestamp', 'digit exactly 2 times literally ":" digit exactly 2 times '
+                  'literally ":" digit exactly 2 times'),
+    ('key=value', 'letter once or more literally "=" any of (letter, digit) once or more'),
+]
+
+# Name, query, repeated text and suffix: the suffix holds the literal the
+# query requires, so the prefilter cannot reject the input up front.
+HOSTILE = [
+    ('(a|aa)*b', 'begin with any of (literally "a", literally "aa") never or more '
+                 'literally "b"', 'a', 'cb'),
+    ('(?:[a-z]+)+!', 'begin with any of (letter once or more) once or more literally "!"',
+     'a', '1!'),
+    ('.*.*=.*;', 'anything never or more anything never or more literally "=" '
+                 'anything never or more literally ";"', '=', ''),
+]
+
+def best(func, number=3):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+def once(func):
+    start = time.time()
+    func()
+    return time.time() - start
+
+def benign():
+    rng = random.Random(0)
+    text = '\n'.join('%02d:%02d:%02d %s=%d' % (rng.randint(0, 23), rng.randint(0, 59),
+                                               rng.randint(0, 59),
+                                               ''.join(rng.choice('abcdef') for _ in range(5)),
+                                               rng.randint(0, 999))
+                     for _ in range(2000))
+    for name, dsl in BENIGN:
+        regex, dfa = SRL(dsl), SRL(dsl, engine='dfa')
+        assert regex.findall(text) == dfa.findall(text)
+        print('benign  %-12s findall %d KB: re %8.2f ms  dfa %8.2f ms'
+              % (name, len(text) // 1024, best(lambda: regex.findall(text)) * 1000,
+                 best(lambda: dfa.findall(text)) * 1000))
+
+def hostile():
+    for name, dsl, char, suffix in HOSTILE:
+        regex, dfa = SRL(dsl), SRL(dsl, engine='dfa')
+        give_up = False
+        for size in (10, 15, 20, 25, 30, 200, 1000, 100000):
+            text = char * size + suffix
+            dfa_time = once(lambda: dfa.search(text))
+            if give_up or size > 10000:
+                re_time = 'skipped'
+            else:
+                elapsed = once(lambda: regex.search(text))
+                give_up = elapsed > 0.05
+                re_time = '%10.2f ms' % (elapsed * 1000)
+            print('hostile %-12s n=%-6d re %13s  dfa %8.2f ms'
+                  % (name, size, re_time, dfa_time * 1000))
+
+if __name__ == '__main__':
+    benign()
+    hostile()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""Cold versus warm worker start-up with the persistent compile cache.
+
+Each run is a fresh interpreter that imports srl and builds a few hundred
+distinct SRL queries. A warm disk cache skips lexing, parsing and Builder
+replay entirely (PLY is not even imported).
+
+    $ python benchmarks/bench_disk_cache.py
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+WORKER = '''
+import sys
+import time
+start = time.time()
+import srl
+if sys.argv[1]:
+    srl.enable_disk_cache(sys.argv[1])
+for n in range(100):
+    srl.SRL('digit exactly %d times' % (n + 1))
+    srl.SRL('literally "word%d" once or more' % n)
+    srl.SRL('capture (letter between 1 and %d times) as "g%d"' % (n + 1, n))
+print(time.time() - start)
+print('srl.utils.yacc' in sys.modules)
+'''
+
+def worker(path):
+    output = subprocess.check_output([sys.executable, '-c', WORKER, path or ''],
+                                     cwd=ROOT, universal_newlines=True)
+    elapsed, loaded_ply = output.split()
+    return float(elapsed), loaded_ply == 'True'
+
+def concurrent_workers(path, count):
+    procs = [subprocess.Popen([sys.executable, '-c', WORKER, path], cwd=ROOT,
+                              stdout=subprocess.PIPE, universal_newlines=True)
+             for _ in range(count)]
+    return [float(proc.communicate()[0].split()[0]) for proc in procs]
+
+def main():
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, 'srl-cache.db')
+        baseline = min(worker(None)[0] for _ in range(3))
+        cold, _ = worker(path)
+        warm, loaded_ply = min(worker(path) for _ in range(3))
+        print('no disk cache: %7.1f ms' % (baseline * 1000))
+        print('cold:          %7.1f ms' % (cold * 1000))
+        print('warm:          %7.1f ms   (PLY imported: %s)' % (warm * 1000, loaded_ply))
+
+        os.remove(path)
+        times = concurrent_workers(path, 4)
+        print('4 concurrent cold writers: %s ms'
+              % ', '.join('%.1f' % (t * 1000) for t in times))
+        print('warm after concurrent writers: %7.1f ms' % (worker(path)[0] * 1000))
+    finally:
+        shutil.rmtree(tmp)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""Code generation cost: single-buffer emitter versus per-node rendering.
+
+The per-node renderer below is how regex source used to be produced: every
+node returned its own string and every group level joined its children
+(via a sub-Builder's get()). The emitter writes all pieces into one buffer.
+Both are timed on parsed IR of generated queries, and the end-to-end
+DSL-to-compiled-pattern latency is reported alongside.
+
+    $ python benchmarks/bench_emitter.py
+"""
+
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from srl import ir
+from srl.builder import Builder
+from srl.emitter import emit
+from srl.parsers.parse import parse
+
+STATEMENTS = [
+    'literally "ab"',
+    'digit exactly 2 times',
+    'capture (letter from a to f once or more whitespace optional)',
+    'any of (literally "x", digit, capture (letter tab))',
+    'no whitespace never or more',
+]
+
+def query(clauses, depth=0):
+    dsl = ' '.join(STATEMENTS[n % len(STATEMENTS)] for n in range(clauses))
+    for _ in range(depth):
+        dsl = 'capture (%s literally "-")' % dsl
+    return dsl
+
+def render(node):
+    if isinstance(node, ir.Literal):
+        return '(?:%s)' % ir.escape(node.text)
+    if isinstance(node, ir.Quantifier):
+        return render(node.child) + node.suffix()
+    if isinstance(node, ir.Group):
+        body = ''.join([render(child) for child in node.body])
+        if node.name:
+            return '(?P<%s>%s)' % (node.name, body)
+        return ('(%s)' if node.capture else '(?:%s)') % body
+    if isinstance(node, ir.Alternation):
+        return '(?:%s)' % '|'.join([render(child) for child in node.branches])
+    if isinstance(node, ir.Pattern):
+        return ''.join([render(child) for child in node.nodes])
+    return emit(node)
+
+def best(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+def main():
+    print('%-22s %12s %12s %8s %14s' % ('query', 'per-node', 'emitter', 'speedup', 'dsl->compiled'))
+    for clauses, depth in ((5, 0), (100, 0), (1000, 0), (100, 50)):
+        dsl = query(clauses, depth)
+        pattern = parse(dsl)
+        assert render(pattern) == emit(pattern)
+        number = max(1, 20000 // (clauses + depth))
+        before = best(lambda: render(pattern), number)
+        after = best(lambda: emit(pattern), number)
+        # re's own cache would hide the compile cost.
+        total = best(lambda: (re.purge(), Builder.parse(dsl)), max(1, number // 20))
+        print('%-22s %9.1f us %9.1f us %7.2fx %11.2f ms'
+              % ('%d clauses, depth %d' % (clauses, depth),
+                 before * 1e6, after * 1e6, before / after, total * 1000))
+
+if __name__ == '__main__':
+    main()
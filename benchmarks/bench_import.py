@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""Start-up cost of ``import srl``, with and without a DSL parse.
+
+Runs fresh interpreters under ``python -X importtime`` and reports the
+cumulative import time of the ``srl`` package plus the time spent on the
+first parse (which loads PLY and its tables) or the first Builder query
+(which never should).
+
+    $ python benchmarks/bench_import.py
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+FIRST_PARSE = '''
+import time
+import srl
+start = time.time()
+srl.SRL('digit exactly 3 times')
+print(time.time() - start)
+'''
+
+BUILDER_ONLY = '''
+import sys
+import time
+import srl
+from srl.builder import Builder
+start = time.time()
+Builder().digit().get()
+elapsed = time.time() - start
+assert 'srl.utils.yacc' not in sys.modules
+assert 'srl.utils.lex' not in sys.modules
+print(elapsed)
+'''
+
+# Hiding the table modules forces the fallback path that builds both
+# tables from the grammar in memory, which is what every process start
+# paid when parsetab.py could not be written.
+WITHOUT_TABLES = '''
+import sys
+sys.modules['srl.parsers.lextab'] = None
+sys.modules['srl.parsers.parsetab'] = None
+''' + FIRST_PARSE
+
+def run(code, runs=5):
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    import_us = []
+    parse_s = []
+    # The first run only warms the bytecode cache.
+    for _ in range(runs + 1):
+        proc = subprocess.Popen([sys.executable, '-X', 'importtime', '-c', code],
+                                cwd=ROOT, env=env, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, universal_newlines=True)
+        out, err = proc.communicate()
+        parse_s.append(float(out.strip().splitlines()[-1]))
+        for line in err.splitlines():
+            match = re.match(r'import time:\s+\d+ \|\s+(\d+) \|\s+srl$', line)
+            if match:
+                import_us.append(int(match.group(1)))
+    return min(import_us[1:]), min(parse_s[1:])
+
+def main():
+    for label, code in (('builder only', BUILDER_ONLY),
+                        ('shipped tables', FIRST_PARSE),
+                        ('no tables', WITHOUT_TABLES)):
+        import_us, parse_s = run(code)
+        print('%-15s import srl: %7.1f ms   first query: %7.1f ms'
+              % (label, import_us / 1000.0, parse_s * 1000))
+
+if __name__ == '__main__':
+    main()
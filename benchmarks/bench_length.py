@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""Length bounds: what a Python-side quick reject by input length buys.
+
+Validates field values of mixed lengths with match/fullmatch using plain
+re, the CompiledPattern SRL returns, and a CompiledPattern forced to
+check lengths on every call. sre already refuses inputs shorter than the
+pattern's minimum width in C, so the forced check only adds a Python
+call; that is why length checks only ride along with the literal
+prefilter.
+
+    $ python benchmarks/bench_length.py
+"""
+
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from srl.builder import Builder
+from srl.pattern import CompiledPattern
+
+QUERIES = [
+    ('zip code', 'begin with digit exactly 5 times must end'),
+    ('short id', 'letter between 2 and 4 digit between 2 and 6'),
+]
+
+class AlwaysChecked(CompiledPattern):
+
+    def bypass(self):
+        pass
+
+def best(func, number=5):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+def main():
+    rng = random.Random(0)
+    values = [''.join(rng.choice('0123456789ab') for _ in range(rng.choice([1, 3, 5, 12, 40, 200])))
+              for _ in range(20000)]
+    for name, dsl in QUERIES:
+        pattern = Builder.parse(dsl)
+        plain = pattern.compiled
+        checked = AlwaysChecked(plain, pattern.info)
+        for method in ('match', 'fullmatch'):
+            timings = [best(lambda: [getattr(target, method)(value) for value in values])
+                       for target in (plain, pattern, checked)]
+            print('%-9s %-9s lengths %d..%s: re %6.2f ms  srl %6.2f ms  forced check %6.2f ms'
+                  % ((name, method, pattern.min_length, pattern.max_length)
+                     + tuple(timing * 1000 for timing in timings)))
+
+if __name__ == '__main__':
+    main()
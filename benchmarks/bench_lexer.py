@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""Lexer throughput: reserved-word table versus one rule per keyword.
+
+    $ python benchmarks/bench_lexer.py
+"""
+
+import os
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from srl.parsers import parse as module
+from srl.utils import lex
+
+STATEMENTS = [
+    'literally "ab"',
+    'digit exactly 2 times',
+    'letter from a to f once or more',
+    'whitespace optional',
+    'capture (any character never or more) as "g"',
+    'uppercase letter between 1 and 3 times',
+    'new line must end',
+]
+
+def legacy_lexer():
+    legacy = types.ModuleType('legacy_lexer')
+    legacy.__file__ = module.__file__
+    legacy.tokens = tuple(t for t in module.tokens if t != 'WORD')
+    for name in ('t_LEFT_PARENTHESIS', 't_RIGHT_PARENTHESIS', 't_COMMA', 't_NUMBER',
+                 't_STRING', 't_newline', 't_ignore', 't_CHARACTER', 't_error'):
+        setattr(legacy, name, getattr(module, name))
+    for word, token in module.reserved.items():
+        setattr(legacy, 't_' + token, word)
+    lexer = lex.lex(module=legacy, errorlog=lex.NullLogger())
+    lexer.lexoptimize = True
+    return lexer
+
+def throughput(lexer, text, repeat=10):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        lexer.input(text)
+        count = sum(1 for _ in iter(lexer.token, None))
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return count / best, len(text) / best / 1e6
+
+def main():
+    text = ' '.join(STATEMENTS[n % len(STATEMENTS)] for n in range(20000))
+    print('input: %.1f MB' % (len(text) / 1e6))
+    for label, lexer in (('per-keyword rules', legacy_lexer()),
+                         ('reserved words', module.lexer.clone())):
+        tokens, mbytes = throughput(lexer, text)
+        print('%-18s %9.0f tokens/s  %6.2f MB/s' % (label, tokens, mbytes))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""Single-literal queries: str methods versus re, on 1 MB of log text.
+
+``literally "connection reset"`` is answered by str.find, str.count and
+str.split; re only builds the Match object of search. Prints milliseconds
+per call for a rare literal (once every 40 lines) and frequent ones (every
+line); the search that misses runs on a copy of the log where the last
+character of each occurrence was changed.
+
+    $ python benchmarks/bench_literal.py
+"""
+
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from srl import SRL
+
+SIZE = 1 << 20
+
+def log(rng):
+    events = ['accepted', 'closed', 'timeout', 'retrying', 'connection reset', 'ok']
+    weights = [10, 10, 5, 5, 1, 10]
+    lines = []
+    length = 0
+    while length < SIZE:
+        line = '2024-01-%02d host%d %s after %dms' % (
+            rng.randint(1, 28), rng.randint(0, 99),
+            rng.choice([event for event, weight in zip(events, weights)
+                        for _ in range(weight)]), rng.randint(0, 5000))
+        lines.append(line)
+        length += len(line) + 1
+    return '\n'.join(lines)
+
+def main():
+    text = log(random.Random(1))
+    print('%18s %14s %10s %10s %8s' % ('literal', '', 're ms', 'str ms', 'speedup'))
+    for literal in ('connection reset', ' after ', 'ms'):
+        fast = SRL('literally "%s"' % literal).compiled
+        plain = re.compile(fast.pattern, fast.flags)
+        assert fast.search == fast._literal_search
+        missing = text.replace(literal, literal[:-1] + '_')
+        runs = [
+            ('search (miss)', lambda p: p.search(missing)),
+            ('findall', lambda p: p.findall(text)),
+            ('split', lambda p: p.split(text)),
+            ('sub', lambda p: p.sub('RST', text)),
+            ('subn', lambda p: p.subn('RST', text)),
+        ]
+        for name, run in runs:
+            assert repr(run(fast)) == repr(run(plain)), name
+            seconds = [min(timeit.repeat(lambda: run(pattern), number=10, repeat=7)) / 10
+                       for pattern in (plain, fast)]
+            print('%18s %14s %10.2f %10.2f %7.1fx' % (literal, name, seconds[0] * 1000,
+                                                      seconds[1] * 1000, seconds[0] / seconds[1]))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""Parse time for generated queries of 10 to 10,000 statements.
+
+Time per statement should stay flat as queries grow.
+
+    $ python benchmarks/bench_long_queries.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from srl.parsers.parse import parse
+
+STATEMENTS = [
+    'literally "ab"',
+    'digit exactly 2 times',
+    'letter from a to f once or more',
+    'whitespace optional',
+    'capture (digit letter) as "g"',
+]
+
+def query(clauses):
+    return ' '.join(STATEMENTS[n % len(STATEMENTS)] for n in range(clauses))
+
+def main():
+    for clauses in (10, 100, 1000, 10000):
+        dsl = query(clauses)
+        repeat = max(1, 10000 // clauses)
+        start = time.time()
+        for _ in range(repeat):
+            parse(dsl)
+        elapsed = (time.time() - start) / repeat
+        print('%6d statements: %9.2f ms/parse  %6.2f us/statement'
+              % (clauses, elapsed * 1000, elapsed * 1e6 / clauses))
+
+if __name__ == '__main__':
+    main()
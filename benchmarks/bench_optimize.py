@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""Compile and match cost of plain versus peephole-optimized regexes.
+
+    $ python benchmarks/bench_optimize.py
+"""
+
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from srl.builder import Builder
+
+QUERIES = {
+    'email': ('begin with any of (digit, letter, one of "._%+-") once or more '
+              'literally "@" any of (digit, letter, one of ".-") once or more '
+              'literally "." letter at least 2 times must end case insensitive',
+              'super-He4vy.add+ress@top-Le.ve1.domains ' * 20),
+    'date': ('digit digit digit digit literally "-" digit digit literally "-" '
+             'digit digit literally "T" digit digit literally ":" digit digit',
+             'log 2016-01-02T10:20 entry ' * 200),
+    'keywords': ('any of (literally "get", literally "post", literally "put", '
+                 'literally "delete", literally "patch") whitespace '
+                 'literally "/" any of (letter, digit, one of "/_") once or more',
+                 'x get /api/v1 post /x/y_z patch /p ' * 200),
+    'long literal': (' '.join('literally "%s"' % word for word in
+                              'the quick brown fox jumps over the lazy dog'.split()),
+                     'a' * 4000 + 'thequickbrownfoxjumpsoverthelazydog'),
+}
+
+def best(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+def main():
+    print('%-13s %6s %6s %11s %11s %11s %11s'
+          % ('query', 'len', 'opt', 'compile', 'opt', 'findall', 'opt'))
+    for name in sorted(QUERIES):
+        dsl, text = QUERIES[name]
+        plain_source, flags = Builder.translate(dsl)
+        optimized_source, _ = Builder.translate(dsl, optimize=True)
+        plain = re.compile(plain_source, flags)
+        optimized = re.compile(optimized_source, flags)
+        assert plain.findall(text) == optimized.findall(text)
+        compile_plain = best(lambda: (re.purge(), re.compile(plain_source, flags)), 200)
+        compile_opt = best(lambda: (re.purge(), re.compile(optimized_source, flags)), 200)
+        match_plain = best(lambda: plain.findall(text), 200)
+        match_opt = best(lambda: optimized.findall(text), 200)
+        print('%-13s %6d %6d %8.1f us %8.1f us %8.1f us %8.1f us'
+              % (name, len(plain_source), len(optimized_source),
+                 compile_plain * 1e6, compile_opt * 1e6, match_plain * 1e6, match_opt * 1e6))
+
+if __name__ == '__main__':
+    main()
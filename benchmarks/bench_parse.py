@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Per-parse cost of the shared LALR parser versus rebuilding it per call.
+
+    $ python benchmarks/bench_parse.py
+"""
+
+import sys
+import os
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from srl.parsers import parse as parse_module
+from srl.utils import yacc
+
+QUERIES = [
+    'literally "abc"',
+    'digit exactly 3 times',
+    'letter from a to f once or more',
+    'capture (digit once or more) as "number"',
+    'begin with any of (literally "sample") must end',
+]
+
+def rebuild_per_call(string):
+    parser = yacc.yacc(debug=False, module=parse_module, write_tables=False,
+                       errorlog=yacc.NullLogger())
+    return parser.parse(string, lexer=parse_module.lexer, tracking=False)
+
+def shared_parser(string):
+    return parse_module.parse(string)
+
+def bench(func, number):
+    def run():
+        for query in QUERIES:
+            func(query)
+    run()
+    best = min(timeit.repeat(run, number=number, repeat=3))
+    return best / (number * len(QUERIES))
+
+def main():
+    before = bench(rebuild_per_call, 20)
+    after = bench(shared_parser, 2000)
+    print('yacc.yacc() per parse: %8.1f us/parse' % (before * 1e6))
+    print('shared parser:         %8.1f us/parse' % (after * 1e6))
+    print('speedup:               %8.1fx' % (before / after))
+
+if __name__ == '__main__':
+    main()
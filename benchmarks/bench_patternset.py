@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""PatternSet versus a loop over SRL patterns, for log routing.
+
+Routes synthetic log lines with 10, 100 and 1,000 queries and prints lines
+per second for:
+
+- "which": every query that matches the line (PatternSet.matches versus
+  ``[query for query in patterns if query.search(line)]``);
+- "first": the first query that matches (PatternSet.first versus a loop
+  that stops at the first hit).
+
+    $ python benchmarks/bench_patternset.py
+"""
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from srl import SRL, PatternSet
+
+SERVICES = ['auth', 'billing', 'search', 'mail', 'cache', 'queue', 'web', 'db']
+
+def queries(rng, count):
+    result = []
+    for index in range(count):
+        word = ''.join(rng.choice('abcdefghij') for _ in range(rng.randint(4, 7)))
+        result.append(rng.choice([
+            'begin with literally "%s:" whitespace literally "%s"' % (rng.choice(SERVICES), word),
+            'literally "%s=" digit once or more' % word,
+            'literally "%s" whitespace letter once or more literally "ed"' % word,
+            'literally "code %d" must end' % index,
+        ]))
+    return result
+
+def lines(rng, count):
+    result = []
+    for _ in range(count):
+        words = ' '.join(''.join(rng.choice('abcdefghij') for _ in range(rng.randint(4, 7)))
+                         for _ in range(rng.randint(4, 10)))
+        result.append('%s: %s code %d' % (rng.choice(SERVICES), words, rng.randint(0, 2000)))
+    return result
+
+def main():
+    rng = random.Random(7)
+    log = lines(rng, 2000)
+    print('%8s %8s %12s %12s %12s %12s' % ('queries', '', 'loop which', 'set which',
+                                           'loop first', 'set first'))
+    for count in (10, 100, 1000):
+        dsl = queries(rng, count)
+        compiled = [SRL(query) for query in dsl]
+        patterns = PatternSet(dsl)
+        assert [patterns.matches(line) for line in log[:200]] == \
+            [[index for index, query in enumerate(compiled) if query.search(line)]
+             for line in log[:200]]
+
+        def loop_which():
+            for line in log:
+                [index for index, query in enumerate(compiled) if query.search(line)]
+
+        def loop_first():
+            for line in log:
+                for index, query in enumerate(compiled):
+                    if query.search(line):
+                        break
+
+        def set_which():
+            for line in log:
+                patterns.matches(line)
+
+        def set_first():
+            for line in log:
+                patterns.first(line)
+
+        set_which()  # build the automaton states once
+        rates = [len(log) / min(timeit.repeat(run, number=1, repeat=3))
+                 for run in (loop_which, set_which, loop_first, set_first)]
+        print('%8d %8s %12.0f %12.0f %12.0f %12.0f' % ((count, 'lines/s') + tuple(rates)))
+
+if __name__ == '__main__':
+    main()
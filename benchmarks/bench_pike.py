@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Pike VM engine versus re on log-parsing queries with groups.
+
+Matches every line of a synthetic access/application log with queries
+that capture fields, and prints lines per second for re and for the
+pike engine (DFA for the span, Pike VM for the groups).
+
+    $ python benchmarks/bench_pike.py
+"""
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from srl import SRL
+
+QUERIES = [
+    ('level', 'begin with capture (digit exactly 2 times literally ":" digit exactly 2 times) '
+              'as "time" whitespace capture (uppercase letter once or more) as "level" '
+              'whitespace capture (anything once or more) as "message" must end'),
+    ('key=value', 'capture (letter once or more) as "key" literally "=" '
+                  'capture (any of (letter, digit) once or more) as "value"'),
+    ('status', 'literally "HTTP/1.1" literally "\\"" whitespace '
+               'capture (digit exactly 3 times) as "status"'),
+]
+
+def log_lines(rng, count):
+    lines = []
+    for _ in range(count):
+        words = ' '.join(''.join(rng.choice('abcdefgh') for _ in range(rng.randint(2, 8)))
+                         for _ in range(rng.randint(2, 8)))
+        lines.append(rng.choice([
+            '%02d:%02d %s %s' % (rng.randint(0, 23), rng.randint(0, 59),
+                                 rng.choice(['INFO', 'WARN', 'ERROR']), words),
+            '"GET /%s HTTP/1.1" %d %d' % (words.replace(' ', '/'), rng.choice([200, 404, 500]),
+                                          rng.randint(100, 9999)),
+            '%s user=%s retries=%d' % (words, words.split()[0], rng.randint(0, 9)),
+        ]))
+    return lines
+
+def best(func, number=3):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+def main():
+    lines = log_lines(random.Random(0), 5000)
+    for name, dsl in QUERIES:
+        regex, pike = SRL(dsl), SRL(dsl, engine='pike')
+        assert [m and m.groupdict() for m in map(regex.search, lines)] == \
+            [m and m.groupdict() for m in map(pike.search, lines)]
+        timings = [best(lambda: [target.search(line) for line in lines])
+                   for target in (regex, pike)]
+        print('%-10s search: re %9.0f lines/s  pike %9.0f lines/s (%.0fx slower)'
+              % (name, len(lines) / timings[0], len(lines) / timings[1],
+                 timings[1] / timings[0]))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Required-literal prefilter versus handing every input to sre.
+
+Scans log lines where 1% (or all) contain the required literal, then
+prints the prefilter statistics.
+
+    $ python benchmarks/bench_prefilter.py
+"""
+
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from srl.builder import Builder
+
+QUERIES = [
+    ('email', 'any of (digit, letter, one of "._%+-") once or more literally "@" '
+              'any of (digit, letter, one of ".-") once or more'),
+    ('error', 'digit exactly 2 times literally ":" digit exactly 2 times '
+              'whitespace literally "ERROR" whitespace anything once or more'),
+]
+
+def lines(rng, count, needle, ratio):
+    result = []
+    for n in range(count):
+        words = ' '.join(''.join(rng.choice('abcdefgh12') for _ in range(6)) for _ in range(12))
+        if rng.random() < ratio:
+            words = '10:42 %s %s' % (needle, words)
+        result.append(words)
+    return result
+
+def best(func, number=5):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+def main():
+    rng = random.Random(0)
+    for name, dsl in QUERIES:
+        needle = 'john@example.com' if name == 'email' else 'ERROR x'
+        for ratio in (0.01, 1.0):
+            pattern = Builder.parse(dsl)
+            plain = re.compile(pattern.pattern, pattern.flags)
+            corpus = lines(rng, 5000, needle, ratio)
+            assert [plain.search(line) is None for line in corpus] == \
+                [pattern.search(line) is None for line in corpus]
+            before = best(lambda: [plain.search(line) for line in corpus])
+            after = best(lambda: [pattern.search(line) for line in corpus])
+            print('%-6s %3d%% with literal: re %7.2f ms  prefiltered %7.2f ms  %5.2fx'
+                  % (name, ratio * 100, before * 1000, after * 1000, before / after))
+            print('       %r' % (pattern.stats(), ))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""Shift-And scan versus re for findall with fixed-length class patterns.
+
+Runs findall over 1 MB and 8 MB of synthetic text (words and numbers,
+with one phone number or other special token every 5 or 200 words) and
+prints seconds per call for the plain re pattern and for SRL's compiled
+pattern, which scans with srl.engines.shiftand unless the query starts
+with a literal character (the case-insensitive "error" below).
+
+    $ python benchmarks/bench_shiftand.py
+"""
+
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from srl import SRL
+
+QUERIES = [
+    'digit exactly 3 times literally "-" digit exactly 4 times',
+    'letter exactly 6 times digit',
+    'uppercase letter exactly 2 times digit exactly 3 times',
+    'literally "error" case insensitive',
+    'letter digit letter',
+]
+
+def text(rng, size, rare):
+    """Words and numbers, with one special token in ``rare`` pieces."""
+    pieces = []
+    length = 0
+    while length < size:
+        if rng.random() < 1.0 / rare:
+            piece = rng.choice(['%03d-%04d' % (rng.randint(0, 999), rng.randint(0, 9999)),
+                                'Error', 'ERROR', 'AB123', 'x9y'])
+        elif rng.random() < 0.8:
+            piece = ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz')
+                            for _ in range(rng.randint(2, 9)))
+        else:
+            piece = str(rng.randint(0, 99999))
+        pieces.append(piece)
+        length += len(piece) + 1
+    return ' '.join(pieces)[:size]
+
+def main():
+    rng = random.Random(5)
+    print('%58s %4s %6s %8s %8s %8s %8s' % ('query', 'MB', 'every', 'matches', 're s', 'srl s',
+                                             'speedup'))
+    for size, rare in ((1 << 20, 5), (1 << 20, 200), (8 << 20, 200)):
+        sample = text(rng, size, rare)
+        for query in QUERIES:
+            compiled = SRL(query).compiled
+            plain = re.compile(compiled.pattern, compiled.flags)
+            found = plain.findall(sample)
+            assert compiled.findall(sample) == found
+            seconds = [min(timeit.repeat(lambda: pattern.findall(sample), number=1, repeat=3))
+                       for pattern in (plain, compiled)]
+            print('%58s %4d %6d %8d %8.3f %8.3f %7.1fx' % (
+                query, size >> 20, rare, len(found), seconds[0], seconds[1],
+                seconds[0] / seconds[1]))
+
+if __name__ == '__main__':
+    main()
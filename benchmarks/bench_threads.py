@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""Parse throughput as the number of parsing threads grows.
+
+Every thread parses the same batch of queries and checks each result
+against a single-threaded reference, so the run also doubles as a stress
+test for the per-thread lexer/parser copies. On a free-threaded build
+(python3.13t and later) throughput should scale with the thread count.
+
+    $ python benchmarks/bench_threads.py
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from srl.parsers.parse import parse
+
+QUERIES = ['digit exactly %d times' % n for n in range(1, 20)] + \
+          ['letter from a to f between 1 and %d times' % n for n in range(1, 20)] + \
+          ['capture (literally "%s" once or more) as "g"' % ('x' * n) for n in range(1, 20)]
+
+ROUNDS = 40
+
+def run(thread_count, expected):
+    errors = []
+
+    def work():
+        for _ in range(ROUNDS):
+            for query, result in zip(QUERIES, expected):
+                if parse(query) != result:
+                    errors.append(query)
+
+    threads = [threading.Thread(target=work) for _ in range(thread_count)]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - start
+    if errors:
+        raise AssertionError('%d corrupted parses' % len(errors))
+    return thread_count * ROUNDS * len(QUERIES) / elapsed
+
+def main():
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print('GIL enabled: %s' % gil)
+    expected = [parse(query) for query in QUERIES]
+    for thread_count in (1, 2, 4, 8):
+        print('%d threads: %9.0f parses/s' % (thread_count, run(thread_count, expected)))
+
+if __name__ == '__main__':
+    main()
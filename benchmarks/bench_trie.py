@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""Keyword alternations of 10 to 10,000 literals, flat versus trie-factored.
+
+    $ python benchmarks/bench_trie.py
+"""
+
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from srl import ir
+from srl.builder import Builder
+
+def keywords(count, rng):
+    words = set()
+    while len(words) < count:
+        words.add(''.join(rng.choice('etaoinshrdlu') for _ in range(rng.randint(3, 9))))
+    return sorted(words, key=lambda word: rng.random())
+
+def timed(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        result = func()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    rng = random.Random(0)
+    text = ' '.join(''.join(rng.choice('etaoinshrdlucmfw') for _ in range(rng.randint(2, 10)))
+                    for _ in range(20000))
+    print('%6s %14s %14s %14s %14s' % ('words', 'flat compile', 'trie compile',
+                                       'flat findall', 'trie findall'))
+    for count in (10, 100, 1000, 10000):
+        query = Builder().anyOf([ir.Literal(word) for word in keywords(count, rng)])
+        flat, trie = query.get(), query.get_optimized()
+        compile_flat, flat_re = timed(lambda: (re.purge(), re.compile(flat))[1])
+        compile_trie, trie_re = timed(lambda: (re.purge(), re.compile(trie))[1])
+        search_flat, found = timed(lambda: flat_re.findall(text))
+        search_trie, found_trie = timed(lambda: trie_re.findall(text))
+        assert found == found_trie
+        print('%6d %11.1f ms %11.1f ms %11.1f ms %11.1f ms'
+              % (count, compile_flat * 1000, compile_trie * 1000,
+                 search_flat * 1000, search_trie * 1000))
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,24 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import os
+
 from setuptools import setup, find_packages
+from setuptools.command.build_py import build_py
+
+
+class build_py_with_tables(build_py):
+    """Regenerate the PLY lexer/parser tables into the build tree."""
+
+    def run(self):
+        build_py.run(self)
+        if self.dry_run:
+            return
+        from srl.parsers.tables import write_tables
+        outputdir = os.path.join(self.build_lib, 'srl', 'parsers')
+        tables = write_tables(outputdir)
+        if self.compile or self.optimize > 0:
+            self.byte_compile(tables)
 
 with open('README.md') as readme_file:
     readme = readme_file.read()
@@ -41,6 +58,7 @@ setup(
         'Programming Language :: Python :: 3.4',
         'Programming Language :: Python :: 3.5',
     ],
+    cmdclass={'build_py': build_py_with_tables},
     test_suite='tests',
     tests_require=test_requirements,
 )
@@ -1,3 +1,6 @@
 # -*- coding: utf-8 -*-
 
 from .srl import SRL
+from .cache import (cache_info, cache_clear, set_cache_size,
+                    enable_disk_cache, disable_disk_cache)
+from .patternset import PatternSet
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""Static analysis of the IR used to speed up matching.
+
+analyze() returns a plain dict (so it can be stored next to the regex in
+the disk cache) describing what every match must contain:
+
+``literal``
+    The longest literal every match contains, or None (always None when
+    the query holds a Raw fragment, which may make the rest optional).
+``offset``
+    The largest distance from the start of a match to where that literal
+    begins, or None when it is unbounded or unknown.
+``min_length``, ``max_length``
+    Bounds on the length of any match; ``max_length`` is None when it is
+    unbounded. A query holding a Raw fragment has no bounds: 0 and None.
+``literals``
+    When the whole query is a choice between (non-empty) literals, the
+    list of them in the order the regex tries them; None otherwise.
+``classes``
+    When every match has the same length, at most MAX_CLASSES, and each
+    character is matched by a class or literal alone, the regex source for
+    each position (``['[0-9]', '[0-9]', '\\-']``); None otherwise.
+"""
+
+import re
+
+from . import ir
+
+# Longest query whose classes are listed, one per character.
+MAX_CLASSES = 64
+
+def analyze(pattern, flags=0):
+    """Analysis of ``pattern`` compiled with ``flags``.
+
+    Pass the flags of the compiled regex, which include inline global flags
+    from Raw fragments.
+    """
+    flags |= pattern.flags
+    best = None
+    offset = 0
+    run = []
+    run_offset = 0
+    candidates = []
+    for node in pattern.nodes:
+        text = _text(node)
+        if text is not None:
+            if not run:
+                run_offset = offset
+            run.append(text)
+        else:
+            if run:
+                candidates.append((''.join(run), run_offset))
+                run = []
+            for literal in _required(node):
+                candidates.append((literal, None))
+        offset = _add(offset, width(node)[1])
+    if run:
+        candidates.append((''.join(run), run_offset))
+    if flags & re.VERBOSE:
+        # Whitespace in literals would be ignored by the regex.
+        candidates = []
+    raw = _has_raw(pattern.nodes)
+    if raw:
+        # A raw "|x" makes everything before it optional.
+        candidates = []
+    for literal, literal_offset in candidates:
+        if flags & re.IGNORECASE and literal.lower() != literal.upper():
+            # Case-folded text cannot be found with str.find().
+            continue
+        if best is None or len(literal) > len(best[0]):
+            best = literal, literal_offset
+    min_length, max_length = (0, None) if raw else width(pattern)
+    if best is None:
+        best = None, None
+    literals = None if flags & re.VERBOSE else alternatives(pattern.nodes)
+    fixed = None if flags & re.VERBOSE or max_length != min_length or \
+        max_length > MAX_CLASSES else classes(pattern.nodes)
+    return {'literal': best[0], 'offset': best[1],
+            'min_length': min_length, 'max_length': max_length,
+            'literals': literals if literals and all(literals) else None,
+            'classes': fixed or None}
+
+def _has_raw(nodes):
+    """Whether any of ``nodes`` holds a Raw fragment."""
+    stack = list(nodes)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ir.Raw):
+            return True
+        if isinstance(node, ir.Quantifier):
+            if node.child is not None:
+                stack.append(node.child)
+        else:
+            stack.extend(getattr(node, 'body', None) or getattr(node, 'branches', None) or
+                         getattr(node, 'nodes', None) or ())
+    return False
+
+def _add(total, extra):
+    return None if total is None or extra is None else total + extra
+
+def _text(node):
+    """The exact text ``node`` always matches, or None."""
+    if isinstance(node, ir.Literal):
+        return node.text
+    if isinstance(node, ir.CharClass) and not node.ranges and not node.category \
+            and not node.negated and len(node.chars) == 1 and node.chars not in '\\^':
+        return node.chars
+    if isinstance(node, ir.Group):
+        parts = [_text(child) for child in node.body]
+        if None not in parts:
+            return ''.join(parts)
+    if isinstance(node, ir.Quantifier) and node.child is not None and node.min == node.max:
+        text = _text(node.child)
+        if text is not None:
+            return text * node.min
+    return None
+
+def alternatives(nodes):
+    """The texts the sequence ``nodes`` matches, in the order the regex
+    tries them, when it only chooses between literals; None otherwise."""
+    if len(nodes) == 1 and isinstance(nodes[0], ir.Alternation):
+        texts = []
+        for branch in nodes[0].branches:
+            branch_texts = alternatives((branch, ))
+            if branch_texts is None:
+                return None
+            texts.extend(branch_texts)
+        return texts
+    if len(nodes) == 1 and type(nodes[0]) is ir.Group and not nodes[0].capture:
+        return alternatives(nodes[0].body)
+    parts = [_text(node) for node in nodes]
+    if None in parts:
+        return None
+    return [''.join(parts)]
+
+def classes(nodes):
+    """Regex source of the class matching each character of the sequence
+    ``nodes``, when nothing else (anchors, alternatives, repeats of varying
+    length) is involved; None otherwise."""
+    from .emitter import emit
+    result = []
+    for node in nodes:
+        if isinstance(node, ir.Literal):
+            result.extend(re.escape(char) for char in node.text)
+        elif isinstance(node, (ir.CharClass, ir.AnyChar)):
+            result.append(emit(node))
+        elif isinstance(node, ir.Group) and not node.capture:
+            body = classes(node.body)
+            if body is None:
+                return None
+            result.extend(body)
+        elif isinstance(node, ir.Quantifier) and node.child is not None and \
+                node.min == node.max:
+            child = classes((node.child, ))
+            if child is None:
+                return None
+            result.extend(child * node.min)
+        else:
+            return None
+    return result
+
+def _required(node):
+    """Literals that occur in every text ``node`` matches."""
+    text = _text(node)
+    if text is not None:
+        return [text] if text else []
+    if isinstance(node, ir.Quantifier) and node.child is not None and node.min >= 1:
+        return _required(node.child)
+    if isinstance(node, ir.Group):
+        required = []
+        run = []
+        for child in node.body:
+            text = _text(child)
+            if text is not None:
+                run.append(text)
+                continue
+            if run:
+                required.append(''.join(run))
+                run = []
+            required.extend(_required(child))
+        if run:
+            required.append(''.join(run))
+        return [literal for literal in required if literal]
+    return []
+
+def width(node):
+    """(min, max) number of characters ``node`` matches; max None: unbounded."""
+    if isinstance(node, ir.Literal):
+        return len(node.text), len(node.text)
+    if isinstance(node, (ir.CharClass, ir.AnyChar)):
+        return 1, 1
+    if isinstance(node, (ir.Anchor, ir.Lookaround)):
+        return 0, 0
+    if isinstance(node, ir.Quantifier):
+        if node.child is None:
+            return 0, 0
+        low, high = width(node.child)
+        if node.max is None:
+            return low * node.min, 0 if high == 0 else None
+        return low * node.min, None if high is None else high * node.max
+    if isinstance(node, (ir.Group, ir.Pattern)):
+        low, high = 0, 0
+        for child in getattr(node, 'body', None) or getattr(node, 'nodes', ()):
+            child_low, child_high = width(child)
+            low += child_low
+            high = _add(high, child_high)
+        return low, high
+    if isinstance(node, ir.Alternation):
+        if not node.branches:
+            return 0, 0
+        widths = [width(branch) for branch in node.branches]
+        highs = [high for _, high in widths]
+        return min(low for low, _ in widths), None if None in highs else max(highs)
+    # Raw fragments could match anything.
+    return 0, None
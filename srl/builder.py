@@ -3,101 +3,136 @@
 import re
 import copy
 
-from .parsers.parse import parse
+from . import ir
+from .emitter import emit
+from .pattern import compile_ir
+
+try:
+    basestring
+except NameError:
+    basestring = str
 
 class LazyError(Exception): pass
 
+def _mutable(name):
+    """Attribute whose assignment marks the builder dirty, like a call."""
+    attr = '_' + name
+
+    def set_value(self, value):
+        setattr(self, attr, value)
+        self._touch()
+    return property(lambda self: getattr(self, attr), set_value)
+
 class Builder(object):
 
     def __init__(self, regex=None, flags=0, group='%s'):
-        self.regex = regex or []
+        # The query as IR nodes; plain regex strings are kept as Raw nodes.
+        self.nodes = [node if isinstance(node, ir.Node) else ir.Raw(node)
+                      for node in regex or []]
         self.flags = flags or 0
-        self.compiled = None
         self.group = group or '%s'
+        self.backtrack_limit = None
+        self.redos = None
+        self._touch()
+
+    flags = _mutable('flags')
+    group = _mutable('group')
+    backtrack_limit = _mutable('backtrack_limit')
+    redos = _mutable('redos')
+
+    @property
+    def regex(self):
+        # A tuple: the query lives in ``nodes``, so appending to a list
+        # rendered from them would be silently lost.
+        return tuple(node.render() for node in self.nodes)
+
+    def _touch(self):
+        # Every mutation goes through here: the rendered source and the
+        # compiled pattern are rebuilt on their next use.
+        self._source = None
+        self.compiled = None
 
-    def literally(self, char):
-        if char in {'+', '\\'}:
-            char = '\\' + char
-        self.regex.append(r'(?:%s)' % char)
+    def _push(self, node):
+        ir.append(self.nodes, node)
+        self._touch()
         return self
 
-    def digit(self, start='0', end='9'):
-        self.regex.append(r'[%s-%s]' % (start, end))
+    def _pop(self):
+        node = self.nodes.pop()
+        self._touch()
+        return self, node
+
+    def _last(self):
+        return self.nodes[-1] if self.nodes else None
+
+    def _with_flags(self, flags):
+        self.flags = flags
         return self
 
+    def _with_limit(self, limit):
+        self.backtrack_limit = limit
+        return self
+
+    def literally(self, char):
+        return self._push(ir.Literal(char))
+
+    def digit(self, start='0', end='9'):
+        return self._push(ir.CharClass(((str(start), str(end)), )))
+
     number = digit
 
     def letter(self, start='a', end='z'):
-        self.regex.append(r'[%s-%s]' % (start, end))
-        return self
+        return self._push(ir.CharClass(((start, end), )))
 
     def noCharacter(self):
-        self.regex.append(r'\W')
-        return self
+        return self._push(ir.CharClass(category='word', negated=True))
 
     def uppercaseLetter(self, start='A', end='Z'):
-        self.regex.append(r'[%s-%s]' % (start, end, ))
-        return self
+        return self._push(ir.CharClass(((start, end), )))
 
     def anyCharacter(self):
-        self.regex.append(r'\w')
-        return self
+        return self._push(ir.CharClass(category='word'))
 
     def anything(self):
-        self.regex.append(r'.')
-        return self
+        return self._push(ir.AnyChar())
 
     def newLine(self):
-        self.regex.append(r'\n')
-        return self
+        return self._push(ir.CharClass(chars='\n'))
 
     def whitespace(self):
-        self.regex.append(r'\s')
-        return self
+        return self._push(ir.CharClass(category='space'))
 
     def noWhitespace(self):
-        self.regex.append(r'\S')
-        return self
+        return self._push(ir.CharClass(category='space', negated=True))
 
     def tab(self):
-        self.regex.append(r'\t')
-        return self
+        return self._push(ir.CharClass(chars='\t'))
 
     def raw(self, string):
-        self.regex.append(string)
-        return self
+        return self._push(ir.Raw(string))
 
     def between(self, start, end):
-        self.regex.append(r'{%d,%d}' % (start, end))
-        return self
+        return self._push(ir.Quantifier(None, start, end))
 
     def onceOrMore(self):
-        self.regex.append(r'+')
-        return self
+        return self._push(ir.Quantifier(None, 1, None))
 
     def neverOrMore(self):
-        self.regex.append(r'*')
-        return self
+        return self._push(ir.Quantifier(None, 0, None))
 
     def optional(self):
-        self.regex.append(r'?')
-        return self
+        return self._push(ir.Quantifier(None, 0, 1))
 
     def firstMatch(self):
-        if self.get()[-1] not in '+*}?':
-            if self.regex[-1][-1] == ')' and self.get()[-2] in '+*}?':
-                self.regex.append(self.revertLast()[0:-1] + '?)')
-                return self
+        node = ir.lazy(self._last())
+        if node is None:
             raise LazyError('Cannot apply laziness at this point. Only applicable after quantifiers.')
-        else:
-            self.regex.append(r'?')
-            return self
+        return self._pop()[0]._push(node)
 
     lazy = firstMatch
 
     def exactly(self, count):
-        self.regex.append(r'{%d}' % count)
-        return self
+        return self._push(ir.Quantifier(None, count, count))
 
     def once(self):
         return self.exactly(1)
@@ -106,25 +141,25 @@ class Builder(object):
         return self.exactly(2)
 
     def atLeast(self, number):
-        self.regex.append(r'{%d,}' % number)
-        return self
+        return self._push(ir.Quantifier(None, number, None))
 
     def addClosure(self, builder, conditions, exploder=''):
         if isinstance(conditions, basestring):
             subquery = builder.literally(conditions)
         elif callable(conditions):
             subquery = conditions(builder)
-        elif isinstance(conditions, tuple) and conditions[0] == 'lambda' and isinstance(conditions[1], list):
-            def callable_conditions(q):
-                for method, arg in conditions[1]:
-                    q = getattr(q, method)(*arg)
-                return q
-            subquery = callable_conditions(builder)
+        elif isinstance(conditions, (list, tuple)):
+            # A parsed sub-query: IR nodes.
+            subquery = builder
+            for node in conditions:
+                subquery = subquery._push(node)
         else:
             subquery = builder.raw(conditions.get())
 
-        self.regex.append(subquery.get(exploder))
-        return self
+        query = self
+        for node in ir.wrap(builder.group, subquery.nodes, exploder == '|'):
+            query = query._push(node)
+        return query
 
     def capture(self, conditions, name=None):
         builder = Builder()
@@ -143,15 +178,14 @@ class Builder(object):
 
     def until(self, conditions):
         try:
-            self.lazy()
+            query = self.lazy()
         except LazyError:
-            pass
+            query = self
         builder = Builder()
-        return self.addClosure(builder, conditions)
+        return query.addClosure(builder, conditions)
 
     def oneOf(self, chars):
-        self.regex.append(r'[%s]' % chars)
-        return self
+        return self._push(ir.CharClass(chars=chars))
 
     def ifFollowedBy(self, conditions):
         builder = Builder()
@@ -166,53 +200,93 @@ class Builder(object):
     def ifAlreadyHad(self, conditions):
         builder = Builder()
         builder.group = r'(?<=%s)'
-        previous_cond = self.revertLast()
-        self.addClosure(builder, conditions)
-        self.regex.append(previous_cond)
-        return self
+        query, previous_cond = self._pop()
+        return query.addClosure(builder, conditions)._push(previous_cond)
 
     def ifNotAlreadyHad(self, conditions):
         builder = Builder()
         builder.group = r'(?<!%s)'
-        previous_cond = self.revertLast()
-        self.addClosure(builder, conditions)
-        self.regex.append(previous_cond)
-        return self
+        query, previous_cond = self._pop()
+        return query.addClosure(builder, conditions)._push(previous_cond)
 
     def beginWith(self):
-        self.regex.append(r'^') # FIXME: assert
-        return self
+        return self._push(ir.Anchor(ir.Anchor.BEGIN))
 
     startWith = beginWith
 
     def mustEnd(self):
-        self.regex.append(r'$')
-        return self
+        return self._push(ir.Anchor(ir.Anchor.END))
 
     def caseInsensitive(self):
-        self.flags = self.flags | re.IGNORECASE
-        return self
+        return self._with_flags(self.flags | re.IGNORECASE)
 
     def multiLine(self):
-        self.flags = self.flags | re.MULTILINE
-        return self
+        return self._with_flags(self.flags | re.MULTILINE)
 
     def allLazy(self):
-        self.regex.append(r'?') # FIXME: assert
-        return self
+        return self._push(ir.Lazy(True))
+
+    def backtrackLimit(self, limit):
+        """Match with srl.engines.backtrack, which raises
+        PregBacktrackLimitError when an attempt takes more than ``limit``
+        steps. None goes back to ``re``."""
+        return self._with_limit(limit)
 
     def revertLast(self):
-        return self.regex.pop()
+        return self._pop()[1].render()
 
     def __and__(self, conditions):
         builder = Builder(group=self.group)
         return self.addClosure(builder, conditions)
 
     def get(self, implode=r''):
-        return self.group % implode.join(self.regex)
-
-    def compile(self):
-        self.compiled = re.compile(self.get(), self.flags)
+        if implode:
+            return self.group % implode.join(self.regex)
+        if self._source is None:
+            self._source = emit(self.nodes)
+        return self.group % self._source
+
+    def get_optimized(self):
+        from .optimize import optimize
+        return self.group % emit(optimize(self.to_ir()), compact=True)
+
+    def to_ir(self):
+        return ir.Pattern(tuple(self.nodes), self.flags)
+
+    def complexity(self):
+        """'linear', 'polynomial' or 'exponential': how the time ``re``
+        needs for this query can grow with the input (see srl.redos)."""
+        from .redos import complexity
+        return complexity(self.to_ir())
+
+    def compile(self, redos=None):
+        """Compile the query, once.
+
+        ``redos`` protects queries that are not linear (see complexity()):
+        ``'rewrite'`` adds atomic groups where they cannot change a match
+        (Python 3.11 and later), ``'route'`` matches with the linear-time
+        pike engine; each falls back to the other. The mode is kept for
+        later compilations.
+        """
+        if redos is not None and redos != self.redos:
+            from .redos import MODES
+            if redos not in MODES:
+                raise ValueError('unknown redos mode %r, expected one of %s'
+                                 % (redos, ', '.join(MODES)))
+            self.redos = redos
+        if self.compiled is None and self.backtrack_limit is not None:
+            from .engines import compile_engine
+            self.compiled = compile_engine(self.to_ir(), self.get(), 'backtrack',
+                                           backtrack_limit=self.backtrack_limit)
+        elif self.compiled is None and self.redos is not None:
+            from .engines import compile_engine
+            from .redos import protect
+            pattern = self.to_ir()
+            protected, engine = protect(pattern, self.redos)
+            source = self.get() if protected == pattern else self.group % emit(protected.nodes)
+            self.compiled = compile_engine(protected, source, engine)
+        elif self.compiled is None:
+            self.compiled = compile_ir(self.to_ir(), self.get(), self.flags)
         return self
 
     def is_valid(self):
@@ -223,52 +297,165 @@ class Builder(object):
             return False
 
     def is_matching(self, string):
-        if not self.compiled:
-            self.compile()
-        return bool(self.compiled.match(string, self.flags))
+        return bool(self.compile().compiled.match(string))
 
     def match(self, string):
-        if not self.compiled:
-            self.compile()
-        return self.compiled.match(string, self.flags)
+        return self.compile().compiled.match(string)
 
     def getMatches(self, string):
-        if not self.compiled:
-            self.compile()
-        match = self.compiled.search(string)
+        match = self.compile().compiled.search(string)
         if match:
             return list(match.groups())
 
     def findall(self, string):
-        if not self.compiled:
-            self.compile()
-        return self.compiled.findall(string, self.flags)
+        return self.compile().compiled.findall(string)
 
     def split(self, string):
-        if not self.compiled:
-            self.compile()
-        return self.compiled.split(string, self.flags)
+        return self.compile().compiled.split(string)
 
     def sub(self, repl, string):
-        if not self.compiled:
-            self.compile()
-        return self.compiled.sub(repl, string, self.flags)
+        return self.compile().compiled.sub(repl, string)
 
     replace = sub
 
     def subn(self, repl, string):
-        if not self.compiled:
-            self.compile()
-        return self.compiled.subn(repl, string, self.flags)
+        return self.compile().compiled.subn(repl, string)
 
     filter = subn
 
     @classmethod
-    def parse(cls, string):
-        builder = cls()
-        parsed = parse(string)
-        if not parsed:
+    def from_dsl(cls, string, flags=0):
+        # Imported here so Builder-only users never load the PLY machinery.
+        from .parsers.parse import parse
+        pattern = parse(string)
+        if pattern is None:
             raise Exception('Invalid Simple Regex')
-        for method, arg in parsed:
-            builder = getattr(builder, method)(*arg)
-        return builder.compile().compiled
+        return cls(pattern.nodes, flags | pattern.flags)
+
+    @classmethod
+    def parse_ir(cls, string, flags=0, optimize=False):
+        """The IR of a query, with ``flags`` folded in.
+
+        ``optimize`` runs the peephole pass from srl.optimize.
+        """
+        from .parsers.parse import parse
+        pattern = parse(string)
+        if pattern is None:
+            raise Exception('Invalid Simple Regex')
+        if optimize:
+            from .optimize import optimize as optimize_pattern
+            pattern = optimize_pattern(pattern, flags)
+        return pattern.replace(flags=flags | pattern.flags)
+
+    @classmethod
+    def translate(cls, string, flags=0, optimize=False):
+        """Regex source and flags for a query, without building a Builder."""
+        pattern = cls.parse_ir(string, flags, optimize)
+        return emit(pattern, compact=optimize), pattern.flags
+
+    @classmethod
+    def parse(cls, string, flags=0, optimize=False):
+        pattern = cls.parse_ir(string, flags, optimize)
+        return compile_ir(pattern, emit(pattern, compact=optimize), pattern.flags)
+
+
+class FrozenBuilder(Builder):
+    """Persistent Builder: every call returns a new builder, the receiver is
+    never modified.
+
+    The query is a linked list of ``(node, rest)`` cells shared with the
+    builder it was derived from, so forking a common prefix is O(1). Each
+    builder memoizes its own source and compiled pattern; the source of a
+    builder that only appended to its parent reuses the parent's.
+    """
+
+    def __init__(self, regex=None, flags=0, group='%s'):
+        tail = None
+        for node in Builder(regex).nodes:
+            tail = (node, tail)
+        self._tail = tail
+        self._parent = None
+        self._nodes = None
+        self.flags = flags or 0
+        self.group = group or '%s'
+        self.backtrack_limit = None
+        self.redos = None
+        self._touch()
+
+    def _derive(self, tail, flags, parent=None):
+        builder = object.__new__(type(self))
+        builder._tail = tail
+        builder._parent = parent
+        builder._nodes = None
+        builder.flags = flags
+        builder.group = self.group
+        builder.backtrack_limit = self.backtrack_limit
+        builder.redos = self.redos
+        builder._touch()
+        return builder
+
+    @property
+    def nodes(self):
+        if self._nodes is None:
+            nodes = []
+            tail = self._tail
+            while tail is not None:
+                nodes.append(tail[0])
+                tail = tail[1]
+            nodes.reverse()
+            self._nodes = tuple(nodes)
+        return self._nodes
+
+    def _push(self, node):
+        tail = self._tail
+        # ir.append() decides whether the node extends or rewrites the last one.
+        if tail is None:
+            rest, nodes = None, []
+        else:
+            rest, nodes = tail[1], [tail[0]]
+        ir.append(nodes, node)
+        if tail is not None and len(nodes) == 2 and nodes[0] is tail[0]:
+            return self._derive((nodes[1], tail), self.flags, self)
+        # A rewritten last node still extends whatever this builder extended.
+        parent = self._parent if len(nodes) == 1 else None
+        for node in nodes:
+            rest = (node, rest)
+        return self._derive(rest, self.flags, parent)
+
+    def _pop(self):
+        node, rest = self._tail
+        return self._derive(rest, self.flags), node
+
+    def _last(self):
+        return self._tail[0] if self._tail else None
+
+    def _with_flags(self, flags):
+        return self._derive(self._tail, flags)
+
+    def _with_limit(self, limit):
+        builder = self._derive(self._tail, self.flags, self._parent)
+        builder.backtrack_limit = limit
+        return builder
+
+    def compile(self, redos=None):
+        """Compile the query, once; a new ``redos`` mode returns a new
+        builder compiled in that mode (see Builder.compile())."""
+        if redos is not None and redos != self.redos:
+            return Builder.compile(self._derive(self._tail, self.flags, self._parent), redos)
+        return Builder.compile(self)
+
+    def revertLast(self):
+        return self._pop()[0]
+
+    def get(self, implode=r''):
+        if not implode and self._source is None and self._parent is not None:
+            # Only emit the nodes added since the nearest rendered ancestor.
+            added = []
+            builder = self
+            while builder._parent is not None and builder._source is None:
+                added.append(builder._tail[0])
+                builder = builder._parent
+            if builder._source is not None:
+                added.reverse()
+                self._source = builder._source + emit(added)
+        return super(FrozenBuilder, self).get(implode)
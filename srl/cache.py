@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import sys
+import threading
+from collections import namedtuple, OrderedDict
+
+DEFAULT_CACHE_SIZE = 512
+
+CacheInfo = namedtuple('CacheInfo', 'hits misses evictions maxsize currsize')
+
+class LRUCache(object):
+    """Thread-safe least-recently-used mapping with hit/miss counters.
+
+    ``maxsize=None`` makes the cache unbounded, ``maxsize=0`` disables it.
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            if self.maxsize == 0:
+                return
+            self._data[key] = value
+            self._evict()
+
+    def get_or_create(self, key, factory):
+        # The factory runs outside the lock so a slow compile never blocks
+        # lookups of other keys; concurrent misses on one key may both run it.
+        marker = self._data
+        value = self.get(key, marker)
+        if value is marker:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def resize(self, maxsize):
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions,
+                             self.maxsize, len(self._data))
+
+    def _evict(self):
+        if self.maxsize is None:
+            return
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+# Process-wide cache of DSL (plus flags) to compiled pattern, used by SRL().
+compiled_cache = LRUCache()
+
+def cache_info():
+    return compiled_cache.info()
+
+def cache_clear():
+    compiled_cache.clear()
+
+def set_cache_size(maxsize):
+    compiled_cache.resize(maxsize)
+
+def translator_fingerprint():
+    """Hash of the interpreter version and every module under srl/.
+
+    Any change to the grammar, the lexer or the Builder changes it, which
+    invalidates translations persisted by an older version.
+    """
+    import hashlib
+    digest = hashlib.sha1(('%d.%d' % sys.version_info[:2]).encode('ascii'))
+    root = os.path.dirname(os.path.abspath(__file__))
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.endswith('.py'):
+                with open(os.path.join(dirpath, name), 'rb') as source:
+                    digest.update(source.read())
+    return digest.hexdigest()
+
+class DiskCache(object):
+    """Persistent map of DSL and flags to the translated regex, its flags and
+    its srl.analysis results.
+
+    Backed by a sqlite file in WAL mode so several processes can read and
+    write it at once. Every error is treated as a miss: the cache is only
+    ever an optimisation.
+    """
+
+    # Rows read into memory when the file is opened, so that startup cost and
+    # memory stay bounded however large the cache grows.
+    PRELOAD_ROWS = 1024
+
+    def __init__(self, path, timeout=30.0):
+        import sqlite3
+        self.path = path
+        self.timeout = timeout
+        self.version = translator_fingerprint()
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        try:
+            self._rows = dict((key, (regex, flags, info)) for key, regex, flags, info in
+                              self._connection().execute('SELECT * FROM patterns LIMIT ?',
+                                                         (self.PRELOAD_ROWS, )))
+        except sqlite3.Error:
+            self._rows = {}
+
+    def _connection(self):
+        import sqlite3
+        # sqlite connections must not cross threads or forks.
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout,
+                                         isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            # WAL only needs to fsync on checkpoints to stay consistent.
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                connection.execute('CREATE TABLE IF NOT EXISTS meta '
+                                   '(name TEXT PRIMARY KEY, value TEXT)')
+                row = connection.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+                if row is None or row[0] != self.version:
+                    # Older versions may also have stored different columns.
+                    connection.execute('DROP TABLE IF EXISTS patterns')
+                    connection.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)",
+                                       (self.version, ))
+                connection.execute('CREATE TABLE IF NOT EXISTS patterns '
+                                   '(key TEXT PRIMARY KEY, regex TEXT, flags INTEGER, info TEXT)')
+                connection.execute('COMMIT')
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+            local.connection = connection
+            local.pid = os.getpid()
+        return local.connection
+
+    def key(self, dsl, flags, optimize=False):
+        import hashlib
+        text = u'%s\0%d%s\0%s' % (self.version, flags, 'o' if optimize else '', dsl)
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def get(self, dsl, flags=0, optimize=False):
+        import sqlite3
+        key = self.key(dsl, flags, optimize)
+        # Rows preloaded when the file was opened are served from memory;
+        # anything else comes from the database.
+        row = self._rows.get(key)
+        if row is None:
+            try:
+                row = self._connection().execute(
+                    'SELECT regex, flags, info FROM patterns WHERE key = ?',
+                    (key, )).fetchone()
+            except sqlite3.Error:
+                row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0], row[1], json.loads(row[2]) if row[2] else None
+
+    def set(self, dsl, flags, regex, regex_flags, optimize=False, info=None):
+        import sqlite3
+        try:
+            self._connection().execute(
+                'INSERT OR REPLACE INTO patterns VALUES (?, ?, ?, ?)',
+                (self.key(dsl, flags, optimize), regex, regex_flags,
+                 json.dumps(info, sort_keys=True) if info else None))
+        except sqlite3.Error:
+            pass
+
+    def clear(self):
+        import sqlite3
+        self._rows.clear()
+        try:
+            self._connection().execute('DELETE FROM patterns')
+        except sqlite3.Error:
+            pass
+
+# Opt-in persistent layer consulted by SRL() on in-memory misses.
+disk_cache = None
+
+def enable_disk_cache(path, timeout=30.0):
+    global disk_cache
+    disk_cache = DiskCache(path, timeout)
+    return disk_cache
+
+def disable_disk_cache():
+    global disk_cache
+    disk_cache = None
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""Single-pass IR to regex code generator.
+
+emit() walks the node tree with an explicit stack and appends every piece
+of the regex to one buffer, joined once at the end. Nothing is allocated
+per node beyond the pieces themselves, and nesting depth is not limited
+by the recursion limit.
+"""
+
+from . import ir
+
+_CATEGORIES = {('word', False): r'\w', ('word', True): r'\W',
+               ('space', False): r'\s', ('space', True): r'\S'}
+
+def _literal(node, write, stack):
+    write('(?:')
+    write(ir.escape(node.text))
+    write(')')
+
+def _char_class(node, write, stack):
+    if node.category:
+        write(_CATEGORIES[node.category, node.negated])
+    elif not node.ranges and len(node.chars) == 1 and not node.negated:
+        write(ir.escape(node.chars))
+    else:
+        write('[^' if node.negated else '[')
+        for start, end in node.ranges:
+            write(start)
+            write('-')
+            write(end)
+        write(node.chars)
+        write(']')
+
+def _any_char(node, write, stack):
+    write('.')
+
+def _raw(node, write, stack):
+    write(node.regex)
+
+def _anchor(node, write, stack):
+    write('^' if node.kind == ir.Anchor.BEGIN else '$')
+
+def _quantifier(node, write, stack):
+    stack.append(node.suffix())
+    if node.child is not None:
+        stack.append(node.child)
+
+# Compact emission writes literals without a group unless a suffix follows
+# or a preceding fragment could absorb a leading digit (as in \1).
+
+def _compact_literal(node, write, stack):
+    if node.text[:1].isdigit():
+        _literal(node, write, stack)
+    else:
+        write(ir.escape(node.text))
+
+def _compact_quantifier(node, write, stack):
+    child = node.child
+    if isinstance(child, ir.Literal) and len(child.text) == 1 and not child.text.isdigit():
+        write(ir.escape(child.text))
+        write(node.suffix())
+    elif isinstance(child, ir.Literal):
+        _literal(child, write, stack)
+        write(node.suffix())
+    else:
+        _quantifier(node, write, stack)
+
+def _open(prefix, body, write, stack):
+    write(prefix)
+    stack.append(')')
+    stack.extend(reversed(body))
+
+def _group(node, write, stack):
+    if not node.capture:
+        prefix = '(?:'
+    elif node.name:
+        prefix = '(?P<%s>' % node.name
+    else:
+        prefix = '('
+    _open(prefix, node.body, write, stack)
+
+def _atomic(node, write, stack):
+    _open('(?>', node.body, write, stack)
+
+def _alternation(node, write, stack):
+    write('(?:')
+    stack.append(')')
+    branches = node.branches
+    for index in range(len(branches) - 1, 0, -1):
+        stack.append(branches[index])
+        stack.append('|')
+    if branches:
+        stack.append(branches[0])
+
+def _lookaround(node, write, stack):
+    prefix = '(?%s%s' % ('<' if node.behind else '', '!' if node.negative else '=')
+    _open(prefix, node.body, write, stack)
+
+def _pattern(node, write, stack):
+    stack.extend(reversed(node.nodes))
+
+_EMITTERS = {
+    ir.Literal: _literal,
+    ir.CharClass: _char_class,
+    ir.AnyChar: _any_char,
+    ir.Raw: _raw,
+    ir.Anchor: _anchor,
+    ir.Quantifier: _quantifier,
+    ir.Group: _group,
+    ir.Atomic: _atomic,
+    ir.Alternation: _alternation,
+    ir.Lookaround: _lookaround,
+    ir.Pattern: _pattern,
+}
+
+def _compact_alternation(node, write, stack):
+    # Alternatives are delimited by "|" already, so non-capturing groups
+    # around whole branches are redundant.
+    write('(?:')
+    stack.append(')')
+    branches = node.branches
+    for index in range(len(branches) - 1, -1, -1):
+        branch = branches[index]
+        if type(branch) is ir.Group and not branch.capture:
+            stack.extend(reversed(branch.body))
+        else:
+            stack.append(branch)
+        if index:
+            stack.append('|')
+
+_COMPACT_EMITTERS = dict(_EMITTERS)
+_COMPACT_EMITTERS.update({
+    ir.Literal: _compact_literal,
+    ir.Quantifier: _compact_quantifier,
+    ir.Alternation: _compact_alternation,
+})
+
+def emit(nodes, compact=False):
+    """Regex source for a node, or for a sequence of nodes.
+
+    ``compact`` drops the group around literals where it is not needed.
+    Nodes holding a Raw fragment are always emitted in full: the fragment
+    may apply to its neighbours (``raw "+"`` after ``(?:ab)``).
+    """
+    buffer = []
+    write = buffer.append
+    stack = [nodes] if isinstance(nodes, ir.Node) else list(reversed(nodes))
+    pop = stack.pop
+    if compact:
+        from .analysis import _has_raw
+        compact = not _has_raw(stack)
+    emitters = _COMPACT_EMITTERS if compact else _EMITTERS
+    while stack:
+        item = pop()
+        if item.__class__ is str:
+            write(item)
+        else:
+            emitters[type(item)](item, write, stack)
+    return ''.join(buffer)
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""Matching engines other than ``re``.
+
+compile_engine() returns an object with the API of a compiled ``re``
+pattern (search, match, fullmatch, finditer, findall, split, sub, subn).
+Engines only accept the part of the IR they can run and raise
+UnsupportedPatternException for the rest.
+
+``'dfa'``
+    Lazily built DFA (srl.engines.dfa): time linear in the input, no
+    groups, no lookarounds and no Raw fragments.
+``'pike'``
+    The same DFA plus a Pike VM (srl.engines.pike) that fills in groups:
+    still linear, and groups are reported like ``re`` does.
+``'backtrack'``
+    Backtracking with a step budget (srl.engines.backtrack): runs
+    lookarounds too, and raises PregBacktrackLimitError instead of
+    running away on hostile input.
+"""
+
+from ..errors import UnsupportedPatternException
+
+ENGINES = ('re', 'dfa', 'pike', 'backtrack')
+
+def compile_engine(pattern, regex, engine, **options):
+    """Compiled ``pattern`` (whose emitted source is ``regex``) for ``engine``."""
+    if engine == 're':
+        from ..pattern import compile_ir
+        return compile_ir(pattern, regex, pattern.flags)
+    if engine == 'dfa':
+        from .dfa import DFAPattern
+        return DFAPattern(pattern, regex, **options)
+    if engine == 'pike':
+        from .pike import PikePattern
+        return PikePattern(pattern, regex, **options)
+    if engine == 'backtrack':
+        from .backtrack import BacktrackPattern
+        return BacktrackPattern(pattern, regex, **options)
+    raise ValueError('unknown engine %r, expected one of %s' % (engine, ', '.join(ENGINES)))
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""Aho-Corasick automaton for sets of literals.
+
+The automaton is a complete DFA stored in one ``array('i')``: row ``s`` of
+the table holds the next state for every column, and a state is stored as
+the offset of its row, negated when some literal ends there. Columns are
+the distinct characters of the literals (or, ignoring case, the classes
+of characters ``re`` folds together), column 0 being every other
+character; ``str.translate`` maps a chunk of text to column numbers in C
+before the scanning loop reads it.
+
+Matches are reported as spans, in the order ``re`` finds them for the
+alternation of the literals: leftmost first and, at one position, the
+literal that comes first in the list.
+"""
+
+import re
+from array import array
+
+from .nfa import char_test
+
+try:
+    chr_ = unichr
+except NameError:
+    chr_ = chr
+
+# First chunk of text translated at once; doubled while nothing is found.
+_CHUNK = 256
+
+# Below these sizes sre, which tries the alternatives one by one at every
+# position but does so in C, is faster than this pure-Python scan. Case
+# folding slows sre down much more.
+MIN_LITERALS = 48
+MIN_LITERALS_IGNORECASE = 16
+
+def worthwhile(literals, flags=0):
+    """Whether searching for ``literals`` is faster with an automaton."""
+    return len(literals) >= (MIN_LITERALS_IGNORECASE if flags & re.IGNORECASE
+                             else MIN_LITERALS)
+
+class _Columns(dict):
+    """Ordinal of a character to its column, computed on first use."""
+
+    def __init__(self, flags):
+        dict.__init__(self)
+        self.flags = flags
+        self.tests = []
+
+    def add(self, char):
+        column = self.get(ord(char))
+        if column is None:
+            if self.flags & re.IGNORECASE:
+                column = self._fold(char)
+            if not column:
+                self.tests.append(char_test(re.escape(char), self.flags))
+                column = len(self.tests)
+            self[ord(char)] = column
+        return column
+
+    def _fold(self, char):
+        for column, test in enumerate(self.tests, 1):
+            if test(char):
+                return column
+        return 0
+
+    def __missing__(self, ordinal):
+        column = self._fold(chr_(ordinal)) if self.flags & re.IGNORECASE else 0
+        self[ordinal] = column
+        return column
+
+class AhoCorasick(object):
+    """Finds occurrences of any of ``literals`` (non-empty strings), with
+    the case folding of ``re`` when ``flags`` hold IGNORECASE."""
+
+    def __init__(self, literals, flags=0):
+        self.literals = list(literals)
+        self.flags = flags
+        columns = self._columns = _Columns(flags)
+        # Trie first: children per state, literals ending there.
+        children = [{}]
+        ends = [[]]
+        for index, literal in enumerate(self.literals):
+            if not literal:
+                raise ValueError('literals must not be empty')
+            state = 0
+            for char in literal:
+                column = columns.add(char)
+                following = children[state].get(column)
+                if following is None:
+                    following = children[state][column] = len(children)
+                    children.append({})
+                    ends.append([])
+                state = following
+            ends[state].append((len(literal), index))
+        self.width = width = len(columns.tests) + 1
+        self.states = len(children)
+        self.longest = max(len(literal) for literal in self.literals) if self.literals else 0
+        # Breadth first: complete the rows with failure transitions and
+        # collect the literals of each state's suffixes.
+        table = array('i', [0]) * (width * len(children))
+        fail = [0] * len(children)
+        self._outputs = outputs = {}
+        queue = []
+        for column, child in children[0].items():
+            table[column] = child
+            queue.append(child)
+        for state in queue:
+            found = ends[state] + list(outputs.get(fail[state] * width, ()))
+            if found:
+                outputs[state * width] = tuple(sorted(found, key=lambda end: end[1]))
+            row = state * width
+            back = fail[state] * width
+            for column in range(width):
+                child = children[state].get(column)
+                if child is None:
+                    table[row + column] = table[back + column]
+                else:
+                    fail[child] = table[back + column] if state else 0
+                    table[row + column] = child
+                    queue.append(child)
+        # Rows as offsets, negative when literals end in the state.
+        for position in range(len(table)):
+            row = table[position] * width
+            table[position] = -row if row in outputs else row
+        self._table = table
+
+    def memory(self):
+        """Bytes held by the transition table."""
+        return self._table.itemsize * len(self._table)
+
+    def _codes(self, chunk):
+        codes = chunk.translate(self._columns)
+        if self.width <= 256:
+            return bytearray(codes, 'latin-1')
+        return [ord(code) for code in codes]
+
+    def _scan(self, string, pos, endpos):
+        """(end, outputs) for every position where literals end, scanning
+        from ``pos`` with an empty history."""
+        table = self._table
+        outputs = self._outputs
+        state = 0
+        size = _CHUNK
+        start = pos
+        while start < endpos:
+            stop = min(start + size, endpos)
+            end = start
+            for code in self._codes(string[start:stop]):
+                end += 1
+                state = table[state + code]
+                if state < 0:
+                    state = -state
+                    yield end, outputs[state]
+            start = stop
+            size *= 2
+
+    def find(self, string, pos=0, endpos=None):
+        """(start, end, index) of the leftmost-first occurrence at or after
+        ``pos``, or None."""
+        endpos = len(string) if endpos is None else min(endpos, len(string))
+        best = None
+        for end, found in self._scan(string, max(pos, 0), endpos):
+            for length, index in found:
+                start = end - length
+                if best is None or start < best[0] or start == best[0] and index < best[2]:
+                    best = start, end, index
+            # Whatever ends later starts later.
+            if end >= best[0] + self.longest:
+                break
+        return best
+
+    def finditer(self, string, pos=0, endpos=None):
+        """(start, end, index) of successive non-overlapping occurrences."""
+        endpos = len(string) if endpos is None else min(endpos, len(string))
+        pos = max(pos, 0)
+        while pos < endpos:
+            found = self.find(string, pos, endpos)
+            if found is None:
+                return
+            yield found
+            pos = found[1]
+
+    def findall(self, string, pos=0, endpos=None):
+        """Texts of successive non-overlapping occurrences."""
+        return [string[start:end] for start, end, _ in self.finditer(string, pos, endpos)]
+
+    def occurring(self, string, wanted=None):
+        """Set of the indexes of the literals that occur in ``string``,
+        overlaps included; stops early once ``wanted`` (a count) is found."""
+        result = set()
+        for _, found in self._scan(string, 0, len(string)):
+            for _, index in found:
+                result.add(index)
+            if wanted is not None and len(result) >= wanted:
+                break
+        return result
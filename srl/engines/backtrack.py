@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""Backtracking engine with a step budget.
+
+Runs the NFA program depth first, trying alternatives in the same order as
+sre, and counts every instruction it executes. When one attempt (a match
+from one start position) needs more than ``backtrack_limit`` steps the
+call raises PregBacktrackLimitError instead of running for as long as the
+pattern can backtrack -- the ``pcre.backtrack_limit`` of PHP, where SRL's
+error classes come from.
+
+Everything the IR expresses runs here, lookarounds and groups included,
+except Raw fragments.
+"""
+
+import re
+
+from .base import EnginePattern
+from .nfa import (compile_program, context_at, holds, CHAR, SPLIT, JUMP, ASSERT, SAVE,
+                  MATCH, LOOKEND, MARK, GUARD)
+from ..errors import PregBacktrackLimitError
+
+DEFAULT_BACKTRACK_LIMIT = 1000000
+
+class BacktrackPattern(EnginePattern):
+    """A pattern matched by backtracking, at most ``backtrack_limit`` steps
+    per start position."""
+
+    def __init__(self, pattern, regex, flags=0, backtrack_limit=DEFAULT_BACKTRACK_LIMIT):
+        self.ir = pattern
+        self.pattern = regex
+        self.backtrack_limit = backtrack_limit
+        # Before re.compile, as in DFAPattern.
+        self._program = compile_program(pattern, flags, backtrack=True)
+        self._full_program = compile_program(pattern, flags, full=True, backtrack=True)
+        self.flags = re.compile(regex, flags | pattern.flags).flags
+        self.groups = self._program.groups
+        self.groupindex = self._program.groupindex
+        self._nested = self._program.nested
+
+    def _attempt(self, program, string, start, endpos, empty=True):
+        slots = (-1, ) * (2 * self.groups + 2 + program.loops)
+        found = self._run(program, string, 0, start, endpos, slots,
+                          [self.backtrack_limit], None if empty else start)
+        if found is None:
+            return None
+        end, slots = found
+        return [(start, end)] + [(slots[2 * group], slots[2 * group + 1])
+                                 for group in range(1, self.groups + 1)]
+
+    def _run(self, program, string, pc, index, endpos, slots, budget, nonempty=None,
+             stop=None):
+        """(end, slots) of the first way to reach MATCH (or LOOKEND) from
+        ``pc`` at ``index``, or None.
+
+        ``budget`` is a one-item list of the steps left, shared with nested
+        lookaround runs. No match may end at ``nonempty``, and LOOKEND is
+        only reached at ``stop`` when it is set (lookbehinds).
+        """
+        insts = program.insts
+        loops = 2 * self.groups + 2
+        steps = budget[0]
+        stack = []
+        try:
+            while True:
+                while True:
+                    steps -= 1
+                    if steps < 0:
+                        raise PregBacktrackLimitError(
+                            'backtrack limit of %d steps exhausted' % self.backtrack_limit)
+                    inst = insts[pc]
+                    op = inst[0]
+                    if op == CHAR:
+                        if index < endpos and inst[1](string[index]):
+                            index += 1
+                            pc += 1
+                            continue
+                        break
+                    if op == SPLIT:
+                        stack.append((inst[2], index, slots))
+                        pc = inst[1]
+                    elif op == JUMP:
+                        pc = inst[1]
+                    elif op == SAVE or op == MARK:
+                        slot = inst[1] if op == SAVE else loops + inst[1]
+                        slots = slots[:slot] + (index, ) + slots[slot + 1:]
+                        pc += 1
+                    elif op == GUARD:
+                        # Another iteration only if this one consumed input.
+                        pc = pc + 1 if slots[loops + inst[1]] == index else inst[2]
+                    elif op == ASSERT:
+                        if not holds(inst[1], context_at(string, index, endpos)):
+                            break
+                        pc += 1
+                    elif op == MATCH:
+                        if index == nonempty:
+                            break
+                        return index, slots
+                    elif op == LOOKEND:
+                        if stop is not None and index != stop:
+                            break
+                        return index, slots
+                    else:
+                        behind, negative, width, following = inst[1:]
+                        found = None
+                        begin = index - width if behind else index
+                        if begin >= 0:
+                            budget[0] = steps
+                            found = self._run(program, string, pc + 1, begin, endpos, slots,
+                                              budget, stop=index if behind else None)
+                            steps = budget[0]
+                        if (found is None) != negative:
+                            break
+                        if found is not None:
+                            slots = found[1]
+                        pc = following
+                if not stack:
+                    return None
+                pc, index, slots = stack.pop()
+        finally:
+            budget[0] = steps
+
+    def _search(self, string, pos, endpos):
+        for start in range(pos, endpos + 1):
+            spans = self._attempt(self._program, string, start, endpos)
+            if spans is not None:
+                return spans
+        return None
+
+    def _match(self, string, pos, endpos, full=False, nonempty=False):
+        return self._attempt(self._full_program if full else self._program, string, pos,
+                             endpos, not nonempty)
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""Match objects and the ``re``-like API shared by the engines.
+
+An engine only has to find spans: ``_search`` (leftmost match at or after
+``pos``) and ``_match`` (match anchored at ``pos``). Everything else --
+finditer, findall, split, sub -- is built on those two here, with the same
+handling of empty matches as ``re`` (Python 3.7 and later).
+"""
+
+import re
+
+try:
+    basestring
+except NameError:
+    basestring = str
+
+class Match(object):
+    """Result of a successful match, with the interface of ``re`` matches."""
+
+    __slots__ = ('re', 'string', 'pos', 'endpos', '_spans')
+
+    def __init__(self, pattern, string, pos, endpos, spans):
+        self.re = pattern
+        self.string = string
+        self.pos = pos
+        self.endpos = endpos
+        # spans[0] is the whole match, spans[n] group n or (-1, -1).
+        self._spans = spans
+
+    def __repr__(self):
+        return '<srl.engines.Match object; span=%r, match=%r>' % (self.span(), self.group())
+
+    def _index(self, group):
+        if isinstance(group, basestring):
+            try:
+                return self.re.groupindex[group]
+            except KeyError:
+                raise IndexError('no such group')
+        if not 0 <= group < len(self._spans):
+            raise IndexError('no such group')
+        return group
+
+    def span(self, group=0):
+        return self._spans[self._index(group)]
+
+    def start(self, group=0):
+        return self.span(group)[0]
+
+    def end(self, group=0):
+        return self.span(group)[1]
+
+    @property
+    def regs(self):
+        return tuple(self._spans)
+
+    @property
+    def lastindex(self):
+        nested = self.re._nested
+        last = None
+        end = -1
+        for index in range(1, len(self._spans)):
+            start, stop = self._spans[index]
+            # The group that closed last: a later group ending at the same
+            # position closed after it, unless it is inside it.
+            if start >= 0 and (stop > end or stop == end and index > nested[last]):
+                last, end = index, stop
+        return last
+
+    @property
+    def lastgroup(self):
+        index = self.lastindex
+        for name, number in self.re.groupindex.items():
+            if number == index:
+                return name
+        return None
+
+    def _group(self, group, default=None):
+        start, end = self.span(group)
+        if start < 0:
+            return default
+        return self.string[start:end]
+
+    def group(self, *groups):
+        if not groups:
+            return self._group(0)
+        if len(groups) == 1:
+            return self._group(groups[0])
+        return tuple(self._group(group) for group in groups)
+
+    def __getitem__(self, group):
+        return self._group(group)
+
+    def groups(self, default=None):
+        return tuple(self._group(index, default) for index in range(1, len(self._spans)))
+
+    def groupdict(self, default=None):
+        return dict((name, self._group(index, default))
+                    for name, index in self.re.groupindex.items())
+
+    def expand(self, template):
+        return _expand(self, template)
+
+_TEMPLATE = re.compile(r'\\(?:g<([^>]*)>|(0[0-7]{0,2}|[1-9][0-9]?)|(.))', re.DOTALL)
+
+_TEMPLATE_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'f': '\f', 'v': '\v',
+                     'a': '\a', 'b': '\b', '\\': '\\'}
+
+def _expand(match, template):
+    """``template`` with group references replaced, like re's sub()."""
+    def replace(reference):
+        group, number, char = reference.groups()
+        if group is not None:
+            group = int(group) if group.isdigit() else group
+        elif number is not None:
+            if number.startswith('0'):
+                return chr(int(number, 8))
+            group = int(number)
+        elif char in _TEMPLATE_ESCAPES:
+            return _TEMPLATE_ESCAPES[char]
+        elif char.isalpha() and ord(char) < 128:
+            raise re.error('bad escape \\%s' % char)
+        else:
+            return reference.group()
+        try:
+            return match._group(group, '')
+        except IndexError:
+            raise re.error('invalid group reference %s' % (group, ))
+    return _TEMPLATE.sub(replace, template)
+
+class EnginePattern(object):
+    """Base of the compiled patterns returned by the engines.
+
+    Subclasses set ``pattern``, ``flags``, ``groups``, ``groupindex`` and
+    ``_nested`` (group number -> highest group number inside it) and
+    implement ``_search`` and ``_match``, which return the list of
+    spans of a match or None.
+    """
+
+    def __repr__(self):
+        return '%s.%s(%r)' % (type(self).__module__, type(self).__name__, self.pattern)
+
+    def _search(self, string, pos, endpos):
+        raise NotImplementedError
+
+    def _match(self, string, pos, endpos, full=False, nonempty=False):
+        raise NotImplementedError
+
+    def _bounds(self, string, pos, endpos):
+        if not isinstance(string, basestring):
+            raise TypeError('expected string, got %r' % type(string).__name__)
+        size = len(string)
+        endpos = size if endpos is None else max(0, min(endpos, size))
+        return max(0, min(pos, size)), endpos
+
+    def _result(self, string, pos, endpos, spans):
+        return None if spans is None else Match(self, string, pos, endpos, spans)
+
+    def search(self, string, pos=0, endpos=None):
+        pos, endpos = self._bounds(string, pos, endpos)
+        if pos > endpos:
+            # re does not search past endpos either.
+            return None
+        return self._result(string, pos, endpos, self._search(string, pos, endpos))
+
+    def match(self, string, pos=0, endpos=None):
+        pos, endpos = self._bounds(string, pos, endpos)
+        if pos > endpos:
+            return self._match_past_end(string, pos, endpos)
+        return self._result(string, pos, endpos, self._match(string, pos, endpos))
+
+    def _match_past_end(self, string, pos, endpos):
+        # Only an empty match can start past endpos, and whether sre finds
+        # one depends on how it compiled the pattern: (?:ab)* matches, a?
+        # does not. With nothing to consume re cannot backtrack, so ask it.
+        matched = re.compile(self.pattern, self.flags).match(string, pos, endpos)
+        if matched is None:
+            return None
+        return Match(self, string, pos, endpos, list(matched.regs))
+
+    def fullmatch(self, string, pos=0, endpos=None):
+        pos, endpos = self._bounds(string, pos, endpos)
+        if pos > endpos:
+            # A match starting past endpos cannot end there.
+            return None
+        return self._result(string, pos, endpos, self._match(string, pos, endpos, True))
+
+    def finditer(self, string, pos=0, endpos=None):
+        pos, endpos = self._bounds(string, pos, endpos)
+        return self._iterate(string, pos, endpos)
+
+    def _iterate(self, string, pos, endpos):
+        # After an empty match, the next one may start at the same position
+        # only if it is not empty.
+        nonempty = False
+        while pos <= endpos:
+            spans = None
+            if nonempty:
+                spans = self._match(string, pos, endpos, nonempty=True)
+                if spans is None:
+                    pos += 1
+                    if pos > endpos:
+                        return
+            if spans is None:
+                spans = self._search(string, pos, endpos)
+                if spans is None:
+                    return
+            yield Match(self, string, pos, endpos, spans)
+            start, pos = spans[0]
+            nonempty = start == pos
+
+    def findall(self, string, pos=0, endpos=None):
+        result = []
+        for match in self.finditer(string, pos, endpos):
+            if self.groups == 0:
+                result.append(match.group())
+            elif self.groups == 1:
+                result.append(match.group(1) or string[:0])
+            else:
+                result.append(match.groups(string[:0]))
+        return result
+
+    def split(self, string, maxsplit=0):
+        result = []
+        last = 0
+        for match in self.finditer(string):
+            if maxsplit and len(result) // (self.groups + 1) >= maxsplit:
+                break
+            result.append(string[last:match.start()])
+            result.extend(match.groups())
+            last = match.end()
+        result.append(string[last:])
+        return result
+
+    def subn(self, repl, string, count=0):
+        if not callable(repl):
+            template = repl
+            repl = lambda match: _expand(match, template)
+        pieces = []
+        last = 0
+        done = 0
+        for match in self.finditer(string):
+            if count and done >= count:
+                break
+            pieces.append(string[last:match.start()])
+            pieces.append(repl(match))
+            last = match.end()
+            done += 1
+        pieces.append(string[last:])
+        return string[:0].join(pieces), done
+
+    def sub(self, repl, string, count=0):
+        return self.subn(repl, string, count)[0]
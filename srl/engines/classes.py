@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""Character classes compiled to lookup tables for the automaton engines.
+
+``digit``, ``letter``, ``oneOf`` and the other classes reach the engines
+as IR nodes. char_table() turns one into a CharTable: a 256-entry
+bytearray for Latin-1 (filled by asking ``re`` once per character, so
+case folding and ``\\w`` agree with the regex) and a sorted list of ranges
+for higher code points. Classes whose higher code points depend on
+Unicode categories or case folding ask ``re`` for those instead.
+
+Tables are interned by class and flags: identical classes in thousands of
+patterns share one table. memory_report() shows how much that saves.
+"""
+
+import re
+import sys
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+
+from .. import ir
+from ..emitter import emit
+
+try:
+    chr_ = unichr
+except NameError:
+    chr_ = chr
+
+# Flags that change which characters a class holds, less the ones str
+# patterns imply anyway.
+_TABLE_FLAGS = (re.IGNORECASE | re.UNICODE | re.LOCALE | getattr(re, 'ASCII', 0)) & \
+    ~re.compile('').flags
+
+_MAX_CODE = sys.maxunicode
+
+# Characters of a oneOf body that are more than themselves in a class.
+_CLASS_SYNTAX = frozenset('\\-[]^')
+
+TableReport = namedtuple('TableReport', 'tables uses bytes unshared_bytes')
+
+_tables = {}
+
+class CharTable(object):
+    """Which characters match the class ``node`` compiled with ``flags``."""
+
+    __slots__ = ('source', 'flags', 'latin1', 'lows', 'highs', 'uses', '_test')
+
+    def __init__(self, node, flags=0):
+        self.source = emit(node)
+        self.flags = flags
+        self._test = re.compile(self.source, flags).match
+        self.latin1 = bytearray(1 if self._test(chr_(code)) else 0 for code in range(256))
+        ranges = _ranges(node, flags)
+        if ranges is None:
+            self.lows = self.highs = None
+        else:
+            self.lows = array('i', [low for low, _ in ranges])
+            self.highs = array('i', [high for _, high in ranges])
+        self.uses = 0
+
+    def __call__(self, char):
+        code = ord(char)
+        if code < 256:
+            return self.latin1[code]
+        if self.lows is None:
+            return self._test(char) is not None
+        index = bisect_right(self.lows, code) - 1
+        return index >= 0 and code <= self.highs[index]
+
+    def memory(self):
+        """Bytes held by the table."""
+        size = sys.getsizeof(self.latin1)
+        if self.lows is not None:
+            size += sys.getsizeof(self.lows) + sys.getsizeof(self.highs)
+        return size
+
+def _ranges(node, flags):
+    """Sorted (low, high) code point ranges above Latin-1 that ``node``
+    holds, or None when they depend on categories or case folding."""
+    if isinstance(node, ir.AnyChar):
+        return [(256, _MAX_CODE)]
+    if node.category or flags & (re.IGNORECASE | re.LOCALE) or \
+            _CLASS_SYNTAX.intersection(node.chars) or \
+            any(len(start) != 1 or len(end) != 1 for start, end in node.ranges):
+        return None
+    bounds = [(ord(start), ord(end)) for start, end in node.ranges]
+    bounds.extend((ord(char), ord(char)) for char in node.chars)
+    merged = []
+    for low, high in sorted(bounds):
+        low = max(low, 256)
+        if low > high:
+            continue
+        if merged and low <= merged[-1][1] + 1:
+            merged[-1] = merged[-1][0], max(high, merged[-1][1])
+        else:
+            merged.append((low, high))
+    if not node.negated:
+        return merged
+    complement = []
+    start = 256
+    for low, high in merged:
+        if low > start:
+            complement.append((start, low - 1))
+        start = high + 1
+    if start <= _MAX_CODE:
+        complement.append((start, _MAX_CODE))
+    return complement
+
+def char_table(node, flags=0):
+    """The shared CharTable for the CharClass or AnyChar ``node``."""
+    key = node, flags & (_TABLE_FLAGS | (re.DOTALL if isinstance(node, ir.AnyChar) else 0))
+    table = _tables.get(key)
+    if table is None:
+        table = _tables.setdefault(key, CharTable(node, key[1]))
+    # Counters are best effort: no lock.
+    table.uses += 1
+    return table
+
+def memory_report():
+    """How many tables exist, how many times they were handed out, the
+    bytes they hold and the bytes one table per use would have held."""
+    tables = list(_tables.values())
+    return TableReport(len(tables), sum(table.uses for table in tables),
+                       sum(table.memory() for table in tables),
+                       sum(table.memory() * table.uses for table in tables))
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""Lazily built DFA, in the style of RE2.
+
+A DFA state is the ordered tuple of NFA threads alive at a position, and
+its transitions are computed from the NFA the first time a character is
+seen in that state, then cached. Matching never backtracks: every input
+character costs one dict lookup once the states it needs exist, and at
+most one NFA step (linear in the size of the pattern) when they do not.
+
+Searching runs three automata:
+
+- a forward DFA with a ``.*?`` prefix finds where the leftmost-first match
+  ends (threads stay in priority order, and the ones a backtracking
+  engine would never reach are dropped when a match is found);
+- a reverse DFA run backwards from that end finds the leftmost start;
+- an anchored forward DFA serves match() and fullmatch().
+
+The cached states of each automaton are bounded by ``memory_limit`` (an
+estimate in bytes). When it is exceeded the whole cache is dropped and
+rebuilt on demand, so memory stays bounded while matching stays linear.
+Patterns with captures (see srl.engines.pike), lookarounds or Raw
+fragments are refused with UnsupportedPatternException.
+"""
+
+import re
+import threading
+
+from .base import EnginePattern
+from .nfa import (compile_program, AT_BEGIN, AFTER_NEWLINE, AT_END, BEFORE_NEWLINE,
+                  BEFORE_FINAL_NEWLINE)
+from ..errors import UnsupportedPatternException
+
+DEFAULT_MEMORY_LIMIT = 8 << 20
+
+# Rough CPython sizes of a state (object, pcs tuple, transition dict) and of
+# one cached transition (dict slot and result tuple).
+_STATE_COST = 400
+_PC_COST = 8
+_TRANSITION_COST = 120
+
+class _State(object):
+    __slots__ = ('pcs', 'context', 'empty', 'next')
+
+    def __init__(self, pcs, context, empty):
+        self.pcs = pcs
+        self.context = context
+        # Whether a match may end here (False right after an empty match).
+        self.empty = empty
+        # Character (or (character, True) before the final new line) to
+        # (matched here, next state); an int context to "accepts here".
+        self.next = {}
+
+class DFA(object):
+    """Lazy DFA over a Program.
+
+    Forward automata record matches in leftmost-first order; ``reverse``
+    ones run backwards and report every position where a match can start.
+    """
+
+    def __init__(self, program, reverse=False, memory_limit=DEFAULT_MEMORY_LIMIT):
+        self.program = program
+        self.reverse = reverse
+        self.memory_limit = memory_limit
+        self.memory = 0
+        self.flushes = 0
+        self.states = {}
+        self.starts = {}
+        self._lock = threading.Lock()
+        # Kept across flushes so scanning loops can compare against it.
+        self.dead = _State((), 0, True)
+
+    def __len__(self):
+        return len(self.states)
+
+    def _state(self, pcs, context, empty):
+        if not pcs:
+            return self.dead
+        if not self.program.uses_context:
+            context = 0
+        key = pcs, context, empty
+        state = self.states.get(key)
+        if state is None:
+            if self.memory > self.memory_limit:
+                self.flush()
+            state = self.states[key] = _State(pcs, context, empty)
+            self.memory += _STATE_COST + _PC_COST * len(pcs)
+        return state
+
+    def flush(self):
+        """Drop every cached state and transition."""
+        for state in self.states.values():
+            state.next.clear()
+        self.states = {}
+        self.starts = {}
+        self.memory = 0
+        self.flushes += 1
+
+    def start(self, context, empty=True):
+        state = self.starts.get((context, empty))
+        if state is None:
+            with self._lock:
+                state = self.starts[context, empty] = self._state((0, ), context, empty)
+        return state
+
+    def step(self, state, char, final=False):
+        """(matched before ``char``, state after it), cached on ``state``."""
+        newline = char == '\n'
+        side = newline and BEFORE_NEWLINE | (BEFORE_FINAL_NEWLINE if final else 0)
+        if self.reverse:
+            context, after = state.context | (newline and AFTER_NEWLINE), side
+        else:
+            context, after = state.context | side, newline and AFTER_NEWLINE
+        # Reverse automata need every start, not just the preferred one.
+        pcs, matched = self.program.follow(state.pcs, context,
+                                           cut=state.empty and not self.reverse)
+        insts = self.program.insts
+        following = tuple(pc + 1 for pc in pcs if insts[pc][1](char))
+        with self._lock:
+            result = state.empty and matched, self._state(following, after, True)
+            state.next[(char, True) if final and newline else char] = result
+            self.memory += _TRANSITION_COST
+        return result
+
+    def accepts(self, state, context):
+        """Whether a match ends (or, reversed, starts) at a boundary with
+        ``context`` in ``state``."""
+        accepted = state.next.get(context)
+        if accepted is None:
+            accepted = state.empty and \
+                self.program.follow(state.pcs, state.context | context, False)[1]
+            state.next[context] = accepted
+        return accepted
+
+def _before(string, pos):
+    if pos == 0:
+        return AT_BEGIN
+    return AFTER_NEWLINE if string[pos - 1] == '\n' else 0
+
+def _after(string, pos, endpos):
+    if pos == endpos:
+        return AT_END
+    if string[pos] == '\n':
+        return BEFORE_NEWLINE | (BEFORE_FINAL_NEWLINE if pos == endpos - 1 else 0)
+    return 0
+
+class DFAPattern(EnginePattern):
+    """A regular pattern matched by lazy DFAs, in time linear in the input."""
+
+    # Whether the engine reports the groups of a match.
+    captures = False
+
+    def __init__(self, pattern, regex, flags=0, memory_limit=DEFAULT_MEMORY_LIMIT):
+        self.ir = pattern
+        self.pattern = regex
+        self.memory_limit = memory_limit
+        # Before re.compile, which rejects some unsupported patterns (x++
+        # before Python 3.11) with re.error.
+        forward = compile_program(pattern, flags, search=True)
+        if forward.groups and not self.captures:
+            raise UnsupportedPatternException('the dfa engine does not report groups, '
+                                              'use the pike engine')
+        self.flags = re.compile(regex, flags | pattern.flags).flags
+        self.groups = forward.groups
+        self.groupindex = forward.groupindex
+        self._nested = forward.nested
+        self._search_dfa = DFA(forward, memory_limit=memory_limit)
+        self._reverse_dfa = DFA(compile_program(pattern, flags, reverse=True), True,
+                                memory_limit)
+        self._match_dfa = DFA(compile_program(pattern, flags), memory_limit=memory_limit)
+        self._full_dfa = DFA(compile_program(pattern, flags, full=True),
+                             memory_limit=memory_limit)
+
+    def cache_info(self):
+        """Cached states and cache flushes of each automaton."""
+        return dict((name, (len(dfa), dfa.flushes)) for name, dfa in
+                    (('search', self._search_dfa), ('reverse', self._reverse_dfa),
+                     ('match', self._match_dfa), ('fullmatch', self._full_dfa)))
+
+    def _forward(self, dfa, state, string, pos, endpos):
+        """End of the leftmost-first match from ``state`` at ``pos``, or -1."""
+        end = -1
+        dead = dfa.dead
+        last = endpos - 1
+        index = pos
+        while index < last:
+            char = string[index]
+            result = state.next.get(char)
+            if result is None:
+                result = dfa.step(state, char)
+            if result[0]:
+                end = index
+            state = result[1]
+            if state is dead:
+                return end
+            index += 1
+        if index == last:
+            char = string[index]
+            final = char == '\n'
+            result = state.next.get((char, True) if final else char)
+            if result is None:
+                result = dfa.step(state, char, final)
+            if result[0]:
+                end = index
+            state = result[1]
+        if dfa.accepts(state, AT_END):
+            end = endpos
+        return end
+
+    def _start(self, string, pos, end, endpos):
+        """Leftmost position at or after ``pos`` where a match ending at
+        ``end`` can start."""
+        dfa = self._reverse_dfa
+        state = dfa.start(_after(string, end, endpos))
+        start = -1
+        dead = dfa.dead
+        index = end
+        if index > pos and index == endpos:
+            char = string[index - 1]
+            final = char == '\n'
+            result = state.next.get((char, True) if final else char)
+            if result is None:
+                result = dfa.step(state, char, final)
+            if result[0]:
+                start = index
+            state = result[1]
+            index -= 1
+        while index > pos and state is not dead:
+            char = string[index - 1]
+            result = state.next.get(char)
+            if result is None:
+                result = dfa.step(state, char)
+            if result[0]:
+                start = index
+            state = result[1]
+            index -= 1
+        if index == pos and state is not dead and dfa.accepts(state, _before(string, pos)):
+            start = pos
+        return start
+
+    def _search(self, string, pos, endpos):
+        dfa = self._search_dfa
+        end = self._forward(dfa, dfa.start(_before(string, pos)), string, pos, endpos)
+        if end < 0:
+            return None
+        return [(self._start(string, pos, end, endpos), end)]
+
+    def _match(self, string, pos, endpos, full=False, nonempty=False):
+        dfa = self._full_dfa if full else self._match_dfa
+        end = self._forward(dfa, dfa.start(_before(string, pos), not nonempty),
+                            string, pos, endpos)
+        if end < 0:
+            return None
+        return [(pos, end)]
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+"""Thompson NFA compiled from the IR, shared by the non-backtracking engines.
+
+A program is a flat list of instructions. Every instruction but SPLIT and
+JUMP continues at ``pc + 1``:
+
+``[CHAR, test]``
+    consume one character ``c`` if ``test(c)``
+``[SPLIT, x, y]``
+    continue at ``x`` and, with lower priority, at ``y``
+``[JUMP, x]``
+``[ASSERT, kind]``
+    zero-width check of the characters around the position
+``[SAVE, slot]``
+    record the position in capture slot ``slot``
+``[MATCH]``
+
+``[MARK, loop]``
+    remember where an iteration of loop ``loop`` started
+``[GUARD, loop, next]``
+    continue at ``next`` (another iteration), unless this one matched
+    nothing: sre leaves a loop after an iteration past its minimum that
+    matched nothing, so the bodies of loops that can match nothing are
+    guarded (and every unbounded loop in backtracking programs)
+
+Programs compiled for the backtracking engine may also hold:
+
+``[LOOK, behind, negative, width, next]``
+    run the lookaround body that follows (``width`` characters back for
+    a lookbehind) up to its LOOKEND, then continue at ``next``
+``[LOOKEND]``
+
+Threads are kept in priority order, so simulating a program makes the
+same leftmost-first choices as a backtracking engine. The automata follow
+a MARK and its GUARD without reading a character exactly when the
+iteration matched nothing, so threads there also carry a bitmask of the
+loops they entered at the current position.
+"""
+
+import re
+
+from .classes import char_table
+from .. import ir
+from ..errors import UnsupportedPatternException
+
+CHAR, SPLIT, JUMP, ASSERT, SAVE, MATCH, LOOK, LOOKEND, MARK, GUARD = range(10)
+
+# Context of a position: the text starts here, a new line precedes it, the
+# text (or endpos) ends here, a new line follows it, the last character of
+# the text is a new line that follows it.
+AT_BEGIN = 1
+AFTER_NEWLINE = 2
+AT_END = 4
+BEFORE_NEWLINE = 8
+BEFORE_FINAL_NEWLINE = 16
+
+# Assertion added by fullmatch(): nothing may follow.
+END_OF_TEXT = 'eot'
+
+# ^ and $ of a MULTILINE pattern, which also hold around every new line.
+LINE_BEGIN = 'line-begin'
+LINE_END = 'line-end'
+
+# Flags that change what a single character test accepts.
+_TEST_FLAGS = re.IGNORECASE | re.DOTALL | re.UNICODE | re.LOCALE | getattr(re, 'ASCII', 0)
+
+_tests = {}
+
+def char_test(source, flags):
+    """Predicate for one character matching the regex ``source``.
+
+    Tests are built with ``re`` itself, so classes, case folding and the
+    meaning of ``\\w`` agree with the regex exactly; engines only call them
+    once per automaton transition.
+    """
+    flags &= _TEST_FLAGS
+    key = source, flags
+    test = _tests.get(key)
+    if test is None:
+        if len(source) == 1 and not flags & re.IGNORECASE and source not in '.^$':
+            test = source.__eq__
+        else:
+            test = re.compile(source, flags).match
+        test = _tests.setdefault(key, test)
+    return test
+
+def holds(kind, context):
+    if kind == ir.Anchor.BEGIN:
+        return bool(context & AT_BEGIN)
+    if kind == LINE_BEGIN:
+        return bool(context & (AT_BEGIN | AFTER_NEWLINE))
+    if kind == ir.Anchor.END:
+        return bool(context & (AT_END | BEFORE_FINAL_NEWLINE))
+    if kind == LINE_END:
+        return bool(context & (AT_END | BEFORE_NEWLINE))
+    return bool(context & AT_END)
+
+def context_at(string, pos, endpos):
+    """Context bits of position ``pos`` in ``string`` searched up to ``endpos``."""
+    context = AT_BEGIN if pos == 0 else AFTER_NEWLINE if string[pos - 1] == '\n' else 0
+    if pos == endpos:
+        return context | AT_END
+    if string[pos] == '\n':
+        context |= BEFORE_NEWLINE | (BEFORE_FINAL_NEWLINE if pos == endpos - 1 else 0)
+    return context
+
+def thread_key(pc, op, entered):
+    """What tells threads at ``pc`` apart while following instructions
+    that read no character: the loops they entered here, until a CHAR."""
+    return (pc, entered) if entered and op != CHAR else pc
+
+def guard(inst, pc, entered):
+    """(next pc, loops entered) after the MARK or GUARD ``inst`` at ``pc``,
+    for a thread that entered ``entered`` at the current position."""
+    if inst[0] == MARK:
+        return pc + 1, entered | 1 << inst[1]
+    return (pc + 1 if entered >> inst[1] & 1 else inst[2]), entered
+
+class Program(object):
+    """Compiled instructions plus what the engines need to run them."""
+
+    def __init__(self, insts, flags, groups, groupindex, loops=0, nested=None):
+        self.insts = insts
+        self.flags = flags
+        self.groups = groups
+        self.groupindex = groupindex
+        self.loops = loops
+        # Group number -> highest group number inside it.
+        self.nested = nested or {}
+        # Without assertions the context of a position never matters.
+        self.uses_context = any(inst[0] == ASSERT for inst in insts)
+
+    def __len__(self):
+        return len(self.insts)
+
+    def follow(self, pcs, context, cut=True):
+        """CHAR instructions reachable from ``pcs`` without consuming input,
+        in priority order, and whether MATCH is reachable.
+
+        ``cut`` drops the threads after the first one to reach MATCH (a
+        backtracking engine would never get to them).
+        """
+        insts = self.insts
+        seen = set()
+        found = []
+        matched = False
+        stack = [(pc, 0) for pc in reversed(pcs)]
+        while stack:
+            pc, entered = stack.pop()
+            inst = insts[pc]
+            op = inst[0]
+            key = thread_key(pc, op, entered)
+            if key in seen:
+                continue
+            seen.add(key)
+            if op == CHAR:
+                found.append(pc)
+            elif op == SPLIT:
+                stack.append((inst[2], entered))
+                stack.append((inst[1], entered))
+            elif op == JUMP:
+                stack.append((inst[1], entered))
+            elif op == MARK or op == GUARD:
+                stack.append(guard(inst, pc, entered))
+            elif op == MATCH:
+                matched = True
+                if cut:
+                    break
+            elif op != ASSERT or holds(inst[1], context):
+                stack.append((pc + 1, entered))
+        return tuple(found), matched
+
+def compile_program(pattern, flags=0, search=False, full=False, reverse=False,
+                    backtrack=False):
+    """Program for ``pattern`` compiled with ``flags``.
+
+    ``search`` prefixes a lazy ``(?s:.)*?`` so one pass tries every start,
+    ``full`` requires the match to end at the end of the text, ``reverse``
+    compiles the pattern to run backwards from the end of a match.
+    ``backtrack`` compiles lookarounds and loop guards, which only the
+    backtracking engine runs.
+    """
+    flags |= pattern.flags
+    if flags & re.VERBOSE:
+        raise UnsupportedPatternException('verbose patterns are not supported')
+    compiler = _Compiler(flags, reverse, backtrack)
+    insts = compiler.insts
+    if search:
+        insts.append([SPLIT, 3, 1])
+        insts.append([CHAR, char_table(ir.AnyChar(), re.DOTALL)])
+        insts.append([JUMP, 0])
+    compiler.sequence(pattern.nodes)
+    if full:
+        insts.append([ASSERT, END_OF_TEXT])
+    insts.append([MATCH])
+    return Program(insts, flags, compiler.groups, compiler.groupindex, compiler.loops,
+                   compiler.nested)
+
+class _Compiler(object):
+
+    def __init__(self, flags, reverse, backtrack=False):
+        self.flags = flags
+        self.reverse = reverse
+        self.backtrack = backtrack
+        self.insts = []
+        self.groups = 0
+        self.groupindex = {}
+        self.nested = {}
+        self.loops = 0
+
+    def sequence(self, nodes):
+        for node in (reversed(nodes) if self.reverse else nodes):
+            self.node(node)
+
+    def node(self, node):
+        insts = self.insts
+        if isinstance(node, ir.Literal):
+            text = reversed(node.text) if self.reverse else node.text
+            for char in text:
+                insts.append([CHAR, char_test(re.escape(char), self.flags)])
+        elif isinstance(node, (ir.CharClass, ir.AnyChar)):
+            insts.append([CHAR, char_table(node, self.flags)])
+        elif isinstance(node, ir.Anchor):
+            kind = node.kind
+            if self.flags & re.MULTILINE:
+                kind = LINE_BEGIN if kind == ir.Anchor.BEGIN else LINE_END
+            insts.append([ASSERT, kind])
+        elif isinstance(node, ir.Quantifier):
+            self.quantifier(node)
+        elif isinstance(node, ir.Group):
+            self.group(node)
+        elif isinstance(node, ir.Alternation):
+            self.alternation(node.branches)
+        elif isinstance(node, ir.Lookaround) and self.backtrack:
+            self.lookaround(node)
+        elif isinstance(node, ir.Lookaround):
+            raise UnsupportedPatternException('lookarounds are not regular')
+        else:
+            raise UnsupportedPatternException('%s cannot be compiled to an automaton'
+                                              % type(node).__name__)
+
+    def group(self, node):
+        if not node.capture:
+            return self.sequence(node.body)
+        self.groups += 1
+        index = self.groups
+        if node.name:
+            self.groupindex[node.name] = index
+        first, last = (2 * index + 1, 2 * index) if self.reverse else (2 * index, 2 * index + 1)
+        self.insts.append([SAVE, first])
+        self.sequence(node.body)
+        self.nested[index] = self.groups
+        self.insts.append([SAVE, last])
+
+    def lookaround(self, node):
+        from ..analysis import width
+        low, high = width(ir.Group(node.body, False))
+        if node.behind and low != high:
+            raise UnsupportedPatternException('lookbehinds must have a fixed width')
+        look = [LOOK, node.behind, node.negative, low, None]
+        self.insts.append(look)
+        self.sequence(node.body)
+        self.insts.append([LOOKEND])
+        look[4] = len(self.insts)
+
+    def alternation(self, branches):
+        insts = self.insts
+        exits = []
+        for index, branch in enumerate(branches):
+            split = None
+            if index < len(branches) - 1:
+                split = [SPLIT, len(insts) + 1, None]
+                insts.append(split)
+            self.node(branch)
+            if split is not None:
+                exits.append([JUMP, None])
+                insts.append(exits[-1])
+                split[2] = len(insts)
+        for jump in exits:
+            jump[1] = len(insts)
+
+    def quantifier(self, node):
+        child = node.child
+        if isinstance(child, ir.Quantifier):
+            # The outer suffix modifies the inner quantifier: x+? is lazy.
+            if (node.min, node.max, node.lazy) == (0, 1, False) and not child.lazy:
+                return self.quantifier(child.replace(lazy=True))
+            raise UnsupportedPatternException('possessive quantifiers are not supported')
+        if child is None:
+            raise UnsupportedPatternException('quantifier without a subject')
+        from ..analysis import width
+        insts = self.insts
+        groups = self.groups
+        empty = width(child)[0] == 0
+        splits = []
+        for _ in range(node.min):
+            self.node(child)
+            # Every copy records into the same groups: the last one wins.
+            self.groups = groups
+        if node.max is None:
+            loop = len(insts)
+            splits.append([SPLIT, loop + 1, None])
+            insts.append(splits[-1])
+            if empty or self.backtrack:
+                guard = self.loops
+                self.loops += 1
+                insts.append([MARK, guard])
+                self.node(child)
+                insts.append([GUARD, guard, loop])
+            else:
+                self.node(child)
+                insts.append([JUMP, loop])
+            splits[-1][2] = len(insts)
+        else:
+            # x{0,2} is (?:x(?:x)?)?: every split skips to the end, and so
+            # does an x that matched nothing.
+            optional = []
+            exits = []
+            for index in range(node.max - node.min, 0, -1):
+                optional.append([SPLIT, len(insts) + 1, None])
+                insts.append(optional[-1])
+                if empty and index > 1:
+                    guard = self.loops
+                    self.loops += 1
+                    insts.append([MARK, guard])
+                    self.node(child)
+                    insts.append([GUARD, guard, len(insts) + 2])
+                    exits.append([JUMP, None])
+                    insts.append(exits[-1])
+                else:
+                    self.node(child)
+                self.groups = groups
+            for split in optional:
+                split[2] = len(insts)
+            for jump in exits:
+                jump[1] = len(insts)
+            splits.extend(optional)
+        if self.groups == groups:
+            # Number the groups of a child repeated zero times all the same.
+            mark = len(insts)
+            loops = self.loops
+            self.node(child)
+            del insts[mark:]
+            self.loops = loops
+        if node.lazy:
+            for split in splits:
+                split[1], split[2] = split[2], split[1]
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""Pike VM: Thompson NFA simulation that tracks capture positions.
+
+Every thread carries its own capture slots; threads stay in priority
+order and at most one thread per instruction survives each step, so a
+match costs O(len(text) * len(program)) whatever the pattern, and the
+groups agree with the ones a backtracking engine reports.
+
+PikePattern first finds the span of the match with the lazy DFAs of
+srl.engines.dfa, then runs the VM over that span only to fill in the
+groups, which keeps the slower VM off the text that cannot match.
+"""
+
+from .dfa import DFAPattern
+from .nfa import (CHAR, SPLIT, JUMP, SAVE, MATCH, MARK, GUARD, context_at, guard, holds,
+                  thread_key)
+
+def run(program, string, start, end, endpos, empty=True):
+    """Capture slots of the leftmost-first match of ``program`` anchored at
+    ``start``, as found when the text is read up to ``end``, or None.
+
+    ``empty`` allows a match that ends at ``start``.
+    """
+    insts = program.insts
+    uses_context = program.uses_context
+    threads = [(0, (-1, ) * (2 * program.groups + 2))]
+    matched = None
+    index = start
+    while True:
+        context = uses_context and context_at(string, index, endpos)
+        seen = set()
+        runnable = []
+        stack = [(pc, slots, 0) for pc, slots in reversed(threads)]
+        while stack:
+            pc, slots, entered = stack.pop()
+            inst = insts[pc]
+            op = inst[0]
+            key = thread_key(pc, op, entered)
+            if key in seen:
+                continue
+            seen.add(key)
+            if op == CHAR:
+                runnable.append((pc, slots))
+            elif op == SPLIT:
+                stack.append((inst[2], slots, entered))
+                stack.append((inst[1], slots, entered))
+            elif op == JUMP:
+                stack.append((inst[1], slots, entered))
+            elif op == SAVE:
+                slot = inst[1]
+                stack.append((pc + 1, slots[:slot] + (index, ) + slots[slot + 1:], entered))
+            elif op == MARK or op == GUARD:
+                pc, entered = guard(inst, pc, entered)
+                stack.append((pc, slots, entered))
+            elif op == MATCH:
+                if empty or index > start:
+                    # Lower priority threads can no longer win.
+                    matched = slots
+                    break
+            elif holds(inst[1], context):
+                stack.append((pc + 1, slots, entered))
+        if index >= end or not runnable:
+            return matched
+        char = string[index]
+        threads = [(pc + 1, slots) for pc, slots in runnable if insts[pc][1](char)]
+        index += 1
+
+class PikePattern(DFAPattern):
+    """A regular pattern with groups, matched in linear time."""
+
+    captures = True
+
+    def _groups(self, program, string, start, end, endpos, empty=True):
+        slots = run(program, string, start, end, endpos, empty)
+        spans = [(start, end)]
+        for group in range(1, self.groups + 1):
+            spans.append((slots[2 * group], slots[2 * group + 1]))
+        return spans
+
+    def _search(self, string, pos, endpos):
+        spans = DFAPattern._search(self, string, pos, endpos)
+        if spans is None or not self.groups:
+            return spans
+        start, end = spans[0]
+        return self._groups(self._match_dfa.program, string, start, end, endpos)
+
+    def _match(self, string, pos, endpos, full=False, nonempty=False):
+        spans = DFAPattern._match(self, string, pos, endpos, full, nonempty)
+        if spans is None or not self.groups:
+            return spans
+        dfa = self._full_dfa if full else self._match_dfa
+        return self._groups(dfa.program, string, pos, spans[0][1], endpos, not nonempty)
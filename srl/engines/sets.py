@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""One lazy DFA for a whole set of patterns, in the style of RE2::Set.
+
+The program is the union of every pattern behind a single ``.*?`` prefix,
+each branch ending in its own ``[MATCH, index]``. Nothing is cut when a
+branch matches, so a state knows every pattern that matched at that
+position, and one pass over the text finds all patterns that match
+anywhere in it. Which text matched is not reported.
+"""
+
+import re
+
+from .classes import char_table
+from .dfa import DFA, DEFAULT_MEMORY_LIMIT, _before
+from .nfa import (Program, _Compiler, compile_program, CHAR, SPLIT, JUMP, ASSERT,
+                  MATCH, MARK, GUARD, AT_END, guard, holds, thread_key)
+from .. import ir
+from ..errors import UnsupportedPatternException
+
+class SetProgram(Program):
+    """Program whose MATCH instructions carry the index of their pattern."""
+
+    def follow(self, pcs, context, cut=True):
+        """CHAR instructions reachable from ``pcs`` and the frozenset of
+        patterns that match here. Nothing is cut."""
+        insts = self.insts
+        seen = set()
+        found = []
+        matched = []
+        stack = [(pc, 0) for pc in reversed(pcs)]
+        while stack:
+            pc, entered = stack.pop()
+            inst = insts[pc]
+            op = inst[0]
+            key = thread_key(pc, op, entered)
+            if key in seen:
+                continue
+            seen.add(key)
+            if op == CHAR:
+                found.append(pc)
+            elif op == SPLIT:
+                stack.append((inst[2], entered))
+                stack.append((inst[1], entered))
+            elif op == JUMP:
+                stack.append((inst[1], entered))
+            elif op == MARK or op == GUARD:
+                stack.append(guard(inst, pc, entered))
+            elif op == MATCH:
+                matched.append(inst[1])
+            elif op != ASSERT or holds(inst[1], context):
+                stack.append((pc + 1, entered))
+        return tuple(found), frozenset(matched)
+
+def compile_set(patterns, flags=0):
+    """SetProgram searching for every pattern in ``patterns`` at once.
+
+    Each Pattern is compiled with its own flags plus ``flags``; the ones an
+    automaton cannot run raise UnsupportedPatternException.
+    """
+    compiler = _Compiler(flags, False)
+    insts = compiler.insts
+    insts.append([SPLIT, 3, 1])
+    insts.append([CHAR, char_table(ir.AnyChar(), re.DOTALL)])
+    insts.append([JUMP, 0])
+    for index, pattern in enumerate(patterns):
+        if (flags | pattern.flags) & re.VERBOSE:
+            raise UnsupportedPatternException('verbose patterns are not supported')
+        split = None
+        if index < len(patterns) - 1:
+            split = [SPLIT, len(insts) + 1, None]
+            insts.append(split)
+        compiler.flags = flags | pattern.flags
+        compiler.sequence(pattern.nodes)
+        insts.append([MATCH, index])
+        if split is not None:
+            split[2] = len(insts)
+    return SetProgram(insts, flags, compiler.groups, compiler.groupindex, compiler.loops,
+                      compiler.nested)
+
+def regular(pattern, flags=0):
+    """Whether an automaton can run ``pattern``."""
+    try:
+        compile_program(pattern, flags)
+    except UnsupportedPatternException:
+        return False
+    return True
+
+class SetMatcher(object):
+    """Finds which of ``patterns`` match a text, in one pass over it."""
+
+    def __init__(self, patterns, flags=0, memory_limit=DEFAULT_MEMORY_LIMIT):
+        self.size = len(patterns)
+        self._dfa = DFA(compile_set(patterns, flags), memory_limit=memory_limit)
+
+    def cache_info(self):
+        return len(self._dfa), self._dfa.flushes
+
+    def matches(self, string):
+        """Set of the indexes of the patterns that match ``string``."""
+        dfa = self._dfa
+        state = dfa.start(_before(string, 0))
+        found = set()
+        size = self.size
+        # Only $ tells the new line that ends the text from the others.
+        final = string.endswith('\n')
+        for char in string[:-1] if final else string:
+            result = state.next.get(char)
+            if result is None:
+                result = dfa.step(state, char)
+            if result[0]:
+                found.update(result[0])
+                if len(found) == size:
+                    return found
+            state = result[1]
+        if final:
+            result = state.next.get(('\n', True))
+            if result is None:
+                result = dfa.step(state, '\n', True)
+            found.update(result[0] or ())
+            state = result[1]
+        accepted = dfa.accepts(state, AT_END)
+        if accepted:
+            found.update(accepted)
+        return found
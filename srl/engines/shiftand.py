@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""Bit-parallel Shift-And search for fixed-length patterns of classes.
+
+Shift-And keeps one bit per pattern position and, for each character,
+shifts the bits and masks them with the positions whose class holds the
+character. Python loops over the text are slower than ``re``, so the
+roles are swapped: each class gets a bitmap over a chunk of text (bit
+``k`` set when character ``k`` is in the class), built in C by
+``str.translate`` to ``'0'``/``'1'`` and ``int(..., 2)``, and a match
+starts wherever ``bitmap[0] & bitmap[1] >> 1 & ... & bitmap[m-1] >> m-1``
+has a bit set. Every step of that runs in C, over the whole chunk at once.
+"""
+
+from bisect import bisect_left
+
+from .nfa import char_test
+
+try:
+    from itertools import accumulate
+except ImportError:
+    def accumulate(iterable):
+        total = 0
+        for item in iterable:
+            total += item
+            yield total
+
+try:
+    chr_ = unichr
+except NameError:
+    chr_ = chr
+
+# First chunk of text scanned at once; doubled up to _MAX_CHUNK while
+# nothing is found, so that early matches stay cheap.
+_CHUNK = 256
+_MAX_CHUNK = 1 << 20
+
+def worthwhile(classes):
+    """Whether scanning for ``classes`` beats ``re``: not when they start
+    with a literal character, which sre looks for with its own fast prefix
+    search."""
+    first = classes[0]
+    return not (len(first) == 1 and first != '.' or
+                len(first) == 2 and first[0] == '\\' and not first[1].isalnum())
+
+class _Bits(dict):
+    """Ordinal of a character to ``'1'`` if the class holds it, else ``'0'``."""
+
+    def __init__(self, test):
+        dict.__init__(self)
+        self.test = test
+
+    def __missing__(self, ordinal):
+        bit = self[ordinal] = '1' if self.test(chr_(ordinal)) else '0'
+        return bit
+
+# Tables are shared by every matcher using the same class.
+_shared = {}
+
+def _bits(source, flags):
+    key = source, flags
+    table = _shared.get(key)
+    if table is None:
+        table = _shared.setdefault(key, _Bits(char_test(source, flags)))
+    return table
+
+class ShiftAnd(object):
+    """Finds the texts whose ``i``-th character matches the regex
+    ``classes[i]`` (one character class or literal each)."""
+
+    def __init__(self, classes, flags=0):
+        if not classes:
+            raise ValueError('classes must not be empty')
+        self.classes = list(classes)
+        self.flags = flags
+        self.width = len(self.classes)
+        # One bitmap per distinct class, however many positions use it.
+        tables = {}
+        shifts = {}
+        for shift, source in enumerate(self.classes):
+            if source not in tables:
+                tables[source] = _bits(source, flags)
+                shifts[source] = []
+            shifts[source].append(shift)
+        self._shifts = [(tables[source], shifts[source])
+                        for source in sorted(tables, key=self.classes.index)]
+
+    def _matches(self, chunk):
+        """Bitmap of the offsets in ``chunk`` where a match starts."""
+        found = -1
+        for table, shifts in self._shifts:
+            # Reversed so that the first character is the lowest bit.
+            bits = int(chunk.translate(table)[::-1], 2)
+            for shift in shifts:
+                found &= bits >> shift
+            if not found:
+                break
+        return found
+
+    def _chunks(self, string, pos, endpos):
+        """(start, bitmap) of successive chunks of the text holding matches."""
+        width = self.width
+        size = _CHUNK
+        start = pos
+        while start <= endpos - width:
+            stop = min(start + size, endpos - width + 1)
+            found = self._matches(string[start:stop + width - 1])
+            if found:
+                yield start, found
+            start = stop
+            size = min(size * 2, _MAX_CHUNK)
+
+    def _starts(self, string, pos, endpos):
+        """Lists of the starts of successive non-overlapping matches."""
+        width = self.width
+        last = 0
+        for start, found in self._chunks(string, pos, endpos):
+            # Offsets of the set bits, from the lengths of the runs of zeros
+            # between them; all in C.
+            runs = bin(found)[:1:-1].split('1')
+            starts = list(map((start - 1).__add__,
+                              accumulate(map((1).__add__, map(len, runs[:-1])))))
+            if width > 1 and any(found & found >> shift for shift in range(1, width)):
+                kept = []
+                for offset in starts:
+                    if offset >= last:
+                        kept.append(offset)
+                        last = offset + width
+                starts = kept
+            else:
+                starts = starts[bisect_left(starts, last):]
+            if starts:
+                last = starts[-1] + width
+                yield starts
+
+    def find(self, string, pos=0, endpos=None):
+        """(start, end, 0) of the leftmost match at or after ``pos``, or None."""
+        endpos = len(string) if endpos is None else min(endpos, len(string))
+        for start, found in self._chunks(string, max(pos, 0), endpos):
+            start += (found & -found).bit_length() - 1
+            return start, start + self.width, 0
+        return None
+
+    def finditer(self, string, pos=0, endpos=None):
+        """(start, end, 0) of successive non-overlapping matches."""
+        endpos = len(string) if endpos is None else min(endpos, len(string))
+        width = self.width
+        for starts in self._starts(string, max(pos, 0), endpos):
+            for start in starts:
+                yield start, start + width, 0
+
+    def findall(self, string, pos=0, endpos=None):
+        """Texts of successive non-overlapping matches."""
+        endpos = len(string) if endpos is None else min(endpos, len(string))
+        result = []
+        for starts in self._starts(string, max(pos, 0), endpos):
+            result.extend(map(string.__getitem__,
+                              map(slice, starts, map(self.width.__add__, starts))))
+        return result
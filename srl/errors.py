@@ -35,3 +35,6 @@ class PregJITStackLimitError(PregException):
 
 class UnknownPregError(PregException):
     pass
+
+class UnsupportedPatternException(SRLException):
+    pass
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""Typed intermediate representation shared by the parser and the Builder.
+
+A pattern is a sequence of nodes. Quantifiers wrap the node they apply to,
+groups, alternations and lookarounds hold their sub-queries, so the whole
+query is a tree that can be analysed, cached or rendered without replaying
+Builder calls. Nodes are immutable, hashable and compare by value.
+"""
+
+import re
+
+class Node(object):
+    __slots__ = ()
+    _fields = ()
+    # Defaults for the trailing fields; leading fields default to None.
+    _defaults = ()
+
+    def __init__(self, *args, **kwargs):
+        fields = self._fields
+        if len(args) > len(fields):
+            raise TypeError('%s takes at most %d arguments' % (type(self).__name__, len(fields)))
+        defaults = (None, ) * (len(fields) - len(self._defaults)) + self._defaults
+        for index, name in enumerate(fields):
+            value = args[index] if index < len(args) else kwargs.pop(name, defaults[index])
+            object.__setattr__(self, name, value)
+        if kwargs:
+            raise TypeError('%s got unexpected fields %s' % (type(self).__name__, ', '.join(kwargs)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('%s is immutable' % type(self).__name__)
+
+    def _values(self):
+        return tuple(getattr(self, name) for name in self._fields)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self._values() == other._values()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((type(self).__name__, ) + self._values())
+
+    def __reduce__(self):
+        return type(self), self._values()
+
+    def __repr__(self):
+        return '%s(%s)' % (type(self).__name__,
+                           ', '.join(repr(value) for value in self._values()))
+
+    def replace(self, **changes):
+        values = dict(zip(self._fields, self._values()))
+        values.update(changes)
+        return type(self)(**values)
+
+    def render(self):
+        from .emitter import emit
+        return emit(self)
+
+_SPECIAL = frozenset('\\.^$*+?{}[]|()')
+
+_ESCAPES = {'\n': r'\n', '\t': r'\t', '\r': r'\r', '\f': r'\f', '\v': r'\v'}
+
+def escape(text):
+    return ''.join(_ESCAPES.get(char) or ('\\' + char if char in _SPECIAL else char)
+                   for char in text)
+
+class Literal(Node):
+    """Text matched exactly; regex metacharacters are escaped."""
+    __slots__ = _fields = ('text', )
+
+class CharClass(Node):
+    """One character out of ``ranges`` (pairs of bounds) and ``chars``.
+
+    ``chars`` is the body of a ``oneOf`` set and is used verbatim. A
+    ``category`` of ``'word'`` or ``'space'`` stands for ``\\w``/``\\s``.
+    """
+    __slots__ = _fields = ('ranges', 'chars', 'category', 'negated')
+    _defaults = ((), '', None, False)
+
+class AnyChar(Node):
+    """Any character but a new line (unless DOTALL is set)."""
+    __slots__ = _fields = ()
+
+class Raw(Node):
+    """A regex fragment inserted as is. Opaque to any analysis."""
+    __slots__ = _fields = ('regex', )
+
+class Anchor(Node):
+    __slots__ = _fields = ('kind', )
+
+    BEGIN = 'begin'
+    END = 'end'
+
+class Quantifier(Node):
+    """``child`` repeated ``min`` to ``max`` times (``max=None``: unbounded)."""
+    __slots__ = _fields = ('child', 'min', 'max', 'lazy')
+    _defaults = (None, 0, None, False)
+
+    def suffix(self):
+        bounds = self.min, self.max
+        if bounds == (0, None):
+            suffix = '*'
+        elif bounds == (1, None):
+            suffix = '+'
+        elif bounds == (0, 1):
+            suffix = '?'
+        elif self.max is None:
+            suffix = '{%d,}' % self.min
+        elif self.min == self.max:
+            suffix = '{%d}' % self.min
+        else:
+            suffix = '{%d,%d}' % bounds
+        return suffix + '?' if self.lazy else suffix
+
+class Group(Node):
+    """A sub-query, capturing (optionally ``name``d) unless ``capture`` is off."""
+    __slots__ = _fields = ('body', 'capture', 'name')
+    _defaults = ((), True, None)
+
+class Atomic(Group):
+    """A non-capturing group that is never backtracked into, ``(?>...)``.
+
+    Only srl.redos creates these, where giving characters back could not
+    lead to a match, so engines without atomic groups may treat them as
+    plain groups. ``re`` supports them from Python 3.11 on.
+    """
+    __slots__ = ()
+    _defaults = ((), False, None)
+
+class Alternation(Node):
+    """Any one of ``branches``, tried in order."""
+    __slots__ = _fields = ('branches', )
+
+class Lookaround(Node):
+    __slots__ = _fields = ('body', 'behind', 'negative')
+    _defaults = ((), False, False)
+
+class Pattern(Node):
+    """A whole query: top-level nodes plus ``re`` flags."""
+    __slots__ = _fields = ('nodes', 'flags')
+    _defaults = ((), 0)
+
+# Statements that only exist while a query is being assembled; append()
+# folds them into the preceding node or, for flags, into the Pattern.
+
+class Flag(Node):
+    __slots__ = _fields = ('flag', )
+
+class Lazy(Node):
+    """Make the previous node lazy. ``optional`` makes it optional when it has
+    no quantifier to make lazy (``all lazy``); otherwise it is left as is."""
+    __slots__ = _fields = ('optional', )
+
+def lazy(node):
+    """Return ``node`` with its trailing quantifier made lazy, or None.
+
+    The quantifier is either ``node`` itself or the last node of a group.
+    """
+    if isinstance(node, Quantifier):
+        return None if node.lazy else node.replace(lazy=True)
+    field = 'branches' if isinstance(node, Alternation) else 'body'
+    children = getattr(node, field, None)
+    if isinstance(node, (Group, Lookaround, Alternation)) and children:
+        last = children[-1]
+        if isinstance(last, Quantifier) and not last.lazy:
+            return node.replace(**{field: children[:-1] + (last.replace(lazy=True), )})
+    return None
+
+def append(nodes, node):
+    """Append ``node`` to the list ``nodes``, applying postfix statements."""
+    if isinstance(node, Quantifier) and node.child is None and nodes:
+        nodes[-1] = node.replace(child=nodes[-1])
+    elif isinstance(node, Lazy):
+        previous = nodes[-1] if nodes else None
+        made_lazy = lazy(previous)
+        if made_lazy is not None:
+            nodes[-1] = made_lazy
+        elif node.optional:
+            append(nodes, Quantifier(None, 0, 1))
+    else:
+        nodes.append(node)
+    return nodes
+
+def pattern(nodes, flags=0):
+    """Build a Pattern from parsed statements, collecting Flag statements."""
+    body = []
+    for node in nodes:
+        if isinstance(node, Flag):
+            flags |= node.flag
+        else:
+            body.append(node)
+    return Pattern(tuple(body), flags)
+
+_GROUPS = {
+    '(%s)': lambda body: Group(body),
+    '(?:%s)': lambda body: Group(body, False),
+    '(?=%s)': lambda body: Lookaround(body),
+    '(?!%s)': lambda body: Lookaround(body, False, True),
+    '(?<=%s)': lambda body: Lookaround(body, True),
+    '(?<!%s)': lambda body: Lookaround(body, True, True),
+}
+
+_NAMED_GROUP = re.compile(r'\(\?P<(\w+)>%s\)$')
+
+def wrap(template, nodes, alternate=False):
+    """Nodes for ``nodes`` placed in a Builder ``group`` template.
+
+    ``alternate`` makes every node a branch of an Alternation first.
+    """
+    body = (Alternation(tuple(nodes)), ) if alternate else tuple(nodes)
+    if template == '%s' or alternate and template == '(?:%s)':
+        return list(body)
+    if template in _GROUPS:
+        return [_GROUPS[template](body)]
+    named = _NAMED_GROUP.match(template)
+    if named:
+        return [Group(body, True, named.group(1))]
+    return [Raw(template % ''.join(node.render() for node in body))]
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""Optional peephole pass over the IR.
+
+optimize() returns an equivalent Pattern (same matches, same groups) that
+renders to a shorter regex when emitted with ``emit(..., compact=True)``:
+
+- adjacent literals are merged and ``x x x`` becomes ``x{3}``;
+- non-capturing groups that do not change precedence are dropped;
+- alternations of single characters become one character class, with
+  overlapping or adjacent ranges merged;
+- alternations of literals are factored into a prefix trie, so
+  ``any of ("get", "getall", "post")`` becomes ``(?:get(?:all)??|post)``.
+
+Captures, Raw fragments and lookarounds are never moved or merged. A Raw
+fragment may apply to its neighbours (``raw "+"`` repeats what precedes
+it), so patterns holding one are returned unchanged.
+"""
+
+import re
+
+from . import ir
+
+def optimize(pattern, flags=0):
+    """Optimized copy of ``pattern``; ``flags`` are the extra re flags it
+    will be compiled with."""
+    if any(_has_opaque(node, ir.Raw) for node in pattern.nodes):
+        return pattern
+    # Factoring relies on different characters never matching the same
+    # text, which IGNORECASE breaks.
+    factor = not (flags | pattern.flags) & re.IGNORECASE
+    nodes = _sequence(pattern.nodes, factor)
+    first = nodes[0] if nodes else None
+    if isinstance(first, ir.Quantifier) and first.min == first.max > 1 and \
+            _repeatable(first.child):
+        # A leading single atom lets sre scan for the first character
+        # quickly; a leading {n} repeat makes it try every position.
+        nodes[:1] = [first.child, first.replace(min=first.min - 1, max=first.max - 1)]
+    return pattern.replace(nodes=tuple(nodes))
+
+def _sequence(nodes, factor):
+    result = []
+    for node in nodes:
+        node = _node(node, factor)
+        if type(node) is ir.Group and not node.capture and \
+                not any(isinstance(child, ir.Raw) for child in node.body):
+            # (?:a b) in a sequence is just a b.
+            for child in node.body:
+                _extend(result, child)
+        else:
+            _extend(result, node)
+    return result
+
+def _extend(result, node):
+    previous = result[-1] if result else None
+    if isinstance(node, ir.Literal) and isinstance(previous, ir.Literal):
+        result[-1] = ir.Literal(previous.text + node.text)
+    elif _repeatable(node) and isinstance(previous, ir.Quantifier) and \
+            previous.child == node and previous.min == previous.max:
+        result[-1] = previous.replace(min=previous.min + 1, max=previous.max + 1)
+    elif _repeatable(node) and len(result) > 1 and result[-2] == previous == node:
+        # Runs of three or more; sre matches "xx" faster than "x{2}".
+        result[-2:] = [ir.Quantifier(node, 3, 3)]
+    else:
+        result.append(node)
+
+def _repeatable(node):
+    if isinstance(node, (ir.CharClass, ir.AnyChar)):
+        return True
+    if isinstance(node, ir.Group) and not node.capture or isinstance(node, ir.Alternation):
+        return not _has_opaque(node)
+    return False
+
+def _has_opaque(node, opaque=(ir.Raw, ir.Group)):
+    # Captures renumber and Raw may hold anything, so never duplicate them.
+    if isinstance(node, opaque) and getattr(node, 'capture', True):
+        return True
+    children = getattr(node, 'branches', None) or getattr(node, 'body', None) or ()
+    if isinstance(node, ir.Quantifier):
+        children = (node.child, )
+    return any(_has_opaque(child, opaque) for child in children)
+
+def _node(node, factor):
+    if isinstance(node, ir.Quantifier):
+        return _quantifier(node, factor)
+    if isinstance(node, ir.Group):
+        body = tuple(_sequence(node.body, factor))
+        # Atomic groups keep their body from being backtracked into.
+        if type(node) is ir.Group and not node.capture and len(body) == 1 and \
+                not isinstance(body[0], ir.Raw):
+            return body[0]
+        return node.replace(body=body)
+    if isinstance(node, ir.Lookaround):
+        return node.replace(body=tuple(_sequence(node.body, factor)))
+    if isinstance(node, ir.Alternation):
+        return _alternation(node, factor)
+    if isinstance(node, ir.CharClass):
+        return _char_class([node]) or node
+    return node
+
+def _quantifier(node, factor):
+    if node.child is None:
+        return node
+    child = _node(node.child, factor)
+    if node.min == node.max == 1 and not isinstance(child, ir.Quantifier):
+        return child
+    if not isinstance(node.child, ir.Quantifier) and \
+            isinstance(child, (ir.Quantifier, ir.Anchor, ir.Lookaround)):
+        # Unwrapped, the suffix would apply differently (a+? is lazy).
+        child = ir.Group((child, ), False)
+    return node.replace(child=child)
+
+def _alternation(node, factor):
+    branches = []
+    for branch in node.branches:
+        branch = _node(branch, factor)
+        # (?:a|(?:b|c)) tries the same alternatives in the same order.
+        if isinstance(branch, ir.Alternation) and branch.branches:
+            branches.extend(branch.branches)
+        else:
+            branches.append(branch)
+    if len(branches) == 1 and not isinstance(branches[0], (ir.Quantifier, ir.Raw)):
+        return branches[0]
+    # Each branch matches exactly one character, so order does not matter.
+    merged = _char_class(branches)
+    if merged is not None:
+        return merged
+    if factor and len(branches) > 1 and all(isinstance(branch, ir.Literal) for branch in branches):
+        return _factor([branch.text for branch in branches])
+    return node.replace(branches=tuple(branches))
+
+_CLASS_ESCAPES = {'\n': r'\n', '\t': r'\t', '\r': r'\r', '\f': r'\f', '\v': r'\v'}
+
+def _class_char(char):
+    if char in _CLASS_ESCAPES:
+        return _CLASS_ESCAPES[char]
+    return char if char.isalnum() or char == '_' else '\\' + char
+
+def _char_class(members):
+    """A single CharClass matching any of ``members``, or None."""
+    if not members:
+        return None
+    ranges = []
+    plain = []
+    verbatim = []
+    for member in members:
+        if isinstance(member, ir.Literal) and len(member.text) == 1:
+            plain.append(_class_char(member.text))
+        elif isinstance(member, ir.CharClass) and not member.negated:
+            if member.category:
+                plain.append(ir.CharClass(category=member.category).render())
+            ranges.extend(member.ranges)
+            if member.chars:
+                verbatim.append(member.chars)
+        elif isinstance(member, ir.CharClass) and member.category and len(members) > 1:
+            plain.append(member.render())
+        else:
+            return None
+    # oneOf() bodies are regex class syntax; only one that could form a
+    # range with its neighbours can be kept, and it has to come last. A
+    # leading ] only stands for itself at the start of a class.
+    complex_chars = [chars for chars in verbatim if set(chars) & set('\\-^[]')]
+    if len(complex_chars) > 1 or complex_chars and complex_chars[0][:1] in ('-', '^', ']'):
+        return None
+    chars = ''.join(plain + [chars for chars in verbatim if chars not in complex_chars]
+                    + complex_chars)
+    if len(members) == 1 and not ranges:
+        return None
+    return ir.CharClass(tuple(_merge_ranges(ranges)), chars)
+
+def _merge_ranges(ranges):
+    merged = []
+    for start, end in sorted(set(ranges), key=lambda bounds: (ord(bounds[0][0]), bounds)):
+        if len(start) != 1 or len(end) != 1 or start > end:
+            merged.append((start, end))
+        elif merged and len(merged[-1][1]) == 1 and merged[-1][0] <= merged[-1][1] \
+                and ord(start) <= ord(merged[-1][1]) + 1:
+            if ord(end) > ord(merged[-1][1]):
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+# A trie node is a list of children in insertion order: (char, node) pairs
+# and at most one _END, marking that an alternative ends here.
+_END = None
+
+def _factor(texts):
+    """Node for an alternation of ``texts`` with common prefixes factored.
+
+    Alternatives are tried in the same order as in the alternation: children
+    with different first characters never match the same text, and a text
+    that comes after an alternative ending at a node is not merged into any
+    child created before that end (the end acts as a barrier).
+    """
+    root = []
+    for text in texts:
+        trie = root
+        for char in text:
+            barrier = trie.index(_END) if _END in trie else -1
+            for child in trie[barrier + 1:]:
+                if child[0] == char:
+                    trie = child[1]
+                    break
+            else:
+                child = (char, [])
+                trie.append(child)
+                trie = child[1]
+        if _END not in trie:
+            # A repeated alternative can never match where the first failed.
+            trie.append(_END)
+    nodes = _trie_sequence(root)
+    return nodes[0] if len(nodes) == 1 else ir.Group(tuple(nodes), False)
+
+def _trie_sequence(trie):
+    text = []
+    while len(trie) == 1 and trie[0] is not _END:
+        char, trie = trie[0]
+        text.append(char)
+    nodes = [ir.Literal(''.join(text))] if text else []
+    children = [child for child in trie if child is not _END]
+    if not children:
+        return nodes
+    branches = []
+    for child in children:
+        sequence = _trie_sequence([child])
+        branches.append(sequence[0] if len(sequence) == 1
+                        else ir.Group(tuple(sequence), False))
+    if _END in trie[1:-1]:
+        branches.insert(trie.index(_END), ir.Group((), False))
+        nodes.append(ir.Alternation(tuple(branches)))
+        return nodes
+    if len(branches) > 1 and all(child[1] == [_END] for child in children):
+        choice = ir.CharClass(chars=''.join(_class_char(char) for char, _ in children))
+    elif len(branches) > 1:
+        choice = ir.Alternation(tuple(branches))
+    else:
+        choice = branches[0]
+    if _END in trie:
+        # Ending first means the shorter alternative wins: a lazy "?".
+        choice = ir.Quantifier(choice, 0, 1, trie[0] is _END)
+    nodes.append(choice)
+    return nodes
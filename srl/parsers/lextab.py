@@ -0,0 +1,10 @@
+# lextab.py. This file automatically created by PLY (version 3.9). Don't edit!
+_tabversion   = '3.8'
+_lextokens    = set(('K_CASE', 'K_LAZY', 'CHARACTER', 'K_RAW', 'K_NEVER', 'K_DIGIT', 'K_OR', 'K_CAPTURE', 'K_TIMES', 'K_IF', 'K_WITH', 'K_AS', 'K_MUST', 'K_CHARACTER', 'RIGHT_PARENTHESIS', 'K_ANYTHING', 'WORD', 'K_LINE', 'K_UNTIL', 'COMMA', 'LEFT_PARENTHESIS', 'K_HAD', 'NUMBER', 'K_OPTIONAL', 'K_ANY', 'K_UPPERCASE', 'K_BEGIN', 'K_ALREADY', 'K_ONCE', 'K_INSENSITIVE', 'K_ALL', 'K_FOLLOWED', 'K_TO', 'K_MULTI', 'K_LETTER', 'K_FROM', 'K_END', 'K_NEW', 'K_MORE', 'K_AT', 'K_LEAST', 'K_AND', 'K_BY', 'K_STARTS', 'K_EXACTLY', 'K_OF', 'K_LITERALLY', 'K_WHITESPACE', 'K_ONE', 'K_NO', 'STRING', 'K_EITHER', 'K_TAB', 'K_BETWEEN'))
+_lexreflags   = 0
+_lexliterals  = ''
+_lexstateinfo = {'INITIAL': 'inclusive'}
+_lexstatere   = {'INITIAL': [('(?P<t_NUMBER>\\d+)|(?P<t_WORD>[a-z]{1,12})|(?P<t_newline>\\n+)|(?P<t_STRING>\\"([^\\\\\\n]|(\\\\.))*?\\")|(?P<t_LEFT_PARENTHESIS>\\()|(?P<t_RIGHT_PARENTHESIS>\\))|(?P<t_CHARACTER>.)|(?P<t_COMMA>,)', [None, ('t_NUMBER', 'NUMBER'), ('t_WORD', 'WORD'), ('t_newline', 'newline'), (None, 'STRING'), None, None, (None, 'LEFT_PARENTHESIS'), (None, 'RIGHT_PARENTHESIS'), (None, 'CHARACTER'), (None, 'COMMA')])]}
+_lexstateignore = {'INITIAL': ' ,\t'}
+_lexstateerrorf = {'INITIAL': 't_error'}
+_lexstateeoff = {}
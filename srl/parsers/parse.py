@@ -1,8 +1,75 @@
 # -*- coding: utf-8 -*-
 
+import copy
+import re
+import threading
+
+from .. import ir
 from ..utils import lex
 from ..utils import yacc
 
+# Pre-generated by srl.parsers.tables and shipped with the package.
+LEXTAB = __package__ + '.lextab'
+PARSETAB = __package__ + '.parsetab'
+
+# Reserved words and the token each one produces.
+reserved = {
+    'literally': 'K_LITERALLY',
+    'one': 'K_ONE',
+    'of': 'K_OF',
+    'letter': 'K_LETTER',
+    'from': 'K_FROM',
+    'to': 'K_TO',
+    'uppercase': 'K_UPPERCASE',
+    'any': 'K_ANY',
+    'either': 'K_EITHER',
+    'no': 'K_NO',
+    'digit': 'K_DIGIT',
+    'anything': 'K_ANYTHING',
+    'new': 'K_NEW',
+    'line': 'K_LINE',
+    'whitespace': 'K_WHITESPACE',
+    'tab': 'K_TAB',
+    'raw': 'K_RAW',
+    'exactly': 'K_EXACTLY',
+    'times': 'K_TIMES',
+    'between': 'K_BETWEEN',
+    'and': 'K_AND',
+    'optional': 'K_OPTIONAL',
+    'once': 'K_ONCE',
+    'never': 'K_NEVER',
+    'or': 'K_OR',
+    'more': 'K_MORE',
+    'at': 'K_AT',
+    'least': 'K_LEAST',
+    'as': 'K_AS',
+    'until': 'K_UNTIL',
+    'capture': 'K_CAPTURE',
+    'if': 'K_IF',
+    'followed': 'K_FOLLOWED',
+    'by': 'K_BY',
+    'already': 'K_ALREADY',
+    'had': 'K_HAD',
+    'case': 'K_CASE',
+    'insensitive': 'K_INSENSITIVE',
+    'multi': 'K_MULTI',
+    'all': 'K_ALL',
+    'lazy': 'K_LAZY',
+    'begin': 'K_BEGIN',
+    'starts': 'K_STARTS',
+    'with': 'K_WITH',
+    'must': 'K_MUST',
+    'end': 'K_END',
+    'character': 'K_CHARACTER',
+}
+
+# Longest first, so the first keyword prefixing a word is the longest one.
+_keywords_by_length = sorted(reserved, key=len, reverse=True)
+
+# Longer than any keyword: enough to tell a keyword from a longer word and
+# to find the longest keyword prefix, while keeping each token match short.
+_WORD_LENGTH = len(_keywords_by_length[0]) + 1
+
 # List of token names.
 tokens = (
     # Symbols
@@ -13,56 +80,9 @@ tokens = (
     'CHARACTER',
     'STRING',
 
-    # Keywords
-    'K_LITERALLY',
-    'K_ONE',
-    'K_OF',
-    'K_LETTER',
-    'K_FROM',
-    'K_TO',
-    'K_UPPERCASE',
-    'K_ANY',
-    'K_EITHER',
-    'K_NO',
-    'K_DIGIT',
-    'K_ANYTHING',
-    'K_NEW',
-    'K_LINE',
-    'K_WHITESPACE',
-    'K_TAB',
-    'K_RAW',
-    'K_EXACTLY',
-    'K_TIMES',
-    'K_BETWEEN',
-    'K_AND',
-    'K_OPTIONAL',
-    'K_ONCE',
-    'K_NEVER',
-    'K_OR',
-    'K_MORE',
-    'K_AT',
-    'K_LEAST',
-    'K_AS',
-    'K_UNTIL',
-    'K_CAPTURE',
-    'K_IF',
-    'K_FOLLOWED',
-    'K_BY',
-    'K_ALREADY',
-    'K_HAD',
-    'K_CASE',
-    'K_INSENSITIVE',
-    'K_MULTI',
-    'K_ALL',
-    'K_LAZY',
-    'K_BEGIN',
-    'K_STARTS',
-    'K_WITH',
-    'K_MUST',
-    'K_END',
-    'K_CHARACTER',
-
-)
+    # Only used to name t_WORD; it always returns a keyword or a CHARACTER.
+    'WORD',
+) + tuple(reserved.values())
 
 # Regular expression rules for tokens
 t_LEFT_PARENTHESIS = r'\('
@@ -74,54 +94,30 @@ def t_NUMBER(t):
     t.value = int(t.value)
     return t
 
+# Bounded so that a long run of letters lexed one CHARACTER at a time is
+# not rescanned to its end for every token.
+@lex.TOKEN(r'[a-z]{1,%d}' % _WORD_LENGTH)
+def t_WORD(t):
+    try:
+        t.type = reserved[t.value]
+        return t
+    except KeyError:
+        pass
+    # Keywords are not delimited: keep lexing a glued word ("anyone") as its
+    # longest keyword prefix, or else as a single CHARACTER.
+    word = t.value
+    for keyword in _keywords_by_length:
+        if word.startswith(keyword):
+            t.type = reserved[keyword]
+            break
+    else:
+        keyword = word[0]
+        t.type = 'CHARACTER'
+    t.value = keyword
+    t.lexer.lexpos = t.lexpos + len(keyword)
+    return t
+
 t_STRING = r'\"([^\\\n]|(\\.))*?\"'
-t_K_LITERALLY = r'literally'
-t_K_ONE = r'one'
-t_K_OF = r'of'
-t_K_LETTER = r'letter'
-t_K_FROM = r'from'
-t_K_TO = r'to'
-t_K_UPPERCASE = r'uppercase'
-t_K_ANY = r'any'
-t_K_EITHER = r'either'
-t_K_NO = r'no'
-t_K_DIGIT = r'digit'
-t_K_ANYTHING = r'anything'
-t_K_NEW = r'new'
-t_K_LINE = r'line'
-t_K_WHITESPACE = r'whitespace'
-t_K_TAB = r'tab'
-t_K_RAW = r'raw'
-t_K_EXACTLY = r'exactly'
-t_K_TIMES = r'times'
-t_K_BETWEEN = r'between'
-t_K_AND = r'and'
-t_K_OPTIONAL = r'optional'
-t_K_ONCE = r'once'
-t_K_NEVER = r'never'
-t_K_OR = r'or'
-t_K_MORE = r'more'
-t_K_AT = r'at'
-t_K_LEAST = r'least'
-t_K_AS = r'as'
-t_K_UNTIL = r'until'
-t_K_CAPTURE = r'capture'
-t_K_IF = r'if'
-t_K_FOLLOWED = r'followed'
-t_K_BY = r'by'
-t_K_ALREADY = r'already'
-t_K_HAD = r'had'
-t_K_CASE = r'case'
-t_K_INSENSITIVE = r'insensitive'
-t_K_MULTI = r'multi'
-t_K_ALL = r'all'
-t_K_LAZY = r'lazy'
-t_K_BEGIN = r'begin'
-t_K_STARTS = r'starts'
-t_K_WITH = r'with'
-t_K_MUST = r'must'
-t_K_END = r'end'
-t_K_CHARACTER = r'character'
 
 # Define a rule so we can track line numbers
 def t_newline(t):
@@ -138,217 +134,241 @@ def t_error(t):
     print("Illegal character '%s'" % t.value[0])
     t.lexer.skip(1)
 
+def build_lexer():
+    # lex.lex() writes a fresh lextab when the shipped one cannot be
+    # imported in optimize mode, so only use optimize mode when it exists.
+    try:
+        __import__(LEXTAB)
+    except ImportError:
+        return lex.lex()
+    return lex.lex(optimize=True, lextab=LEXTAB)
+
 # Build the lexer
-lexer = lex.lex()
+lexer = build_lexer()
 
-def p_character_with_quantifier(p):
-    '''character : character quantifier
+# A query is a flat sequence of statements; quantifiers, anchors and flags
+# apply to whatever precedes them, exactly like the Builder methods do.
+start = 'query'
+
+def p_query_statements(p):
+    '''query : query statement
     '''
-    p[0] = []
-    p[0] += p[1]
-    p[0] += p[2]
-
-def p_character_with_anchor(p):
-    '''character : character anchor
-                 | anchor character
-                 | anchor anchor
-                 | character flag
+    # Left recursion extending the same list keeps parsing linear in the
+    # number of statements.
+    p[0] = p[1]
+    for node in p[2]:
+        ir.append(p[0], node)
+
+def p_query_statement(p):
+    '''query : statement
     '''
     p[0] = []
-    p[0] += p[1]
-    p[0] += p[2]
-
-def p_character_with_quantfier_and_anchor(p):
-    '''character : character quantifier anchor
+    for node in p[1]:
+        ir.append(p[0], node)
+
+def p_statement(p):
+    '''statement : character
+                 | quantifier
+                 | anchor
+                 | flag
     '''
-    p[0] = []
-    p[0] += p[1]
-    p[0] += p[2]
-    p[0] += p[3]
+    p[0] = p[1]
 
 def p_character_literally(p):
     'character : K_LITERALLY STRING'
-    p[0] = [('literally', (p[2][1:-1], ))]
+    p[0] = [ir.Literal(p[2][1:-1])]
 
 def p_character_one_of(p):
     'character : K_ONE K_OF STRING'
-    p[0] = [('oneOf', (p[3][1:-1], ))]
+    p[0] = [ir.CharClass(chars=p[3][1:-1])]
 
 def p_character_letter(p):
     '''character : K_LETTER
                  | K_LETTER K_FROM CHARACTER K_TO CHARACTER
     '''
-    p[0] = []
     if len(p) == 6:
         char_from = p[3]
         char_to = p[5]
     else:
         char_from = 'a'
         char_to = 'z'
-    p[0].append(('letter', (char_from, char_to, ), ))
+    p[0] = [ir.CharClass(((char_from, char_to), ))]
 
 def p_character_uppercase_letter(p):
     '''character : K_UPPERCASE K_LETTER
                  | K_UPPERCASE K_LETTER K_FROM CHARACTER K_TO CHARACTER
     '''
-    p[0] = p[0] or []
     if len(p) == 7:
         char_from = p[4]
         char_to = p[6]
     else:
         char_from = 'A'
         char_to = 'Z'
-    p[0].append(('letter', (char_from, char_to, ), ))
+    p[0] = [ir.CharClass(((char_from, char_to), ))]
 
 def p_character_any_character(p):
     'character : K_ANY K_CHARACTER'
-    p[0] = [('anyCharacter', ())]
+    p[0] = [ir.CharClass(category='word')]
 
 def p_character_no_character(p):
     'character : K_NO K_CHARACTER'
-    p[0] = [('noCharacter', ())]
+    p[0] = [ir.CharClass(category='word', negated=True)]
 
 def p_character_digit(p):
     '''character : K_DIGIT
                  | K_DIGIT K_FROM NUMBER K_TO NUMBER
     '''
-    p[0] = p[0] or []
     if len(p) == 6:
         num_from = p[3]
         num_to= p[5]
     else:
         num_from = 0
         num_to = 9
-    p[0].append(('digit', (num_from, num_to, ), ))
+    p[0] = [ir.CharClass(((str(num_from), str(num_to)), ))]
 
 def p_character_anything(p):
     'character : K_ANYTHING'
-    p[0] = [('anything', ())]
+    p[0] = [ir.AnyChar()]
 
 def p_character_new_line(p):
     'character : K_NEW K_LINE'
-    p[0] = [('newLine', ())]
+    p[0] = [ir.CharClass(chars='\n')]
 
 def p_character_whitespace(p):
     '''character : K_WHITESPACE
     '''
-    p[0] = [('whitespace', ())]
+    p[0] = [ir.CharClass(category='space')]
 
 def p_character_no_whitespace(p):
     'character : K_NO K_WHITESPACE'
-    p[0] = [('noWhitespace', ())]
+    p[0] = [ir.CharClass(category='space', negated=True)]
 
 def p_character_tab(p):
     'character : K_TAB'
-    p[0] = [('tab', ())]
+    p[0] = [ir.CharClass(chars='\t')]
 
 def p_character_raw(p):
     'character : K_RAW STRING'
-    p[0] = [('raw', (p[2][1:-1], ))]
+    p[0] = [ir.Raw(p[2][1:-1])]
+
+# Quantifiers, anchors and flags are postfix statements: ir.append() wraps
+# (or updates) the node before them.
 
 def p_quantifier_exactly_x_times(p):
     'quantifier : K_EXACTLY NUMBER K_TIMES'
-    p[0] = [('exactly', (p[2], ))]
+    p[0] = [ir.Quantifier(None, p[2], p[2])]
 
 def p_quantifier_between_x_and_y_times(p):
     '''quantifier : K_BETWEEN NUMBER K_AND NUMBER K_TIMES
                   | K_BETWEEN NUMBER K_AND NUMBER
     '''
-    p[0] = [('between', (p[2], p[4], ))]
+    p[0] = [ir.Quantifier(None, p[2], p[4])]
 
 def p_quantifier_optional(p):
     'quantifier : K_OPTIONAL'
-    p[0] = [('optional', ())]
+    p[0] = [ir.Quantifier(None, 0, 1)]
 
 def p_quantifier_once_or_more(p):
     'quantifier : K_ONCE K_OR K_MORE'
-    p[0] = [('onceOrMore', ())]
+    p[0] = [ir.Quantifier(None, 1, None)]
 
 def p_quantifier_never_or_more(p):
     'quantifier : K_NEVER K_OR K_MORE'
-    p[0] = [('neverOrMore', ())]
+    p[0] = [ir.Quantifier(None, 0, None)]
 
 def p_quantifier_at_least_x_times(p):
     'quantifier : K_AT K_LEAST NUMBER K_TIMES'
-    p[0] = [('atLeast', (p[3], ))]
+    p[0] = [ir.Quantifier(None, p[3], None)]
 
 
 def p_group_string(p):
     'group : STRING'
-    p[0] = ('lambda', [('literally', (p[1][1:-1], ))])
+    p[0] = (ir.Literal(p[1][1:-1]), )
 
 def p_group_subquery(p):
-    'group : LEFT_PARENTHESIS character RIGHT_PARENTHESIS'
-    p[0] = ('lambda', p[2])
+    'group : LEFT_PARENTHESIS query RIGHT_PARENTHESIS'
+    # Flags only apply to the whole query, as with a Builder sub-query.
+    p[0] = tuple(node for node in p[2] if not isinstance(node, ir.Flag))
 
 def p_character_capture(p):
     'character : K_CAPTURE group'
-    p[0] = [('capture', (p[2], None))]
+    p[0] = [ir.Group(p[2])]
 
 def p_character_capture_as(p):
     'character : K_CAPTURE group K_AS STRING'
-    p[0] = [('capture', (p[2], p[4][1:-1]))]
+    p[0] = [ir.Group(p[2], True, p[4][1:-1])]
 
 def p_group_any_of(p):
     '''character : K_ANY K_OF group
                  | K_EITHER K_OF group
     '''
-    p[0] = [('anyOf', (p[3], ))]
+    p[0] = [ir.Alternation(p[3])]
 
-def p_group_until(p):
-    '''group : K_UNTIL group
+def p_character_until(p):
+    '''character : K_UNTIL group
     '''
-    p[0] = p[0] or []
-    conditions = ('lambda', p[3])
-    p[0].append(('until', (conditions, )))
+    p[0] = [ir.Lazy(False)] + list(p[2])
 
 def p_flag_case_insensitive(p):
     '''flag : K_CASE K_INSENSITIVE
     '''
-    p[0] = [('caseInsensitive', ())]
+    p[0] = [ir.Flag(re.IGNORECASE)]
 
 def p_flag_multi_line(p):
     '''flag : K_MULTI K_LINE
     '''
-    p[0] = [('multiLine', ())]
+    p[0] = [ir.Flag(re.MULTILINE)]
 
 def p_flag_all_lazy(p):
     '''flag : K_ALL K_LAZY
     '''
-    p[0] = [('allLazy', ())]
+    p[0] = [ir.Lazy(True)]
 
 def p_anchor_begin_with(p):
     '''anchor : K_BEGIN K_WITH
               | K_STARTS K_WITH
     '''
-    p[0] = p[0] or []
-    p[0].append(('beginWith', ()))
-    if len(p) == 4:
-        p[0] += p[3]
+    p[0] = [ir.Anchor(ir.Anchor.BEGIN)]
 
 def p_anchor_must_end(p):
     '''anchor : K_MUST K_END
     '''
-    p[0] = p[0] or []
-    if len(p) == 4:
-        p[0] += p[1]
-    p[0].append(('mustEnd', ()))
-
-def p_query_srl(p):
-    '''query : group
-             | character
-             | character quantifier
-    '''
-    p[0] = []
-    if len(p) == 2:
-        p[0] += p[1]
-    elif len(p) == 3:
-        p[0] += p[1]
-        p[0] += p[2]
+    p[0] = [ir.Anchor(ir.Anchor.END)]
 
 def p_error(p):
     print("Syntax error in input!", p)
 
+# The LALR tables are built on first use and shared by every parse() call.
+_parser = None
+_parser_lock = threading.Lock()
+
+# PLY keeps the input position on the Lexer and the parse stacks on the
+# LRParser, so each thread parses with its own shallow copies. The copies
+# share the (read-only) master regexes and LR tables.
+_local = threading.local()
+
+def get_parser():
+    global _parser
+    if _parser is None:
+        with _parser_lock:
+            if _parser is None:
+                _parser = yacc.yacc(debug=False, optimize=True,
+                                    tabmodule=PARSETAB, write_tables=False)
+    return _parser
+
+def get_thread_parser():
+    try:
+        return _local.lexer, _local.parser
+    except AttributeError:
+        _local.lexer = lexer.clone()
+        _local.parser = copy.copy(get_parser())
+        return _local.lexer, _local.parser
+
 def parse(string):
-    parser = yacc.yacc(debug=False)
-    return parser.parse(string, lexer=lexer, tracking=False)
+    """Parse a query into an ir.Pattern, or None on a syntax error."""
+    thread_lexer, thread_parser = get_thread_parser()
+    thread_lexer.lineno = 1
+    statements = thread_parser.parse(string, lexer=thread_lexer, tracking=False)
+    if statements is None:
+        return None
+    return ir.pattern(statements)
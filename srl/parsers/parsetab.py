@@ -0,0 +1,69 @@
+
+# parsetab.py
+# This file is automatically generated. Do not edit.
+_tabversion = '3.8'
+_lr_method = 'LALR'
+_lr_signature = '5FEBEE3051EB28F49DCB0E27944BC16D'
+    
+_lr_action_items = {'K_LITERALLY':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[7,7,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,7,-36,-40,-41,-42,-37,-38,-39,-8,-34,7,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_ONE':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[8,8,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,8,-36,-40,-41,-42,-37,-38,-39,-8,-34,8,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_LETTER':([0,1,2,3,4,5,6,9,10,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[9,9,-2,-3,-4,-5,-6,-9,38,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,9,-36,-40,-41,-42,-37,-38,-39,-8,-34,9,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_UPPERCASE':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[10,10,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,10,-36,-40,-41,-42,-37,-38,-39,-8,-34,10,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_ANY':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[11,11,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,11,-36,-40,-41,-42,-37,-38,-39,-8,-34,11,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_NO':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[12,12,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,12,-36,-40,-41,-42,-37,-38,-39,-8,-34,12,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_DIGIT':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[13,13,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,13,-36,-40,-41,-42,-37,-38,-39,-8,-34,13,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_ANYTHING':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[14,14,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,14,-36,-40,-41,-42,-37,-38,-39,-8,-34,14,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_NEW':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[15,15,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,15,-36,-40,-41,-42,-37,-38,-39,-8,-34,15,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_WHITESPACE':([0,1,2,3,4,5,6,9,12,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[16,16,-2,-3,-4,-5,-6,-9,42,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,16,-36,-40,-41,-42,-37,-38,-39,-8,-34,16,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_TAB':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[17,17,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,17,-36,-40,-41,-42,-37,-38,-39,-8,-34,17,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_RAW':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[18,18,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,18,-36,-40,-41,-42,-37,-38,-39,-8,-34,18,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_CAPTURE':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[19,19,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,19,-36,-40,-41,-42,-37,-38,-39,-8,-34,19,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_EITHER':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[20,20,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,20,-36,-40,-41,-42,-37,-38,-39,-8,-34,20,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_UNTIL':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[21,21,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,21,-36,-40,-41,-42,-37,-38,-39,-8,-34,21,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_EXACTLY':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[22,22,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,22,-36,-40,-41,-42,-37,-38,-39,-8,-34,22,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_BETWEEN':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[23,23,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,23,-36,-40,-41,-42,-37,-38,-39,-8,-34,23,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_OPTIONAL':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[24,24,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,24,-36,-40,-41,-42,-37,-38,-39,-8,-34,24,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_ONCE':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[25,25,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,25,-36,-40,-41,-42,-37,-38,-39,-8,-34,25,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_NEVER':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[26,26,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,26,-36,-40,-41,-42,-37,-38,-39,-8,-34,26,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_AT':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[27,27,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,27,-36,-40,-41,-42,-37,-38,-39,-8,-34,27,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_BEGIN':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[28,28,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,28,-36,-40,-41,-42,-37,-38,-39,-8,-34,28,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_STARTS':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[29,29,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,29,-36,-40,-41,-42,-37,-38,-39,-8,-34,29,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_MUST':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[30,30,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,30,-36,-40,-41,-42,-37,-38,-39,-8,-34,30,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_CASE':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[31,31,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,31,-36,-40,-41,-42,-37,-38,-39,-8,-34,31,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_MULTI':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[32,32,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,32,-36,-40,-41,-42,-37,-38,-39,-8,-34,32,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'K_ALL':([0,1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,48,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[33,33,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,33,-36,-40,-41,-42,-37,-38,-39,-8,-34,33,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'$end':([1,2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,50,56,57,58,59,60,61,62,65,69,70,72,73,78,79,80,81,82,84,85,86,],[0,-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,-36,-40,-41,-42,-37,-38,-39,-8,-34,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'RIGHT_PARENTHESIS':([2,3,4,5,6,9,13,14,16,17,24,34,35,38,39,41,42,44,45,46,47,50,56,57,58,59,60,61,62,65,68,69,70,72,73,78,79,80,81,82,84,85,86,],[-2,-3,-4,-5,-6,-9,-15,-17,-19,-21,-26,-1,-7,-11,-13,-14,-20,-18,-22,-32,-30,-36,-40,-41,-42,-37,-38,-39,-8,-34,79,-35,-23,-27,-28,-33,-31,-25,-29,-10,-16,-24,-12,]),'STRING':([7,18,19,21,36,40,49,67,],[35,45,47,47,62,47,47,78,]),'K_OF':([8,11,20,],[36,40,49,]),'K_FROM':([9,13,38,],[37,43,64,]),'K_CHARACTER':([11,12,],[39,41,]),'K_LINE':([15,32,],[44,60,]),'LEFT_PARENTHESIS':([19,21,40,49,],[48,48,48,48,]),'NUMBER':([22,23,43,55,71,77,],[51,52,66,74,80,84,]),'K_OR':([25,26,],[53,54,]),'K_LEAST':([27,],[55,]),'K_WITH':([28,29,],[56,57,]),'K_END':([30,],[58,]),'K_INSENSITIVE':([31,],[59,]),'K_LAZY':([33,],[61,]),'CHARACTER':([37,64,75,83,],[63,76,82,86,]),'K_AS':([46,47,79,],[67,-30,-31,]),'K_TIMES':([51,74,80,],[70,81,85,]),'K_AND':([52,],[71,]),'K_MORE':([53,54,],[72,73,]),'K_TO':([63,66,76,],[75,77,83,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'query':([0,48,],[1,68,]),'statement':([0,1,48,68,],[2,34,2,34,]),'character':([0,1,48,68,],[3,3,3,3,]),'quantifier':([0,1,48,68,],[4,4,4,4,]),'anchor':([0,1,48,68,],[5,5,5,5,]),'flag':([0,1,48,68,],[6,6,6,6,]),'group':([19,21,40,49,],[46,50,65,69,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> query","S'",1,None,None,None),
+  ('query -> query statement','query',2,'p_query_statements','parse.py',148),
+  ('query -> statement','query',1,'p_query_statement','parse.py',157),
+  ('statement -> character','statement',1,'p_statement','parse.py',164),
+  ('statement -> quantifier','statement',1,'p_statement','parse.py',165),
+  ('statement -> anchor','statement',1,'p_statement','parse.py',166),
+  ('statement -> flag','statement',1,'p_statement','parse.py',167),
+  ('character -> K_LITERALLY STRING','character',2,'p_character_literally','parse.py',172),
+  ('character -> K_ONE K_OF STRING','character',3,'p_character_one_of','parse.py',176),
+  ('character -> K_LETTER','character',1,'p_character_letter','parse.py',180),
+  ('character -> K_LETTER K_FROM CHARACTER K_TO CHARACTER','character',5,'p_character_letter','parse.py',181),
+  ('character -> K_UPPERCASE K_LETTER','character',2,'p_character_uppercase_letter','parse.py',192),
+  ('character -> K_UPPERCASE K_LETTER K_FROM CHARACTER K_TO CHARACTER','character',6,'p_character_uppercase_letter','parse.py',193),
+  ('character -> K_ANY K_CHARACTER','character',2,'p_character_any_character','parse.py',204),
+  ('character -> K_NO K_CHARACTER','character',2,'p_character_no_character','parse.py',208),
+  ('character -> K_DIGIT','character',1,'p_character_digit','parse.py',212),
+  ('character -> K_DIGIT K_FROM NUMBER K_TO NUMBER','character',5,'p_character_digit','parse.py',213),
+  ('character -> K_ANYTHING','character',1,'p_character_anything','parse.py',224),
+  ('character -> K_NEW K_LINE','character',2,'p_character_new_line','parse.py',228),
+  ('character -> K_WHITESPACE','character',1,'p_character_whitespace','parse.py',232),
+  ('character -> K_NO K_WHITESPACE','character',2,'p_character_no_whitespace','parse.py',237),
+  ('character -> K_TAB','character',1,'p_character_tab','parse.py',241),
+  ('character -> K_RAW STRING','character',2,'p_character_raw','parse.py',245),
+  ('quantifier -> K_EXACTLY NUMBER K_TIMES','quantifier',3,'p_quantifier_exactly_x_times','parse.py',252),
+  ('quantifier -> K_BETWEEN NUMBER K_AND NUMBER K_TIMES','quantifier',5,'p_quantifier_between_x_and_y_times','parse.py',256),
+  ('quantifier -> K_BETWEEN NUMBER K_AND NUMBER','quantifier',4,'p_quantifier_between_x_and_y_times','parse.py',257),
+  ('quantifier -> K_OPTIONAL','quantifier',1,'p_quantifier_optional','parse.py',262),
+  ('quantifier -> K_ONCE K_OR K_MORE','quantifier',3,'p_quantifier_once_or_more','parse.py',266),
+  ('quantifier -> K_NEVER K_OR K_MORE','quantifier',3,'p_quantifier_never_or_more','parse.py',270),
+  ('quantifier -> K_AT K_LEAST NUMBER K_TIMES','quantifier',4,'p_quantifier_at_least_x_times','parse.py',274),
+  ('group -> STRING','group',1,'p_group_string','parse.py',279),
+  ('group -> LEFT_PARENTHESIS query RIGHT_PARENTHESIS','group',3,'p_group_subquery','parse.py',283),
+  ('character -> K_CAPTURE group','character',2,'p_character_capture','parse.py',288),
+  ('character -> K_CAPTURE group K_AS STRING','character',4,'p_character_capture_as','parse.py',292),
+  ('character -> K_ANY K_OF group','character',3,'p_group_any_of','parse.py',296),
+  ('character -> K_EITHER K_OF group','character',3,'p_group_any_of','parse.py',297),
+  ('character -> K_UNTIL group','character',2,'p_character_until','parse.py',302),
+  ('flag -> K_CASE K_INSENSITIVE','flag',2,'p_flag_case_insensitive','parse.py',307),
+  ('flag -> K_MULTI K_LINE','flag',2,'p_flag_multi_line','parse.py',312),
+  ('flag -> K_ALL K_LAZY','flag',2,'p_flag_all_lazy','parse.py',317),
+  ('anchor -> K_BEGIN K_WITH','anchor',2,'p_anchor_begin_with','parse.py',322),
+  ('anchor -> K_STARTS K_WITH','anchor',2,'p_anchor_begin_with','parse.py',323),
+  ('anchor -> K_MUST K_END','anchor',2,'p_anchor_must_end','parse.py',328),
+]
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Generate the lextab/parsetab modules shipped with the parser.
+
+    $ python -m srl.parsers.tables [outputdir]
+
+setup.py runs this at build time so installed packages never have to
+build (or write) the tables at runtime.
+"""
+
+import os
+import sys
+
+from ..utils import lex
+from ..utils import yacc
+
+LEXTAB = 'lextab'
+PARSETAB = 'parsetab'
+
+def _signature(pinfo):
+    # Python 3.13 dedents docstrings when compiling, which changes PLY's
+    # signature of the grammar rules; sign them without indentation on
+    # every version.
+    pinfo.pfuncs = [(line, module, name,
+                     doc and '\n'.join(rule.strip() for rule in doc.splitlines()
+                                       if rule.strip()))
+                    for line, module, name, doc in pinfo.pfuncs]
+    return pinfo.signature()
+
+def grammar_signature(module=None):
+    if module is None:
+        from . import parse as module
+    pinfo = yacc.ParserReflect(vars(module), log=yacc.NullLogger())
+    pinfo.get_all()
+    return _signature(pinfo)
+
+def write_tables(outputdir=None):
+    from . import parse as module
+
+    if outputdir is None:
+        outputdir = os.path.dirname(os.path.abspath(__file__))
+
+    lexer = lex.lex(module=module, errorlog=lex.NullLogger())
+    lexer.writetab(LEXTAB, outputdir)
+
+    pinfo = yacc.ParserReflect(vars(module), log=yacc.NullLogger())
+    pinfo.get_all()
+    if pinfo.validate_all():
+        raise yacc.YaccError('Unable to build parser')
+    grammar = yacc.Grammar(pinfo.tokens)
+    for funcname, (file, line, prodname, syms) in pinfo.grammar:
+        grammar.add_production(prodname, syms, funcname, file, line)
+    grammar.set_start(pinfo.start)
+    table = yacc.LRGeneratedTable(grammar, 'LALR')
+    table.write_table(PARSETAB, outputdir, _signature(pinfo))
+
+    return [os.path.join(outputdir, name + '.py') for name in (LEXTAB, PARSETAB)]
+
+if __name__ == '__main__':
+    for filename in write_tables(*sys.argv[1:2]):
+        print(filename)
@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+
+import re
+from collections import namedtuple
+
+try:
+    basestring
+except NameError:
+    basestring = str
+
+PrefilterStats = namedtuple('PrefilterStats', 'calls rejected narrowed skipped active')
+
+class CompiledPattern(object):
+    """A compiled regex with cheap checks that run before it.
+
+    ``str.find`` looks for the literal every match must contain (see
+    srl.analysis): inputs without it are rejected outright, and findall
+    starts no earlier than its first occurrence allows (search and
+    finditer start at the caller's ``pos``, which their Matches report). Inputs shorter than
+    ``min_length`` (or, for fullmatch, longer than ``max_length``) are
+    rejected before even that. Everything else is delegated to the
+    underlying ``re`` pattern.
+
+    Patterns without a required literal, and patterns whose checks rarely
+    help, call the ``re`` pattern directly.
+
+    Patterns that are a single literal are answered by ``str`` methods
+    (find, count, split); ``re`` only builds the Match objects.
+
+    Patterns that are only a long list of literals (``any of`` many words)
+    find where a match starts with an Aho-Corasick automaton instead
+    (srl.engines.aho); ``re`` then matches there, so results are the same
+    Match objects. Fixed-length patterns of classes (``digit exactly 3
+    times literally "-" digit exactly 4 times``) do the same with a
+    bit-parallel Shift-And scan (srl.engines.shiftand) for findall,
+    finditer, split and sub on long texts. Matches found that way report
+    where they start as their ``pos``, not the ``pos`` given to the call.
+    """
+
+    # After every REVIEW_CALLS checks, a prefilter that saved work on fewer
+    # than one call in ten is switched off: the checks then cost more than
+    # they save.
+    REVIEW_CALLS = 1024
+
+    # Texts shorter than this are left to re, which starts a search faster
+    # than the Shift-And scan builds its bitmaps.
+    SHIFT_AND_MIN_TEXT = 1024
+
+    def __init__(self, compiled, info=None):
+        self.compiled = compiled
+        self.info = info or {}
+        self.literal = self.info.get('literal')
+        self.offset = self.info.get('offset')
+        self.min_length = self.info.get('min_length', 0)
+        self.max_length = self.info.get('max_length')
+        self.calls = 0
+        self.rejected = 0
+        self.narrowed = 0
+        self.skipped = 0
+        self.active = True
+        # Methods answered by something faster than re (see use_literal).
+        self._fast = {}
+        self.automaton = None
+        self.scan_from = 0
+        if not self.literal:
+            # sre already rejects inputs shorter than the pattern's minimum
+            # width in C; checking lengths alone is not worth a Python call.
+            self.bypass()
+        literals = self.info.get('literals')
+        classes = self.info.get('classes')
+        if not compiled.groups and isinstance(compiled.pattern, basestring):
+            from .engines.aho import worthwhile
+            from .engines.shiftand import worthwhile as shift_and_worthwhile
+            if literals and len(literals) == 1 and not compiled.flags & re.IGNORECASE:
+                self.use_literal(literals[0])
+            elif literals and worthwhile(literals, compiled.flags):
+                self.use_automaton(literals)
+            elif classes and shift_and_worthwhile(classes):
+                self.use_shift_and(classes)
+
+    def __getattr__(self, name):
+        if name == 'compiled':
+            # Not set yet, e.g. while unpickling or copying.
+            raise AttributeError(name)
+        return getattr(self.compiled, name)
+
+    def __repr__(self):
+        return '<srl.CompiledPattern %r>' % self.compiled.pattern
+
+    @property
+    def overlap(self):
+        """Characters consecutive chunks of a stream must share so that no
+        match is split between them, or None if matches are unbounded."""
+        if self.max_length is None:
+            return None
+        return max(self.max_length - 1, 0)
+
+    def bypass(self):
+        """Send every call straight to the re pattern (or to the faster
+        matcher chosen for it) from now on."""
+        self.active = False
+        compiled = self.compiled
+        for name in ('search', 'match', 'fullmatch', 'finditer', 'findall',
+                     'split', 'sub', 'subn'):
+            method = self._fast.get(name) or getattr(compiled, name, None)
+            # Python 2's re has no fullmatch.
+            if method is not None:
+                setattr(self, name, method)
+
+    def _use(self, **methods):
+        self._fast.update(methods)
+        for name, method in methods.items():
+            setattr(self, name, method)
+
+    def use_literal(self, literal):
+        """Answer with ``str`` methods from now on; the pattern matches
+        exactly ``literal``."""
+        self.bypass()
+        self.literal = literal
+        self._use(search=self._literal_search, findall=self._literal_findall,
+                  split=self._literal_split, sub=self._literal_sub, subn=self._literal_subn)
+
+    def use_automaton(self, literals):
+        """Search with an Aho-Corasick automaton for ``literals``, the
+        alternatives the pattern reduces to, from now on."""
+        from .engines.aho import AhoCorasick
+        self.bypass()
+        self.automaton = AhoCorasick(literals, self.compiled.flags)
+        self._use(search=self._automaton_search, **self._scanning())
+
+    def use_shift_and(self, classes):
+        """Scan texts of at least SHIFT_AND_MIN_TEXT characters with a
+        Shift-And matcher for ``classes``, one per character, from now on.
+        search and match keep their prefilter."""
+        from .engines.shiftand import ShiftAnd
+        self.automaton = ShiftAnd(classes, self.compiled.flags)
+        self.scan_from = self.SHIFT_AND_MIN_TEXT
+        self._use(**self._scanning())
+
+    def _scanning(self):
+        return dict(finditer=self._automaton_finditer, findall=self._automaton_findall,
+                    split=self._automaton_split, sub=self._automaton_sub,
+                    subn=self._automaton_subn)
+
+    def stats(self):
+        """How often the prefilter ran, rejected the input or moved the start,
+        and how many characters the regex did not have to scan."""
+        return PrefilterStats(self.calls, self.rejected, self.narrowed, self.skipped,
+                              self.active)
+
+    def _start(self, string, pos, endpos, narrow, full=False):
+        """Where the regex should start, or -1 if it cannot match."""
+        if not isinstance(string, basestring):
+            return max(pos, 0)
+        start = max(pos, 0)
+        end = len(string) if endpos is None else min(endpos, len(string))
+        # Counters are best effort: no lock on the matching path.
+        self.calls += 1
+        if not self.calls % self.REVIEW_CALLS and \
+                (self.rejected + self.narrowed) * 10 < self.calls:
+            self.bypass()
+        available = end - start
+        if available < self.min_length or \
+                full and self.max_length is not None and available > self.max_length:
+            self.rejected += 1
+            self.skipped += max(available, 0)
+            return -1
+        literal = self.literal
+        if not literal or not isinstance(string, type(literal)):
+            return start
+        found = string.find(literal, start, end)
+        if found < 0:
+            self.rejected += 1
+            self.skipped += available
+            return -1
+        if narrow and self.offset is not None and found - self.offset > start:
+            self.narrowed += 1
+            self.skipped += found - self.offset - start
+            return found - self.offset
+        return start
+
+    def search(self, string, pos=0, endpos=None):
+        if self._start(string, pos, endpos, False) < 0:
+            return None
+        if endpos is None:
+            return self.compiled.search(string, pos)
+        return self.compiled.search(string, pos, endpos)
+
+    def match(self, string, pos=0, endpos=None):
+        if self._start(string, pos, endpos, False) < 0:
+            return None
+        if endpos is None:
+            return self.compiled.match(string, pos)
+        return self.compiled.match(string, pos, endpos)
+
+    def fullmatch(self, string, pos=0, endpos=None):
+        # Raises AttributeError where re has no fullmatch, as re does.
+        fullmatch = self.compiled.fullmatch
+        if self._start(string, pos, endpos, False, True) < 0:
+            return None
+        if endpos is None:
+            return fullmatch(string, pos)
+        return fullmatch(string, pos, endpos)
+
+    def finditer(self, string, pos=0, endpos=None):
+        if self._start(string, pos, endpos, False) < 0:
+            return iter(())
+        if endpos is None:
+            return self.compiled.finditer(string, pos)
+        return self.compiled.finditer(string, pos, endpos)
+
+    def findall(self, string, pos=0, endpos=None):
+        start = self._start(string, pos, endpos, True)
+        if start < 0:
+            return []
+        if endpos is None:
+            return self.compiled.findall(string, start)
+        return self.compiled.findall(string, start, endpos)
+
+    def split(self, string, maxsplit=0):
+        if self._start(string, 0, None, False) < 0:
+            return [string]
+        return self.compiled.split(string, maxsplit)
+
+    def sub(self, repl, string, count=0):
+        if self._start(string, 0, None, False) < 0:
+            return string
+        return self.compiled.sub(repl, string, count)
+
+    def subn(self, repl, string, count=0):
+        if self._start(string, 0, None, False) < 0:
+            return string, 0
+        return self.compiled.subn(repl, string, count)
+
+    def _spans(self, string, pos=0, endpos=None):
+        return self.automaton.finditer(string, pos, endpos)
+
+    def _scanned(self, string):
+        return isinstance(string, basestring) and len(string) >= self.scan_from
+
+    def _automaton_search(self, string, pos=0, endpos=None):
+        if not self._scanned(string):
+            return self.compiled.search(string, pos, *(() if endpos is None else (endpos,)))
+        found = self.automaton.find(string, pos, endpos)
+        if found is None:
+            return None
+        return self.compiled.match(string, found[0], len(string) if endpos is None else endpos)
+
+    def _automaton_finditer(self, string, pos=0, endpos=None):
+        if not self._scanned(string):
+            return self.compiled.finditer(string, pos, *(() if endpos is None else (endpos,)))
+        end = len(string) if endpos is None else endpos
+        match = self.compiled.match
+        return (match(string, start, end) for start, _, _ in self._spans(string, pos, endpos))
+
+    def _automaton_findall(self, string, pos=0, endpos=None):
+        if not self._scanned(string):
+            return self.compiled.findall(string, pos, *(() if endpos is None else (endpos,)))
+        return self.automaton.findall(string, pos, endpos)
+
+    def _automaton_split(self, string, maxsplit=0):
+        if not self._scanned(string) or maxsplit < 0:
+            return self.compiled.split(string, maxsplit)
+        pieces = []
+        last = 0
+        for start, end, _ in self._spans(string):
+            if 0 < maxsplit <= len(pieces):
+                break
+            pieces.append(string[last:start])
+            last = end
+        pieces.append(string[last:])
+        return pieces
+
+    def _automaton_subn(self, repl, string, count=0):
+        if not self._scanned(string) or count < 0 or \
+                not isinstance(repl, basestring) and not callable(repl):
+            return self.compiled.subn(repl, string, count)
+        if callable(repl) or '\\' in repl:
+            expand = repl if callable(repl) else lambda match: match.expand(repl)
+            end = len(string)
+            replace = lambda start: expand(self.compiled.match(string, start, end))
+        else:
+            replace = lambda start: repl
+        pieces = []
+        last = 0
+        done = 0
+        for start, end, _ in self._spans(string):
+            if 0 < count <= done:
+                break
+            pieces.append(string[last:start])
+            pieces.append(replace(start))
+            last = end
+            done += 1
+        if not done:
+            return string, 0
+        pieces.append(string[last:])
+        return string[:0].join(pieces), done
+
+    def _automaton_sub(self, repl, string, count=0):
+        return self._automaton_subn(repl, string, count)[0]
+
+    def _bounds(self, string, pos, endpos):
+        # Negative bounds mean "from the end" to str methods, 0 to re.
+        end = len(string) if endpos is None else max(min(endpos, len(string)), 0)
+        return max(pos, 0), end
+
+    def _literal_search(self, string, pos=0, endpos=None):
+        if not isinstance(string, type(self.literal)):
+            return self.compiled.search(string, pos, *(() if endpos is None else (endpos,)))
+        start, end = self._bounds(string, pos, endpos)
+        if string.find(self.literal, start, end) < 0:
+            return None
+        # sre finds the same occurrence with its own literal search, and the
+        # Match keeps the caller's pos.
+        return self.compiled.search(string, pos, *(() if endpos is None else (endpos,)))
+
+    def _literal_findall(self, string, pos=0, endpos=None):
+        if not isinstance(string, type(self.literal)):
+            return self.compiled.findall(string, pos, *(() if endpos is None else (endpos,)))
+        start, end = self._bounds(string, pos, endpos)
+        return [self.literal] * string.count(self.literal, start, end)
+
+    def _literal_split(self, string, maxsplit=0):
+        if not isinstance(string, type(self.literal)) or maxsplit < 0:
+            return self.compiled.split(string, maxsplit)
+        return string.split(self.literal, maxsplit or -1)
+
+    def _literal_subn(self, repl, string, count=0):
+        if not isinstance(string, type(self.literal)) or \
+                not isinstance(repl, type(self.literal)) or '\\' in repl or count < 0:
+            return self.compiled.subn(repl, string, count)
+        # Faster than str.replace, which counts the occurrences first.
+        pieces = string.split(self.literal, count or -1)
+        if len(pieces) == 1:
+            return string, 0
+        return repl.join(pieces), len(pieces) - 1
+
+    def _literal_sub(self, repl, string, count=0):
+        return self._literal_subn(repl, string, count)[0]
+
+def compile_ir(pattern, regex, flags=0):
+    """CompiledPattern for ``regex``, the emitted source of ``pattern``."""
+    from .analysis import analyze
+    compiled = re.compile(regex, flags)
+    return CompiledPattern(compiled, analyze(pattern, compiled.flags))
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""Many queries matched together.
+
+A PatternSet compiles its queries (SRL strings, Builders or IR Patterns)
+twice:
+
+- into one regex, an alternation with each query in a group named after
+  its position, for search() and finditer(): the leftmost match of any
+  query, ties going to the earlier one, as ``re`` finds with ``a|b|c``;
+- into one lazy DFA over all queries (srl.engines.sets) for matches() and
+  first(), which read the text once however many queries there are.
+
+Queries that reduce to a list of literals go to Aho-Corasick automata
+(srl.engines.aho) instead of the DFA, and when every query does, search()
+and finditer() use one to find where the leftmost match starts. Queries no
+automaton can run (lookarounds, Raw fragments) are searched one by one.
+Raw fragments must not refer to groups by number.
+"""
+
+import re
+
+from . import ir
+from .emitter import emit
+
+# Flags that change what a literal matches.
+_LITERAL_FLAGS = re.IGNORECASE | getattr(re, 'ASCII', 0) | re.LOCALE | getattr(re, 'UNICODE', 0)
+
+# Flags that can be set for one query inside the combined regex.
+_SCOPED_FLAGS = ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's'),
+                 (re.VERBOSE, 'x'))
+
+def _pattern(query, flags):
+    from .builder import Builder
+    if isinstance(query, Builder):
+        pattern = query.to_ir()
+    elif isinstance(query, ir.Pattern):
+        pattern = query
+    else:
+        pattern = Builder.parse_ir(query)
+    return pattern.replace(flags=pattern.flags | flags)
+
+def _literals(pattern):
+    """The literals ``pattern`` reduces to, or None."""
+    from .analysis import alternatives
+    if pattern.flags & re.VERBOSE:
+        return None
+    texts = alternatives(pattern.nodes)
+    return texts if texts and all(texts) else None
+
+def _unnamed(node):
+    """``node`` without group names, which queries may share."""
+    if isinstance(node, ir.Group):
+        return node.replace(body=tuple(_unnamed(child) for child in node.body), name=None)
+    if isinstance(node, ir.Lookaround):
+        return node.replace(body=tuple(_unnamed(child) for child in node.body))
+    if isinstance(node, ir.Alternation):
+        return node.replace(branches=tuple(_unnamed(branch) for branch in node.branches))
+    if isinstance(node, ir.Quantifier) and node.child is not None:
+        return node.replace(child=_unnamed(node.child))
+    return node
+
+def _branch(position, pattern):
+    source = emit([_unnamed(node) for node in pattern.nodes])
+    scoped = ''.join(letter for flag, letter in _SCOPED_FLAGS if pattern.flags & flag)
+    if scoped:
+        source = '(?%s:%s)' % (scoped, source)
+    return '(?P<_%d>%s)' % (position, source)
+
+class PatternSet(object):
+    """Queries matched as one.
+
+    ``patterns`` is a list, whose ids are the positions, or a dict from id
+    to query. ``flags`` are added to every query.
+    """
+
+    def __init__(self, patterns, flags=0):
+        items = list(patterns.items()) if hasattr(patterns, 'items') else \
+            list(enumerate(patterns))
+        self.ids = [key for key, _ in items]
+        self.patterns = [_pattern(query, flags) for _, query in items]
+        shared = 0
+        for flag, _ in _SCOPED_FLAGS:
+            shared |= flag
+        self.regex = re.compile('|'.join(_branch(position, pattern) for position, pattern
+                                         in enumerate(self.patterns)) or '(?!)',
+                                flags & ~shared)
+        self._positions = dict((index, int(name[1:]))
+                               for name, index in self.regex.groupindex.items())
+        self._matcher = None
+        self._literals = None
+        texts = [_literals(pattern) for pattern in self.patterns]
+        if texts and None not in texts and \
+                len(set(pattern.flags & _LITERAL_FLAGS for pattern in self.patterns)) == 1:
+            from .engines.aho import AhoCorasick, worthwhile
+            literals = [text for query in texts for text in query]
+            if worthwhile(literals, self.patterns[0].flags):
+                self._literals = AhoCorasick(literals, self.patterns[0].flags)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __repr__(self):
+        return 'PatternSet(%d queries)' % len(self.ids)
+
+    def _id(self, match):
+        return self.ids[self._positions[match.lastindex]]
+
+    def search(self, string, pos=0, endpos=None):
+        """(id, match) of the leftmost match of any query, or None."""
+        end = len(string) if endpos is None else endpos
+        if self._literals is not None:
+            found = self._literals.find(string, pos, end)
+            match = found and self.regex.match(string, found[0], end)
+        else:
+            match = self.regex.search(string, pos, end)
+        return match and (self._id(match), match)
+
+    def finditer(self, string, pos=0, endpos=None):
+        """(id, match) for every match in ``string``, left to right."""
+        end = len(string) if endpos is None else endpos
+        if self._literals is not None:
+            matches = (self.regex.match(string, start, end)
+                       for start, _, _ in self._literals.finditer(string, pos, end))
+        else:
+            matches = self.regex.finditer(string, pos, end)
+        for match in matches:
+            yield self._id(match), match
+
+    def _build(self):
+        from .engines.aho import AhoCorasick
+        from .engines.sets import SetMatcher, regular
+        from .pattern import compile_ir
+        regulars = []
+        positions = []
+        literals = {}
+        others = []
+        for position, pattern in enumerate(self.patterns):
+            texts = _literals(pattern)
+            if texts:
+                group = literals.setdefault(pattern.flags & _LITERAL_FLAGS, ([], []))
+                group[0].extend(texts)
+                group[1].extend([position] * len(texts))
+            elif regular(pattern):
+                regulars.append(pattern)
+                positions.append(position)
+            else:
+                others.append((position, compile_ir(pattern, emit(pattern), pattern.flags)))
+        matchers = [(AhoCorasick(texts, flags).occurring, owners)
+                    for flags, (texts, owners) in literals.items()]
+        if regulars:
+            matchers.append((SetMatcher(regulars).matches, positions))
+        self._matcher = matchers, others
+        return self._matcher
+
+    def _found(self, string):
+        matchers, others = self._matcher or self._build()
+        found = set()
+        for matches, positions in matchers:
+            found.update(positions[index] for index in matches(string))
+        return found, others
+
+    def matches(self, string):
+        """Ids of every query that matches somewhere in ``string``, in order."""
+        found, others = self._found(string)
+        for position, compiled in others:
+            if compiled.search(string):
+                found.add(position)
+        return [self.ids[position] for position in sorted(found)]
+
+    def first(self, string):
+        """Id of the first query that matches somewhere in ``string``, or None."""
+        found, others = self._found(string)
+        best = min(found) if found else None
+        for position, compiled in others:
+            if best is not None and position > best:
+                break
+            if compiled.search(string):
+                return self.ids[position]
+        return None if best is None else self.ids[best]
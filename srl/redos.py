@@ -0,0 +1,422 @@
+# -*- coding: utf-8 -*-
+"""Worst-case backtracking of a query, and how to avoid it.
+
+complexity() classifies how the time sre takes grows with the input, from
+the two usual causes of catastrophic backtracking:
+
+``'exponential'``
+    An unbounded repeat whose body can split the same text into
+    iterations in more than one way: a nested repeat with nothing else
+    required around it (``(?:\\w+)+``, ``(?:\\s*a*)*``) or alternatives that
+    match the same text (``(?:a|aa)*``).
+``'polynomial'``
+    Unbounded repeats over overlapping characters with nothing disjoint
+    required between them (``.*.*=``, ``\\w+\\d+``).
+``'linear'``
+    Neither.
+
+The analysis errs on the side of reporting the worse class: Raw fragments
+are not analyzed and count as exponential.
+
+atomic() wraps unbounded greedy repeats in atomic groups where backtracking
+into them can never produce a match: the repeat consumes a maximal run of
+characters that nothing after it can start with. Matches and groups are
+unchanged. protect() picks between that rewrite and the linear-time pike
+engine for a pattern that is not linear.
+"""
+
+import re
+import sys
+
+from . import ir
+from .analysis import width
+from .emitter import emit
+
+try:
+    chr_ = unichr
+except NameError:
+    chr_ = chr
+
+LINEAR = 'linear'
+POLYNOMIAL = 'polynomial'
+EXPONENTIAL = 'exponential'
+
+_RANK = {LINEAR: 0, POLYNOMIAL: 1, EXPONENTIAL: 2}
+
+MODES = ('rewrite', 'route')
+
+# (?>...) is only understood by re from Python 3.11 on.
+ATOMIC_GROUPS = sys.version_info >= (3, 11)
+
+# A leaf that may be any character (Raw fragments, lookarounds).
+_OPAQUE = ir.Raw(None)
+
+_NEWLINE = ir.Literal('\n')
+
+# Classes listing more characters than this are compared as opaque sets.
+_MAX_MEMBERS = 1024
+
+_CLASS_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'f': '\f', 'v': '\v'}
+
+def complexity(pattern, flags=0):
+    """'linear', 'polynomial' or 'exponential': how the worst-case time sre
+    takes to match ``pattern`` (compiled with ``flags``) grows."""
+    return _Analyzer(flags | pattern.flags).sequence(pattern.nodes)
+
+def atomic(pattern, flags=0):
+    """``pattern`` with atomic groups around the repeats that can never
+    usefully give characters back."""
+    analyzer = _Analyzer(flags | pattern.flags)
+    return pattern.replace(nodes=analyzer.rewrite(pattern.nodes, ()))
+
+def protect(pattern, mode='rewrite'):
+    """(pattern, engine) to compile in place of ``pattern``.
+
+    Linear patterns are returned unchanged for ``re``. Otherwise ``mode``
+    ``'rewrite'`` prefers atomic() when that makes the pattern linear (on
+    Python 3.11 and later), ``'route'`` prefers the pike engine; each falls
+    back to the other when it does not apply.
+    """
+    if complexity(pattern) == LINEAR:
+        return pattern, 're'
+    rewritten = atomic(pattern) if ATOMIC_GROUPS else pattern
+    if mode == 'rewrite' and complexity(rewritten) == LINEAR:
+        return rewritten, 're'
+    if _regular(pattern):
+        return pattern, 'pike'
+    return rewritten, 're'
+
+def _regular(pattern):
+    """Whether the automaton engines can run ``pattern``."""
+    if pattern.flags & re.VERBOSE:
+        return False
+    stack = list(pattern.nodes)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ir.Raw, ir.Lookaround)):
+            return False
+        if isinstance(node, ir.Quantifier):
+            child = node.child
+            if isinstance(child, ir.Quantifier) and \
+                    ((node.min, node.max, node.lazy) != (0, 1, False) or child.lazy):
+                return False
+            stack.append(child)
+        else:
+            stack.extend(getattr(node, 'body', None) or getattr(node, 'branches', None) or ())
+    return True
+
+def _nullable(node):
+    return width(node)[0] == 0
+
+def _consumes(node):
+    return width(node)[1] != 0
+
+def _unbounded(node):
+    return isinstance(node, ir.Quantifier) and node.child is not None and \
+        node.max is None and not isinstance(node.child, ir.Quantifier)
+
+def _flatten(nodes):
+    """``nodes`` with the bodies of groups spliced in."""
+    for node in nodes:
+        if isinstance(node, ir.Group) and not isinstance(node, ir.Atomic):
+            for child in _flatten(node.body):
+                yield child
+        else:
+            yield node
+
+class _Analyzer(object):
+
+    def __init__(self, flags):
+        self.flags = flags
+        self._overlaps = {}
+
+    def sequence(self, nodes):
+        worst = LINEAR
+        for node in nodes:
+            worst = max(worst, self.node(node), key=_RANK.get)
+        if worst == LINEAR and self._overlapping(nodes):
+            worst = POLYNOMIAL
+        return worst
+
+    def node(self, node):
+        if isinstance(node, ir.Atomic):
+            # Bodies produced by atomic() never fail once they matched.
+            return LINEAR
+        if isinstance(node, ir.Raw):
+            return EXPONENTIAL
+        if isinstance(node, ir.Quantifier):
+            child = node.child
+            if child is None:
+                return LINEAR
+            if isinstance(child, ir.Quantifier):
+                # x+? (lazy) or x++ (possessive): the inner repeat decides.
+                if (node.min, node.max, node.lazy) != (0, 1, False) or child.lazy:
+                    return self.node(child.child) if child.child is not None else LINEAR
+                node, child = child, child.child
+            if (node.max is None or node.max > 1) and self._repeat_ambiguous((child, )):
+                # Unbounded, the ways multiply with every iteration; bounded,
+                # with at most ``max`` of them.
+                return EXPONENTIAL if node.max is None else \
+                    max(POLYNOMIAL, self.node(child), key=_RANK.get)
+            return self.node(child)
+        if isinstance(node, (ir.Group, ir.Lookaround)):
+            return self.sequence(node.body)
+        if isinstance(node, ir.Alternation):
+            worst = LINEAR
+            for branch in node.branches:
+                worst = max(worst, self.node(branch), key=_RANK.get)
+            return worst
+        return LINEAR
+
+    def _ambiguous(self, node):
+        """Whether ``node`` can match some text in more than one way."""
+        if isinstance(node, ir.Atomic):
+            return False
+        if isinstance(node, ir.Raw):
+            return True
+        if isinstance(node, ir.Quantifier):
+            child = node.child
+            if child is None or not _consumes(child):
+                return False
+            if node.max is None or node.max > 1:
+                return self._repeat_ambiguous((child, ))
+            return self._ambiguous(child)
+        if isinstance(node, ir.Group):
+            return self._sequence_ambiguous(node.body, False)
+        if isinstance(node, ir.Alternation):
+            branches = node.branches
+            if any(self._ambiguous(branch) for branch in branches):
+                return True
+            return any(self._same_text(branches[i], branches[j])
+                       for i in range(len(branches)) for j in range(i + 1, len(branches)))
+        return False
+
+    def _repeat_ambiguous(self, nodes):
+        """Whether repeating ``nodes`` can match some text in more than one
+        way."""
+        return self._sequence_ambiguous(nodes, True)
+
+    def _sequence_ambiguous(self, nodes, repeated):
+        items = list(_flatten(nodes))
+        if any(self._ambiguous(item) for item in items):
+            return True
+        # A part of variable length can trade characters with what follows
+        # it: the next parts up to a required one and, when the sequence is
+        # repeated and the rest may be empty, the start of the next round.
+        for index, item in enumerate(items):
+            low, high = width(item)
+            if low == high or isinstance(item, ir.Atomic):
+                continue
+            follow = ()
+            for following in items[index + 1:]:
+                follow += self.first(following)
+                if not _nullable(following):
+                    break
+            else:
+                if repeated:
+                    follow += self.first(ir.Group(tuple(items), False))
+            if self.overlap(self.chars(item), follow):
+                return True
+        return False
+
+    def _same_text(self, first, second):
+        """Whether two alternatives may match the start of the same text."""
+        from .analysis import _text
+        texts = _text(first), _text(second)
+        if None not in texts:
+            shorter, longer = sorted(texts, key=len)
+            return bool(shorter) and longer.startswith(shorter)
+        return self.overlap(self.first(first), self.first(second))
+
+    def _overlapping(self, nodes):
+        """Whether two unbounded repeats in ``nodes`` can trade characters."""
+        live = []
+        for node in _flatten(nodes):
+            # An atomic repeat still takes characters given back before it,
+            # but never gives any back itself.
+            held = isinstance(node, ir.Atomic) and len(node.body) == 1
+            repeat = node.body[0] if held else node
+            if _unbounded(repeat) and _consumes(repeat.child):
+                chars = self.chars(repeat.child)
+                if any(self.overlap(chars, other) for other in live):
+                    return True
+                if repeat.min:
+                    live = [other for other in live if self.overlap(other, chars)]
+                if not held:
+                    live.append(chars)
+            elif isinstance(node, ir.Lookaround) and not node.behind:
+                # A lookahead runs again wherever the repeats before it
+                # stop, and its repeats take the same characters again.
+                for inner in _flatten(node.body):
+                    if _unbounded(inner) and _consumes(inner.child) and \
+                            any(self.overlap(self.chars(inner.child), other) for other in live):
+                        return True
+            elif not _nullable(node):
+                chars = self.chars(node)
+                live = [other for other in live if self.overlap(other, chars)]
+        return False
+
+    def rewrite(self, nodes, follow):
+        """``nodes`` with safe atomic groups, when whatever matches after
+        them starts with a character in ``follow``."""
+        result = []
+        for node in reversed(nodes):
+            node = self._rewrite(node, follow)
+            result.append(node)
+            follow = self.first(node) + (follow if _nullable(node) else ())
+        result.reverse()
+        return tuple(result)
+
+    def _rewrite(self, node, follow):
+        if isinstance(node, ir.Quantifier):
+            child = node.child
+            if child is None or isinstance(child, ir.Quantifier):
+                return node
+            repeat = node.max is None or node.max > 1
+            child = self._rewrite(child, follow + (self.first(child) if repeat else ()))
+            node = node.replace(child=child)
+            if _unbounded(node) and not node.lazy and self._run(child) and \
+                    not self.overlap(self.chars(child), follow):
+                return ir.Atomic((node, ))
+            return node
+        if isinstance(node, ir.Group):
+            return node.replace(body=self.rewrite(node.body, follow))
+        if isinstance(node, ir.Alternation):
+            return node.replace(branches=tuple(self._rewrite(branch, follow)
+                                               for branch in node.branches))
+        return node
+
+    def _run(self, node):
+        """Whether every way of repeating ``node`` consumes at most what the
+        greedy one does, so only giving characters back is left to try."""
+        if isinstance(node, (ir.CharClass, ir.AnyChar)):
+            return True
+        if isinstance(node, ir.Literal):
+            return len(node.text) == 1
+        if isinstance(node, ir.Quantifier):
+            return node.child is not None and not node.lazy and node.min <= 1 and \
+                node.max != 0 and not isinstance(node.child, ir.Quantifier) and \
+                self._run(node.child)
+        if isinstance(node, ir.Group):
+            return len(node.body) == 1 and self._run(node.body[0])
+        if isinstance(node, ir.Alternation):
+            return all(isinstance(branch, (ir.CharClass, ir.AnyChar)) or
+                       isinstance(branch, ir.Literal) and len(branch.text) == 1
+                       for branch in node.branches)
+        return False
+
+    def first(self, node):
+        """Leaves for the characters a match of ``node`` may start with.
+
+        ``$`` only looks at a following new line; ``^`` looks behind, so it
+        may hold anywhere a repeat gives characters back.
+        """
+        if isinstance(node, ir.Literal):
+            return (ir.Literal(node.text[0]), ) if node.text else ()
+        if isinstance(node, (ir.CharClass, ir.AnyChar)):
+            return (node, )
+        if isinstance(node, ir.Anchor) and node.kind == ir.Anchor.END:
+            return (_NEWLINE, )
+        if isinstance(node, ir.Quantifier):
+            return self.first(node.child) if node.child is not None else ()
+        if isinstance(node, ir.Group):
+            leaves = ()
+            for child in node.body:
+                leaves += self.first(child)
+                if not _nullable(child):
+                    break
+            return leaves
+        if isinstance(node, ir.Alternation):
+            leaves = ()
+            for branch in node.branches:
+                leaves += self.first(branch)
+            return leaves
+        return (_OPAQUE, )
+
+    def chars(self, node):
+        """Leaves for every character a match of ``node`` may consume."""
+        if isinstance(node, ir.Literal):
+            return tuple(ir.Literal(char) for char in set(node.text))
+        if isinstance(node, (ir.CharClass, ir.AnyChar)):
+            return (node, )
+        if isinstance(node, ir.Anchor):
+            return ()
+        if isinstance(node, ir.Quantifier):
+            return self.chars(node.child) if node.child is not None else ()
+        if isinstance(node, ir.Group):
+            return sum((self.chars(child) for child in node.body), ())
+        if isinstance(node, ir.Alternation):
+            return sum((self.chars(branch) for branch in node.branches), ())
+        return (_OPAQUE, )
+
+    def overlap(self, first, second):
+        """Whether two tuples of leaves share a character."""
+        return any(self._overlap(one, other) for one in first for other in second)
+
+    def _overlap(self, one, other):
+        if one is _OPAQUE or other is _OPAQUE:
+            return True
+        key = one, other
+        result = self._overlaps.get(key)
+        if result is None:
+            members = _members(one)
+            test = self._test(other)
+            if members is None:
+                members = _members(other)
+                test = self._test(one)
+            if members is not None:
+                result = any(test(char) for char in members)
+            else:
+                result = not _disjoint_categories(one, other)
+            self._overlaps[key] = result
+        return result
+
+    def _test(self, node):
+        from .engines.nfa import char_test
+        source = re.escape(node.text) if isinstance(node, ir.Literal) else emit(node)
+        return char_test(source, self.flags)
+
+def _members(node):
+    """Every character a leaf names, or None for categories, negated
+    classes, ``.`` and large or unusual classes."""
+    if isinstance(node, ir.Literal):
+        return node.text
+    if not isinstance(node, ir.CharClass) or node.category or node.negated:
+        return None
+    members = set()
+    for start, end in node.ranges:
+        if len(start) != 1 or len(end) != 1 or ord(end) - ord(start) > _MAX_MEMBERS:
+            return None
+        members.update(chr_(code) for code in range(ord(start), ord(end) + 1))
+    text = node.chars
+    if text.startswith('^') and not node.ranges:
+        # Rendered right after "[", it negates the class.
+        return None
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if char == '\\':
+            escaped = text[index + 1:index + 2]
+            if escaped.isalnum() and escaped not in _CLASS_ESCAPES:
+                return None
+            char = _CLASS_ESCAPES.get(escaped, escaped)
+            index += 1
+        elif char == '-' and 0 < index < len(text) - 1:
+            start, end = text[index - 1], text[index + 1]
+            if start == '\\' or end == '\\' or ord(end) - ord(start) > _MAX_MEMBERS:
+                return None
+            members.update(chr_(code) for code in range(ord(start), ord(end) + 1))
+        members.add(char)
+        index += 1
+    return members
+
+def _disjoint_categories(one, other):
+    categories = [(node.category, node.negated) for node in (one, other)
+                  if isinstance(node, ir.CharClass) and node.category]
+    if len(categories) < 2:
+        return False
+    (first, first_negated), (second, second_negated) = categories
+    if first == second:
+        return first_negated != second_negated
+    # \w and \s share nothing.
+    return not first_negated and not second_negated
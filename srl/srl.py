@@ -1,12 +1,42 @@
 # -*- coding: utf-8 -*-
 
+import re
+
 from .builder import Builder
+from .emitter import emit
+from .pattern import CompiledPattern, compile_ir
+from . import cache
+
+def compile_dsl(dsl, flags=0, optimize=False, engine='re', backtrack_limit=None):
+    options = {}
+    if backtrack_limit is not None:
+        if engine not in ('re', 'backtrack'):
+            raise ValueError('backtrack_limit only applies to the backtrack engine')
+        engine = 'backtrack'
+        options['backtrack_limit'] = backtrack_limit
+    if engine != 're':
+        from .engines import compile_engine
+        pattern = Builder.parse_ir(dsl, flags, optimize)
+        return compile_engine(pattern, emit(pattern, compact=optimize), engine, **options)
+    disk_cache = cache.disk_cache
+    if disk_cache is not None:
+        entry = disk_cache.get(dsl, flags, optimize)
+        if entry is not None:
+            regex, regex_flags, info = entry
+            return CompiledPattern(re.compile(regex, regex_flags), info)
+    pattern = Builder.parse_ir(dsl, flags, optimize)
+    compiled = compile_ir(pattern, emit(pattern, compact=optimize), pattern.flags)
+    if disk_cache is not None:
+        disk_cache.set(dsl, flags, compiled.pattern, pattern.flags, optimize, compiled.info)
+    return compiled
 
 class SRL(object):
 
-    def __init__(self, dsl=None):
+    def __init__(self, dsl=None, flags=0, optimize=False, engine='re', backtrack_limit=None):
         self.dsl = dsl
-        self.compiled = Builder.parse(dsl)
+        self.compiled = cache.compiled_cache.get_or_create(
+            (dsl, flags, optimize, engine, backtrack_limit),
+            lambda: compile_dsl(dsl, flags, optimize, engine, backtrack_limit))
 
     def __getattr__(self, method):
         return getattr(self.compiled, method)
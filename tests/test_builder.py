@@ -1,6 +1,9 @@
  # -*- coding: utf-8 -*-
 
 import re
+
+import pytest
+
 from srl.builder import Builder
 from srl.srl import SRL
 
@@ -105,3 +108,68 @@ def test_parse():
     assert SRL('begin with must end').match('')
     assert SRL('letter case insensitive').match('A')
     assert SRL('capture (letter once or more) all lazy').match('a')
+
+def test_builder_does_not_load_parser():
+    import os
+    import subprocess
+    import sys
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+    code = ('import sys, srl; from srl.builder import Builder; '
+            'Builder().digit().get(); '
+            'print(any(m in sys.modules for m in ("srl.utils.lex", "srl.utils.yacc")))')
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=root)
+    assert output.strip() == b'False'
+
+def test_recompiles_after_mutation():
+    query = Builder().literally('a')
+    assert query.match('a')
+    compiled = query.compiled
+    assert query.get() == '(?:a)'
+    assert query.compile().compiled is compiled
+    query.digit()
+    assert query.get() == '(?:a)[0-9]'
+    assert not query.match('a')
+    assert query.match('a1')
+    assert query.revertLast() == '[0-9]'
+    assert query.match('a')
+    query.caseInsensitive()
+    assert query.match('A')
+    # Assigning an attribute is a mutation too.
+    query.flags = 0
+    assert not query.match('A')
+    query.group = '(?:x%s)'
+    assert query.get() == '(?:x(?:a))' and query.match('xa')
+
+def test_regex_is_read_only():
+    query = Builder().literally('a')
+    assert query.regex == ('(?:a)', )
+    with pytest.raises(AttributeError):
+        query.regex.append('b')
+
+def test_flags_are_not_passed_as_positions():
+    query = Builder().letter().caseInsensitive().multiLine()
+    assert query.match('ab').group() == 'a'
+    assert query.findall('abc') == ['a', 'b', 'c']
+    assert query.sub('x', 'abcdef') == 'xxxxxx'
+    assert query.split('1a2b3c4') == ['1', '2', '3', '4']
+
+def test_frozen_builder_forks():
+    from srl.builder import FrozenBuilder
+    base = FrozenBuilder().literally('http').literally('s').optional().literally('://')
+    api = base.literally('api/').digit().onceOrMore()
+    docs = base.literally('docs/').letter().onceOrMore().firstMatch()
+    assert base.get() == '(?:http)(?:s)?(?:://)'
+    assert api.get() == base.get() + '(?:api/)[0-9]+'
+    assert docs.get() == base.get() + '(?:docs/)[a-z]+?'
+    assert api.match('https://api/12') and not api.match('https://docs/ab')
+    assert docs.match('https://docs/ab').group() == 'https://docs/a'
+    assert not docs.match('https://api/12')
+    assert base.match('https://api/12').group() == 'https://'
+    assert api.compile().compiled is api.compile().compiled
+    assert base.caseInsensitive().match('HTTP://') and not base.match('HTTP://')
+    assert base.revertLast().get() == '(?:http)(?:s)?'
+    assert base.capture(lambda q: q.digit()).to_ir() == \
+        Builder().literally('http').literally('s').optional().literally('://') \
+        .capture(lambda q: q.digit()).to_ir()
+    assert base.ifAlreadyHad(lambda q: q.literally('s')).get() == \
+        '(?:http)(?:s)?(?<=(?:s))(?:://)'
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+import re
+import threading
+
+import srl
+from srl import SRL
+from srl.cache import LRUCache
+
+def test_lru_eviction_and_counters():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert 'b' not in cache
+    assert cache.get('b') is None
+    info = cache.info()
+    assert (info.hits, info.misses, info.evictions) == (1, 1, 1)
+    assert (info.maxsize, info.currsize) == (2, 2)
+    cache.resize(1)
+    assert list(cache._data) == ['c']
+    cache.clear()
+    assert cache.info() == (0, 0, 0, 1, 0)
+
+def test_disabled_cache():
+    cache = LRUCache(maxsize=0)
+    assert cache.get_or_create('a', lambda: 1) == 1
+    assert len(cache) == 0
+
+def test_srl_reuses_compiled_pattern():
+    srl.cache_clear()
+    first = SRL('digit exactly 3 times')
+    second = SRL('digit exactly 3 times')
+    assert first.compiled is second.compiled
+    assert srl.cache_info().hits == 1
+    assert srl.cache_info().misses == 1
+
+def test_srl_cache_key_includes_flags():
+    srl.cache_clear()
+    assert not SRL('literally "a"').match('A')
+    assert SRL('literally "a"', re.IGNORECASE).match('A')
+    assert srl.cache_info().currsize == 2
+
+def test_cache_under_threads():
+    cache = LRUCache(maxsize=8)
+    def work(n):
+        for i in range(500):
+            key = (n + i) % 16
+            assert cache.get_or_create(key, lambda: key * 2) == key * 2
+    threads = [threading.Thread(target=work, args=(n, )) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    info = cache.info()
+    assert info.currsize <= 8
+    assert info.hits + info.misses == 8 * 500
+
+def test_disk_cache_round_trip(tmpdir):
+    from srl.cache import DiskCache
+    path = str(tmpdir.join('srl.db'))
+    cache = DiskCache(path)
+    assert cache.get('digit') is None
+    cache.set('digit', 0, '[0-9]', 0)
+    assert DiskCache(path).get('digit') == ('[0-9]', 0, None)
+    cache.set('literally "a"', 0, '(?:a)', 0, info={'literal': 'a', 'offset': 0})
+    assert DiskCache(path).get('literally "a"') == ('(?:a)', 0, {'literal': 'a', 'offset': 0})
+    assert DiskCache(path).get('digit', re.IGNORECASE) is None
+
+def test_disk_cache_invalidated_by_version(tmpdir, monkeypatch):
+    from srl import cache
+    path = str(tmpdir.join('srl.db'))
+    cache.DiskCache(path).set('digit', 0, '[0-9]', 0)
+    monkeypatch.setattr(cache, 'translator_fingerprint', lambda: 'other')
+    upgraded = cache.DiskCache(path)
+    assert upgraded.get('digit') is None
+    assert upgraded._connection().execute('SELECT COUNT(*) FROM patterns').fetchone() == (0, )
+
+def test_disk_cache_errors_are_misses(tmpdir, monkeypatch):
+    from srl.cache import DiskCache
+    path = tmpdir.join('srl.db')
+    path.write('not a database' * 100)
+    cache = DiskCache(str(path))
+    assert cache.get('digit') is None
+    cache.set('digit', 0, '[0-9]', 0)
+    cache.clear()
+    path = str(tmpdir.join('big.db'))
+    monkeypatch.setattr(DiskCache, 'PRELOAD_ROWS', 2)
+    for index in range(5):
+        DiskCache(path).set('digit %d' % index, 0, '[0-9]', 0)
+    cache = DiskCache(path)
+    assert len(cache._rows) == 2
+    assert [cache.get('digit %d' % index) for index in range(5)] == [('[0-9]', 0, None)] * 5
+
+def test_srl_uses_disk_cache(tmpdir):
+    path = str(tmpdir.join('srl.db'))
+    srl.cache_clear()
+    srl.enable_disk_cache(path)
+    try:
+        assert SRL('letter exactly 2 times case insensitive').match('AB')
+        srl.cache_clear()
+        assert srl.cache.disk_cache.get('letter exactly 2 times case insensitive') == \
+            ('[a-z]{2}', re.IGNORECASE, {'literal': None, 'offset': None, 'literals': None,
+                                         'min_length': 2, 'max_length': 2,
+                                         'classes': ['[a-z]', '[a-z]']})
+        assert SRL('letter exactly 2 times case insensitive').match('AB')
+        assert srl.cache.disk_cache.hits == 2
+    finally:
+        srl.disable_disk_cache()
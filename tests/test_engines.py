@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+
+import random
+import re
+
+import pytest
+
+from srl import SRL, ir
+from srl.builder import Builder
+from srl.engines import compile_engine
+from srl.engines.aho import AhoCorasick
+from srl.engines.classes import char_table, memory_report
+from srl.engines.shiftand import ShiftAnd, worthwhile as shift_and_worthwhile
+from srl.errors import UnsupportedPatternException
+
+try:
+    chr_ = unichr
+except NameError:
+    chr_ = chr
+
+REGULAR_QUERIES = [
+    'digit once or more literally "-" letter once or more',
+    'begin with letter exactly 2 times digit between 1 and 3 must end',
+    'any of (literally "get", literally "getall", literally "post") whitespace optional',
+    'any of (digit, letter from a to c) never or more firstMatch literally "c"',
+    'anything once or more firstMatch literally "." case insensitive',
+    'begin with whitespace optional letter once or more must end multi line',
+    'no character optional digit at least 2 times',
+    'any of (literally "ab") never or more',
+]
+
+def dfa(query):
+    return SRL(query, engine='dfa')
+
+def span(match):
+    return match and match.span()
+
+def test_dfa_agrees_with_re():
+    rng = random.Random(3)
+    for query in REGULAR_QUERIES:
+        expected = SRL(query)
+        engine = dfa(query)
+        assert engine.pattern == expected.pattern
+        for _ in range(200):
+            text = ''.join(rng.choice('abcgetpos 12-.\nA') for _ in range(rng.randint(0, 20)))
+            for method in ('search', 'match', 'fullmatch'):
+                assert span(getattr(engine, method)(text)) == \
+                    span(getattr(expected, method)(text)), (query, method, text)
+                # re still tries an empty match at a pos past endpos.
+                for pos, endpos in ((3, 2), (9, 1)):
+                    assert span(getattr(engine, method)(text, pos, endpos)) == \
+                        span(getattr(expected, method)(text, pos, endpos)), \
+                        (query, method, text, pos, endpos)
+            assert engine.findall(text) == expected.findall(text), (query, text)
+            assert engine.split(text) == expected.split(text), (query, text)
+            assert engine.sub(r'<\g<0>>', text) == expected.sub(r'<\g<0>>', text), (query, text)
+
+def test_dfa_match_objects():
+    engine = dfa('digit once or more')
+    matched = engine.search('ab 123 4', 1, 5)
+    assert (matched.group(), matched.span(), matched.start(), matched.end()) == ('12', (3, 5), 3, 5)
+    assert (matched.pos, matched.endpos, matched.groups()) == (1, 5, ())
+    assert [m.group() for m in engine.finditer('1 22 333')] == ['1', '22', '333']
+    assert engine.subn(lambda m: str(len(m.group())), '1 22 333', 2) == ('1 2 333', 2)
+    assert engine.match('x1') is None and engine.fullmatch('12x') is None
+    with pytest.raises(TypeError):
+        engine.search(12)
+
+def test_dfa_is_linear_on_hostile_input():
+    # (?:a|aa)*b backtracks exponentially in re on a run of "a".
+    engine = dfa('any of (literally "a", literally "aa") never or more literally "b"')
+    assert engine.search('a' * 100000) is None
+    assert engine.search('a' * 100000 + 'b').span() == (0, 100001)
+    engine = dfa('begin with any of (letter once or more) once or more literally "!" must end')
+    assert engine.match('abc' * 10000 + '?') is None
+
+def test_dfa_state_cache_is_bounded():
+    query = Builder().literally('a').anyCharacter().exactly(12).literally('z')
+    engine = compile_engine(query.to_ir(), query.get(), 'dfa', memory_limit=20000)
+    expected = re.compile(query.get())
+    rng = random.Random(1)
+    text = ''.join(rng.choice('az') for _ in range(5000))
+    assert [m.span() for m in engine.finditer(text)] == [m.span() for m in expected.finditer(text)]
+    states, flushes = engine.cache_info()['search']
+    assert flushes > 0 and states * 400 <= 20000 + 400
+
+def test_dfa_refuses_irregular_patterns():
+    for query in ('raw "a+"', 'letter once or more once or more'):
+        with pytest.raises(UnsupportedPatternException):
+            dfa(query)
+        with pytest.raises(UnsupportedPatternException):
+            SRL(query, engine='pike')
+    for query in ('capture (digit)', ):
+        with pytest.raises(UnsupportedPatternException):
+            dfa(query)
+    query = Builder().literally('a').ifFollowedBy(lambda q: q.digit())
+    with pytest.raises(UnsupportedPatternException):
+        compile_engine(query.to_ir(), query.get(), 'dfa')
+    with pytest.raises(ValueError):
+        SRL('digit', engine='nfa')
+
+# Queries with groups taken from test_builder and test_parse.
+CAPTURING_QUERIES = [
+    Builder().capture(lambda q: q.anyCharacter().onceOrMore()).whitespace()
+    .capture(lambda q: q.digit().onceOrMore()).literally(', ')
+    .capture(lambda q: q.digit().onceOrMore()).caseInsensitive(),
+    Builder().capture(lambda q: q.uppercaseLetter()),
+    Builder().anyOf(lambda q: q.digit().letter().oneOf('._%+-')).onceOrMore()
+    .literally('@').capture(lambda q: q.eitherOf(lambda q: q.digit().letter().oneOf('.-'))
+                            .onceOrMore()).literally('.').letter().atLeast(2).mustEnd(),
+    Builder.from_dsl('capture (digit once or more) as "mydigit"'),
+    Builder.from_dsl('capture (letter once or more) all lazy'),
+    Builder.from_dsl('capture (any of (capture (literally "a") as "a", '
+                     'capture (letter once or more) as "word")) once or more'),
+    # A later group ending where an earlier one does closes last, unless it
+    # is inside it.
+    Builder.from_dsl('capture (literally "a") capture (literally "b" optional)'),
+    Builder.from_dsl('capture (literally "a") capture (digit never or more)'),
+    Builder.from_dsl('capture (literally "a" capture (literally "b" optional))'),
+    Builder.from_dsl('capture (literally "ab") never or more'),
+]
+
+def test_pike_agrees_with_re():
+    rng = random.Random(5)
+    for query in CAPTURING_QUERIES:
+        expected = re.compile(query.get(), query.flags)
+        engine = compile_engine(query.to_ir(), query.get(), 'pike')
+        assert (engine.groups, engine.groupindex) == (expected.groups, expected.groupindex)
+        texts = ['April 15, 2003', 'a1AB', 'super-He4vy.add+ress@top-Le.ve1.domains', 'ab1']
+        texts += [''.join(rng.choice('aAb1 ,@.-') for _ in range(rng.randint(0, 20)))
+                  for _ in range(200)]
+        for text in texts:
+            for method in ('search', 'match', 'fullmatch'):
+                matched = getattr(expected, method)(text)
+                result = getattr(engine, method)(text)
+                assert (result and (result.span(), result.groups(), result.groupdict(),
+                                    result.lastindex)) == \
+                    (matched and (matched.span(), matched.groups(), matched.groupdict(),
+                                  matched.lastindex)), (query.get(), method, text)
+                matched = getattr(expected, method)(text, 3, 2)
+                result = getattr(engine, method)(text, 3, 2)
+                assert (result and (result.span(), result.groups(), result.pos)) == \
+                    (matched and (matched.span(), matched.groups(), matched.pos))
+            assert engine.findall(text) == expected.findall(text)
+            assert engine.sub(r'[\1]', text) == expected.sub(r'[\1]', text)
+
+def test_loops_over_empty_matches_agree_with_re():
+    # sre leaves a loop after an iteration that matched nothing.
+    rng = random.Random(7)
+    queries = ['capture (digit optional) once or more',
+               'capture (digit optional) between 2 and 4 times',
+               'capture (letter optional digit optional) exactly 3 times',
+               'capture (any of (literally "a", digit optional)) never or more literally "b"']
+    for query in queries:
+        expected = SRL(query)
+        engine = SRL(query, engine='pike')
+        automaton = SRL(query.replace('capture', 'any of'), engine='dfa')
+        plain = SRL(query.replace('capture', 'any of'))
+        for _ in range(200):
+            text = ''.join(rng.choice('a1bx2') for _ in range(rng.randint(0, 8)))
+            for method in ('search', 'match', 'fullmatch'):
+                matched = getattr(expected, method)(text)
+                result = getattr(engine, method)(text)
+                assert (result and (result.span(), result.groups())) == \
+                    (matched and (matched.span(), matched.groups())), (query, method, text)
+                assert span(getattr(automaton, method)(text)) == \
+                    span(getattr(plain, method)(text)), (query, method, text)
+            assert engine.findall(text) == expected.findall(text), (query, text)
+
+def test_pike_groups():
+    engine = SRL('capture (letter once or more) as "key" literally "=" '
+                 'capture (digit once or more) as "value"', engine='pike')
+    matched = engine.search('x; retries=3 ok')
+    assert matched.groupdict() == {'key': 'retries', 'value': '3'}
+    assert matched.group('value', 1) == ('3', 'retries') and matched['key'] == 'retries'
+    assert matched.expand(r'\g<value>:\1') == '3:retries'
+    assert engine.findall('a=1 b=22') == [('a', '1'), ('b', '22')]
+    assert engine.split('a=1;b=2') == ['', 'a', '1', ';', 'b', '2', '']
+
+def test_backtrack_limit():
+    from srl.errors import PregBacktrackLimitError
+    hostile = 'begin with any of (letter once or more) once or more literally "!"'
+    engine = SRL(hostile, backtrack_limit=10000)
+    assert engine.match('abc!').group() == 'abc!'
+    with pytest.raises(PregBacktrackLimitError):
+        engine.match('a' * 30 + '1!')
+    with pytest.raises(ValueError):
+        SRL(hostile, engine='dfa', backtrack_limit=10)
+    query = Builder().capture(lambda q: q.anyCharacter().onceOrMore()).onceOrMore() \
+        .literally('=').backtrackLimit(5000)
+    assert query.match('ab=').group(1) == 'ab'
+    with pytest.raises(PregBacktrackLimitError):
+        query.match('x' * 40)
+    assert query.backtrackLimit(None).match('ab=').group() == 'ab='
+
+def test_backtrack_engine_runs_lookarounds():
+    queries = [
+        Builder().capture(lambda q: q.digit()).ifNotFollowedBy(
+            lambda q: q.anything().onceOrMore().digit()),
+        Builder().digit().onceOrMore().ifAlreadyHad(lambda q: q.literally('$')),
+        Builder().letter().digit().ifNotAlreadyHad(lambda q: q.literally('x')),
+        Builder().anyOf(lambda q: q.digit().ifFollowedBy(lambda q: q.letter())).twice(),
+    ]
+    texts = ['This example contains 3 numbers. 2 should not match. Only 1 should.',
+             'cost $12 and 34', 'ab1 xx2 ax3', '1a2b 3c4 5']
+    for query in queries:
+        expected = re.compile(query.get(), query.flags)
+        engine = compile_engine(query.to_ir(), query.get(), 'backtrack')
+        for text in texts:
+            assert [(m.span(), m.groups()) for m in engine.finditer(text)] == \
+                [(m.span(), m.groups()) for m in expected.finditer(text)], (query.get(), text)
+
+def test_aho_corasick_agrees_with_re():
+    rng = random.Random(5)
+    for _ in range(200):
+        words = [''.join(rng.choice('abAkKK') for _ in range(rng.randint(1, 4)))
+                 for _ in range(rng.randint(1, 12))]
+        flags = rng.choice([0, re.IGNORECASE])
+        expected = re.compile('|'.join(map(re.escape, words)), flags)
+        automaton = AhoCorasick(words, flags)
+        for _ in range(10):
+            text = ''.join(rng.choice('abAkKK ') for _ in range(rng.randint(0, 20)))
+            pos = rng.randint(0, 5)
+            assert [found[:2] for found in automaton.finditer(text, pos)] == \
+                [match.span() for match in expected.finditer(text, pos)], (words, text)
+            assert automaton.occurring(text) == \
+                set(index for index, word in enumerate(words)
+                    if re.search(re.escape(word), text, flags))
+
+def test_aho_corasick_reports_spans_and_literals():
+    automaton = AhoCorasick(['he', 'she', 'his', 'hers'])
+    assert automaton.find('ushers') == (1, 4, 1)
+    assert list(automaton.finditer('ushers his')) == [(1, 4, 1), (7, 10, 2)]
+    assert automaton.occurring('ushers') == set([0, 1, 3])
+    assert automaton.memory() == automaton.states * automaton.width * 4
+    with pytest.raises(ValueError):
+        AhoCorasick(['a', ''])
+
+def test_shift_and_agrees_with_re():
+    rng = random.Random(6)
+    sources = ['a', '[ab]', '[0-9]', '.', '\\-', '[^a]', 'K']
+    for _ in range(200):
+        classes = [rng.choice(sources) for _ in range(rng.randint(1, 6))]
+        flags = rng.choice([0, re.IGNORECASE, re.DOTALL])
+        expected = re.compile(''.join('(?:%s)' % source for source in classes), flags)
+        matcher = ShiftAnd(classes, flags)
+        for _ in range(10):
+            text = ''.join(rng.choice('abAB1-\nk') for _ in range(rng.randint(0, 600)))
+            pos = rng.randint(0, 5)
+            assert [found[:2] for found in matcher.finditer(text, pos)] == \
+                [match.span() for match in expected.finditer(text, pos)], (classes, text)
+            assert matcher.findall(text, pos, 500) == expected.findall(text, pos, 500)
+            found = matcher.find(text, pos)
+            assert span(expected.search(text, pos)) == (found and found[:2])
+
+def test_shift_and_only_where_sre_is_slower():
+    assert shift_and_worthwhile(['[0-9]', '\\-']) and shift_and_worthwhile(['.', 'a'])
+    assert not shift_and_worthwhile(['\\-', '[0-9]']) and not shift_and_worthwhile(['e', 'r'])
+    with pytest.raises(ValueError):
+        ShiftAnd([])
+
+def test_class_tables_agree_with_re_and_are_shared():
+    nodes = [ir.CharClass((('0', '9'), )), ir.CharClass((('a', 'z'), ('A', 'Z'))),
+             ir.CharClass(chars=u'abσ', negated=True), ir.CharClass(category='word'),
+             ir.CharClass(category='space', negated=True), ir.CharClass(chars='a-c'),
+             ir.AnyChar()]
+    codes = list(range(300)) + [0x3a3, 0x3c3, 0x3c2, 0x212a, 0x17f, 0x4e00, 0x10ffff]
+    for node in nodes:
+        for flags in (0, re.IGNORECASE, re.DOTALL):
+            table = char_table(node, flags)
+            expected = re.compile(node.render(), flags)
+            assert [bool(table(chr_(code))) for code in codes] == \
+                [bool(expected.match(chr_(code))) for code in codes], (node, flags)
+    assert char_table(ir.CharClass((('0', '9'), ))) is char_table(ir.CharClass((('0', '9'), )))
+    assert char_table(ir.CharClass((('0', '9'), )), re.DOTALL) is \
+        char_table(ir.CharClass((('0', '9'), )))
+    report = memory_report()
+    assert report.tables <= report.uses
+    assert report.bytes < report.unshared_bytes
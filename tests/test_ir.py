@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+import pickle
+import re
+
+from srl import ir
+from srl.builder import Builder
+from srl.parsers.parse import parse
+
+def test_nodes_compare_and_hash_by_value():
+    digits = ir.Quantifier(ir.CharClass((('0', '9'), )), 1, None)
+    assert digits == ir.Quantifier(ir.CharClass((('0', '9'), )), 1, None)
+    assert digits != digits.replace(lazy=True)
+    assert ir.Literal('a') != ir.Raw('a')
+    assert len(set([digits, ir.Quantifier(ir.CharClass((('0', '9'), )), 1, None)])) == 1
+    assert pickle.loads(pickle.dumps(digits)) == digits
+
+def test_nodes_are_immutable():
+    node = ir.Literal('a')
+    try:
+        node.text = 'b'
+    except AttributeError:
+        pass
+    else:
+        assert False, 'node was mutated'
+
+def test_parser_and_builder_produce_the_same_ir():
+    query = ('begin with capture (letter once or more) as "word" '
+             'any of (digit, literally ".") optional must end case insensitive')
+    builder = Builder().beginWith() \
+        .capture(lambda q: q.letter().onceOrMore(), 'word') \
+        .anyOf(lambda q: q.digit().literally('.')).optional() \
+        .mustEnd().caseInsensitive()
+    assert parse(query) == builder.to_ir()
+    assert hash(parse(query)) == hash(builder.to_ir())
+
+def test_render():
+    pattern = parse('literally "a.b" letter from a to c exactly 2 times '
+                    'one of "xy" whitespace optional')
+    assert pattern.render() == r'(?:a\.b)[a-c]{2}[xy]\s?'
+    assert Builder().literally('(').get() == r'(?:\()'
+
+def test_lazy():
+    assert ir.lazy(ir.Quantifier(ir.AnyChar(), 0, None)).render() == '.*?'
+    group = ir.Group((ir.Quantifier(ir.AnyChar(), 1, None), ))
+    assert ir.lazy(group).render() == '(.+?)'
+    assert ir.lazy(ir.Literal('a')) is None
+    assert parse('anything once or more until "x"').render() == '.+?(?:x)'
+    assert parse('letter once or more all lazy').render() == '[a-z]+?'
+    assert parse('letter all lazy').render() == '[a-z]?'
+
+def test_wrap():
+    body = [ir.Literal('a'), ir.Literal('b')]
+    assert ir.wrap('%s', body) == body
+    assert ir.wrap('(?=%s)', body) == [ir.Lookaround(tuple(body))]
+    assert ir.wrap('(?P<x>%s)', body) == [ir.Group(tuple(body), True, 'x')]
+    assert ir.wrap('(?:%s)', body, alternate=True) == [ir.Alternation(tuple(body))]
+    assert ir.wrap('(?#%s)', body) == [ir.Raw('(?#(?:a)(?:b))')]
+    assert re.search(Builder().until(lambda q: q.literally('x')).get(), 'abx')
+
+def test_emit_nested_queries():
+    from srl.emitter import emit
+    pattern = parse('any of (literally "a", capture (digit once or more) as "n") tab')
+    assert emit(pattern) == r'(?:(?:a)|(?P<n>[0-9]+))\t'
+    assert Builder.parse('capture (letter) must end').pattern == '([a-z])$'
+    # The emitter keeps its own stack, so nesting is not bounded by recursion.
+    node = ir.Literal('x')
+    for _ in range(5000):
+        node = ir.Group((node, ), False)
+    assert emit(node) == '(?:' * 5001 + 'x' + ')' * 5001
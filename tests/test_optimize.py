@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+import random
+import re
+
+from srl import SRL
+from srl.builder import Builder
+from srl.emitter import emit
+from srl.optimize import optimize
+from srl.parsers.parse import parse
+
+def optimized(query):
+    return emit(optimize(parse(query)), compact=True)
+
+def test_peephole_rewrites():
+    assert optimized('literally "a" literally "b." digit digit digit') == r'ab\.[0-9]{3}'
+    assert optimized('any of (digit, letter, one of "._%+-", literally "x") once or more') \
+        == '[0-9a-zx._%+-]+'
+    assert optimized('any of (letter from a to f, letter from d to k, digit from 0 to 4, '
+                     'digit from 5 to 9)') == '[0-9a-k]'
+    assert optimized('capture (literally "ab") literally "c" optional literally "12"') \
+        == '(ab)c?(?:12)'
+    assert optimized('any of (any of (literally "ab", literally "c"), whitespace)') \
+        == r'(?:ab|c|\s)'
+    assert optimized('literally "ab" exactly 2 times capture (digit) capture (digit)') \
+        == '(?:ab){2}([0-9])([0-9])'
+
+def test_keeps_quantifier_bindings():
+    # (?:a+)? must not turn into the lazy a+?.
+    query = Builder().anyOf(lambda q: q.digit().onceOrMore()).optional()
+    assert re.compile(query.get_optimized()).match('12').group() == '12'
+    assert Builder().raw('a|b').get_optimized() == 'a|b'
+    # Queries holding a Raw fragment are emitted in full.
+    assert Builder().anyOf(lambda q: q.raw('a|b')).literally('c').get_optimized() \
+        == '(?:a|b)(?:c)'
+
+def test_srl_option():
+    assert SRL('literally "a" literally "b"', optimize=True).pattern == 'ab'
+    assert SRL('literally "a" literally "b"').pattern == '(?:a)(?:b)'
+
+CLAUSES = [
+    lambda q: q.literally('a'),
+    lambda q: q.literally('b.'),
+    lambda q: q.literally('1'),
+    lambda q: q.digit(),
+    lambda q: q.letter('a', 'c'),
+    lambda q: q.letter('b', 'd'),
+    lambda q: q.oneOf('a-'),
+    lambda q: q.oneOf(']a'),
+    # Raw fragments that apply to their neighbours.
+    lambda q: q.raw('+'),
+    lambda q: q.raw('{2}'),
+    lambda q: q.raw('|x'),
+    lambda q: q.raw('\\').literally('d'),
+    lambda q: q.whitespace(),
+    lambda q: q.noCharacter(),
+    lambda q: q.anything(),
+    lambda q: q.optional(),
+    lambda q: q.onceOrMore(),
+    lambda q: q.exactly(2),
+    lambda q: q.between(1, 2),
+    lambda q: q.mustEnd(),
+]
+
+def random_query(rng, depth=0):
+    query = Builder()
+    for _ in range(rng.randint(1, 5)):
+        choice = rng.randint(0, len(CLAUSES) + 2)
+        if choice < len(CLAUSES):
+            query = CLAUSES[choice](query)
+        elif depth < 2:
+            sub = random_query(rng, depth + 1).nodes
+            method = [query.capture, query.anyOf, query.ifFollowedBy][choice - len(CLAUSES)]
+            query = method(sub)
+    return query
+
+def test_equivalent_matches():
+    rng = random.Random(13)
+    alphabet = 'ab.1 c-d2]x\n'
+    # A class starting with ] cannot be merged behind other members, and
+    # Raw fragments may apply to the literal before them.
+    queries = [Builder().anyOf(lambda q: q.literally('x').oneOf(']a')),
+               Builder().literally('ab').raw('+'), Builder().literally('ab').raw('{2}'),
+               Builder().literally('a').literally('b').raw('+')]
+    for _ in range(300):
+        query = queries.pop() if queries else random_query(rng)
+        try:
+            before = re.compile(query.get())
+        except re.error:
+            continue
+        after = re.compile(query.get_optimized())
+        assert before.groups == after.groups
+        texts = ['abab', 'abb x]']
+        texts += [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+                  for _ in range(20)]
+        for text in texts:
+            expected = [(m.span(), m.groups()) for m in before.finditer(text)]
+            assert [(m.span(), m.groups()) for m in after.finditer(text)] == expected, \
+                (query.get(), query.get_optimized(), text)
+    # Compacted, the escape would absorb the literal into \d.
+    assert Builder().raw('\\').literally('d').get_optimized() == '\\(?:d)'
+
+def alternation(words):
+    from srl import ir
+    return Builder().anyOf([ir.Literal(word) for word in words])
+
+def test_factors_literal_alternations():
+    assert alternation(['get', 'getall', 'post']).get_optimized() == '(?:get(?:all)??|post)'
+    assert alternation(['cat', 'car', 'cab']).get_optimized() == 'ca[trb]'
+    # "a" ends before "ac" was seen, so "ac" may not join the "ab" branch.
+    assert alternation(['ab', 'a', 'ac', 'abd']).get_optimized() == 'a(?:b||c|bd)'
+    assert alternation(['ab', 'AB']).caseInsensitive().get_optimized() == '(?:ab|AB)'
+
+def test_factored_alternations_keep_match_order():
+    rng = random.Random(7)
+    for _ in range(500):
+        words = [''.join(rng.choice('abc') for _ in range(rng.randint(0, 4)))
+                 for _ in range(rng.randint(2, 8))]
+        query = Builder().capture(alternation(words).nodes).literally(rng.choice(['', 'b']))
+        before = re.compile(query.get())
+        after = re.compile(query.get_optimized())
+        for _ in range(10):
+            text = ''.join(rng.choice('abc') for _ in range(rng.randint(0, 8)))
+            assert [(m.span(), m.groups()) for m in after.finditer(text)] == \
+                [(m.span(), m.groups()) for m in before.finditer(text)], (words, text)
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+from srl.parsers.parse import parse, get_parser
+
+def test_parser_is_shared():
+    assert get_parser() is get_parser()
+    assert parse('digit') == parse('digit')
+
+def test_shipped_tables_are_current():
+    from srl.parsers import lextab, parsetab
+    from srl.parsers import parse as module
+    from srl.parsers.tables import grammar_signature
+    from srl.utils import lex
+    assert parsetab._lr_signature == grammar_signature()
+    lexer = lex.lex(module=module, errorlog=lex.NullLogger())
+    shipped = [pattern for pattern, _ in lextab._lexstatere['INITIAL']]
+    assert shipped == lexer.lexstateretext['INITIAL']
+
+def test_grammar_signature_ignores_docstring_indentation():
+    # Python 3.13 dedents docstrings when compiling.
+    import textwrap
+    import types
+    from srl.parsers import parse as module
+    from srl.parsers.tables import grammar_signature
+    dedented = types.ModuleType(module.__name__)
+    dedented.__dict__.update(vars(module))
+    for name, func in vars(module).items():
+        if name.startswith('p_') and isinstance(func, types.FunctionType) and func.__doc__:
+            copy = types.FunctionType(func.__code__, func.__globals__, name)
+            first, _, rest = func.__doc__.partition('\n')
+            copy.__doc__ = first.strip() + '\n' + textwrap.dedent(rest)
+            setattr(dedented, name, copy)
+    assert grammar_signature(dedented) == grammar_signature(module)
+
+def test_parse_from_many_threads():
+    import sys
+    import threading
+    queries = ['digit exactly %d times' % n for n in range(1, 50)] + \
+              ['literally "%s" once or more' % ('x' * n) for n in range(1, 50)]
+    expected = [parse(query) for query in queries]
+    failures = []
+
+    def work():
+        for _ in range(5):
+            for query, result in zip(queries, expected):
+                if parse(query) != result:
+                    failures.append(query)
+
+    # Switch threads as often as possible to provoke interleaved parses.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert not failures
+
+def test_statement_sequences():
+    from srl import SRL
+    from srl import ir
+    assert parse('literally "a" digit once or more must end') == ir.Pattern((
+        ir.Literal('a'), ir.Quantifier(ir.CharClass((('0', '9'), )), 1, None),
+        ir.Anchor(ir.Anchor.END)))
+    assert SRL('begin with literally "id" digit exactly 3 times must end').match('id123')
+    assert SRL('capture (letter digit) as "pair"').match('a1').group('pair') == 'a1'
+    assert len(parse(' '.join(['letter digit optional'] * 1000)).nodes) == 2000
+
+def _legacy_lexer():
+    # One string rule per keyword, as the lexer was originally written.
+    import types
+    from srl.parsers import parse as module
+    from srl.utils import lex
+    legacy = types.ModuleType('legacy_lexer')
+    legacy.__file__ = module.__file__
+    legacy.tokens = tuple(t for t in module.tokens if t != 'WORD')
+    for name in ('t_LEFT_PARENTHESIS', 't_RIGHT_PARENTHESIS', 't_COMMA', 't_NUMBER',
+                 't_STRING', 't_newline', 't_ignore', 't_CHARACTER', 't_error'):
+        setattr(legacy, name, getattr(module, name))
+    for word, token in module.reserved.items():
+        setattr(legacy, 't_' + token, word)
+    return lex.lex(module=legacy, errorlog=lex.NullLogger())
+
+def test_keyword_table_matches_per_keyword_rules():
+    from srl.parsers.parse import get_thread_parser
+    legacy = _legacy_lexer()
+    lexer, _ = get_thread_parser()
+    inputs = [
+        'letter from a to c once or more',
+        'any character anything anyone no whitespace new line',
+        'capture (digit exactly 3 times) as "id", must end',
+        'xyz literallyliterally ALL lazy atleast "a\\"b" 12',
+        'insensitivex uppercaseletter zzzzzzzzzzzzzzzzzzzzzzzzdigit qinsensitive',
+    ]
+    for text in inputs:
+        legacy.input(text)
+        lexer.input(text)
+        expected = [(t.type, t.value, t.lexpos) for t in iter(legacy.token, None)]
+        actual = [(t.type, t.value, t.lexpos) for t in iter(lexer.token, None)]
+        assert actual == expected
+
+def test_long_unknown_word_lexes_in_linear_time():
+    import time
+    from srl.parsers.parse import get_thread_parser
+    lexer, _ = get_thread_parser()
+    start = time.time()
+    lexer.input('q' * 200000 + 'digit')
+    tokens = list(iter(lexer.token, None))
+    assert len(tokens) == 200001
+    assert tokens[-1].type == 'K_DIGIT'
+    assert time.time() - start < 5
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+
+import copy
+import random
+import re
+
+import pytest
+
+from srl import SRL
+from srl.analysis import analyze, width
+from srl.builder import Builder
+from srl.parsers.parse import parse
+from srl.pattern import CompiledPattern
+
+def info(query, flags=0):
+    result = analyze(parse(query), flags)
+    return {'literal': result['literal'], 'offset': result['offset']}
+
+def test_required_literal():
+    assert info('letter once or more literally "@" letter once or more') == \
+        {'literal': '@', 'offset': None}
+    assert info('digit exactly 3 times literally "-ERROR-" digit') == \
+        {'literal': '-ERROR-', 'offset': 3}
+    assert info('capture (literally "ab" digit literally "cdef") optional literally "x"') == \
+        {'literal': 'x', 'offset': 7}
+    assert info('capture (literally "ab" digit literally "cdef") literally "x"')['literal'] == 'cdef'
+    assert info('any of (literally "ab", literally "cd")') == {'literal': None, 'offset': None}
+    assert info('literally "ERROR" case insensitive')['literal'] is None
+    assert info('literally "12" case insensitive')['literal'] == '12'
+    assert info('literally "abcdef" raw "|x"') == {'literal': None, 'offset': None}
+
+def test_width():
+    assert width(parse('digit exactly 3 times literally "ab" optional')) == (3, 5)
+    assert width(parse('any of (literally "abc", digit) once or more')) == (1, None)
+    assert width(parse('raw "a+"')) == (0, None)
+    # Renders as the possessive [a-z]++.
+    assert width(parse('letter once or more once or more')) == (1, None)
+
+def test_prefilter_rejects_and_narrows():
+    pattern = Builder().digit().atLeast(2).literally('-ERROR-').digit().compile().compiled
+    text = 'x' * 1000 + '12-ERROR-3'
+    assert pattern.search('x' * 1000) is None
+    assert pattern.search(text).group() == '12-ERROR-3'
+    assert pattern.findall(text + text) == ['12-ERROR-3'] * 2
+    assert pattern.sub('!', 'nothing here') == 'nothing here'
+    stats = pattern.stats()
+    assert (stats.calls, stats.rejected) == (4, 2)
+    pattern = SRL('letter from a to c exactly 2 times literally "::"').compiled
+    assert pattern.offset == 2
+    assert pattern.search('zz' * 100 + 'ab::').span() == (200, 204)
+    pattern = SRL('letter from a to c exactly 2 times literally "::" digit optional').compiled
+    assert pattern.findall('zz' * 100 + 'ab::1') == ['ab::1']
+    assert pattern.stats().narrowed == 1
+    assert copy.deepcopy(pattern).search('ab::')
+
+def test_prefilter_keeps_results():
+    rng = random.Random(3)
+    queries = ['digit between 1 and 3 literally "ab" letter optional',
+               'literally "b" capture (digit once or more) literally "a"',
+               'any of (literally "x", digit) literally "ab" must end',
+               'letter once or more literally "a" new line literally "b"',
+               # The raw alternative makes the literal optional.
+               'literally "ab1" raw "|x"']
+    for query in queries:
+        compiled = SRL(query, re.MULTILINE).compiled
+        plain = re.compile(compiled.pattern, compiled.flags)
+        for _ in range(300):
+            text = ''.join(rng.choice('ab1x\n') for _ in range(rng.randint(0, 15)))
+            pos = rng.randint(0, 3)
+            assert compiled.findall(text, pos) == plain.findall(text, pos)
+            assert repr(compiled.search(text, pos)) == repr(plain.search(text, pos))
+            assert repr(compiled.match(text, pos)) == repr(plain.match(text, pos))
+            assert compiled.split(text) == plain.split(text)
+            assert [(m.span(), m.pos) for m in compiled.finditer(text, pos)] == \
+                [(m.span(), m.pos) for m in plain.finditer(text, pos)]
+    assert SRL('literally "abcdef" raw "|x"').search('x').group() == 'x'
+    assert Builder().literally('abcdef').raw('|x').match('x').group() == 'x'
+    found = SRL('digit exactly 3 times literally "-" digit').search('abcdefgh 123-4')
+    assert (found.span(), found.pos) == ((9, 14), 0)
+
+def test_prefilter_switches_off_when_useless():
+    pattern = Builder.parse('literally "a" digit')
+    for _ in range(pattern.REVIEW_CALLS):
+        assert pattern.search('a1')
+    assert not pattern.stats().active
+    assert pattern.search == pattern.compiled.search
+    assert not Builder.parse('digit never or more').stats().active
+
+def test_re_without_fullmatch():
+    # Python 2's re patterns have no fullmatch.
+    class Python2Pattern(object):
+        def __init__(self, compiled):
+            self._compiled = compiled
+            for name in ('pattern', 'flags', 'groups', 'search', 'match', 'finditer',
+                         'findall', 'split', 'sub', 'subn'):
+                setattr(self, name, getattr(compiled, name))
+    for regex in ('[0-9]+', '(?:ab)[0-9]'):
+        pattern = CompiledPattern(Python2Pattern(re.compile(regex)),
+                                  {'literal': 'ab' if 'ab' in regex else None})
+        for _ in range(pattern.REVIEW_CALLS + 1):
+            assert pattern.search('x ab1').group() in ('1', 'ab1')
+        assert pattern.match('ab1', 3) is None
+        with pytest.raises(AttributeError):
+            pattern.fullmatch('ab1')
+
+def test_length_bounds():
+    pattern = SRL('digit exactly 3 times must end').compiled
+    assert (pattern.min_length, pattern.max_length, pattern.overlap) == (3, 3, 2)
+    assert SRL('letter between 2 and 4 literally "-" optional').max_length == 5
+    assert SRL('letter once or more').max_length is None
+    assert SRL('letter once or more').overlap is None
+    # A raw "|x" makes the rest optional.
+    pattern = SRL('literally "abcdef" raw "|x"').compiled
+    assert (pattern.min_length, pattern.max_length) == (0, None)
+    pattern = Builder.parse('literally "#" digit between 2 and 4')
+    assert pattern.match('#1') is None
+    assert pattern.match('#12345').group() == '#1234'
+    assert pattern.fullmatch('#12345') is None
+    assert pattern.fullmatch('##1234', 1).group() == '#1234'
+    assert pattern.search('#ab#1', 3) is None
+    assert pattern.findall('#1 #2 #34') == ['#34']
+    # Three rejected by length before looking for the literal.
+    assert pattern.stats().rejected == 3
+
+def test_literal_lists_use_an_automaton():
+    assert info('literally "ab"')['literal'] == 'ab'
+    assert analyze(parse('any of (literally "ab", literally "cd")'))['literals'] == ['ab', 'cd']
+    assert analyze(parse('any of (literally "ab", digit)'))['literals'] is None
+    rng = random.Random(5)
+    words = sorted(set(''.join(rng.choice('abcK') for _ in range(rng.randint(1, 5)))
+                       for _ in range(40)))
+    query = 'any of (%s) case insensitive' % ', '.join('literally "%s"' % word for word in words)
+    compiled = SRL(query).compiled
+    assert compiled.automaton is not None
+    assert SRL('any of (literally "ab", literally "cd")').compiled.automaton is None
+    plain = re.compile(compiled.pattern, compiled.flags)
+    for _ in range(100):
+        text = ''.join(rng.choice('abcKkK ') for _ in range(rng.randint(0, 30)))
+        assert compiled.findall(text, 2) == plain.findall(text, 2)
+        assert repr(compiled.search(text, 1, 20)) == repr(plain.search(text, 1, 20))
+        assert [m.span() for m in compiled.finditer(text)] == [m.span() for m in plain.finditer(text)]
+        assert compiled.split(text, 3) == plain.split(text, 3)
+        assert compiled.subn(r'<\g<0>>', text) == plain.subn(r'<\g<0>>', text)
+        assert compiled.sub(lambda m: m.group().upper(), text, 2) == \
+            plain.sub(lambda m: m.group().upper(), text, 2)
+    assert copy.deepcopy(compiled).search(words[0]).group() == words[0]
+    text = ' '.join(words)
+    assert compiled.split(text, -1) == plain.split(text, -1) == [text]
+    assert compiled.subn('-', text, -1) == plain.subn('-', text, -1) == (text, 0)
+    found = compiled.search(text, 1)
+    assert (found.pos, found.endpos) == (found.start(), len(text))
+
+def test_single_literal_uses_str_methods():
+    pattern = SRL('literally "a.b"').compiled
+    assert pattern.search == pattern._literal_search
+    plain = re.compile(pattern.pattern)
+    text = 'xa.b a.ba.b ab a.b'
+    assert repr(pattern.search(text, 2)) == repr(plain.search(text, 2))
+    assert pattern.search(text, 2, 7) is None
+    found = pattern.search('zza.b', 1)
+    assert (found.pos, found.endpos) == (1, 5)
+    assert pattern.findall(text, 1, 12) == plain.findall(text, 1, 12) == ['a.b'] * 3
+    assert pattern.findall(text, 1, -2) == plain.findall(text, 1, -2) == []
+    assert pattern.split(text, 2) == plain.split(text, 2)
+    assert pattern.sub('-', text) == 'x- -- ab -'
+    assert pattern.subn('-', text, 2) == ('x- -a.b ab a.b', 2)
+    assert pattern.sub(r'<\g<0>>', 'a.b') == '<a.b>'
+    assert pattern.subn('-', 'abc') == ('abc', 0)
+    assert [m.span() for m in pattern.finditer(text)] == [(1, 4), (5, 8), (8, 11), (15, 18)]
+    assert SRL('literally "ab" case insensitive').compiled.search != \
+        SRL('literally "ab" case insensitive').compiled._literal_search
+
+def test_fixed_length_classes_use_shift_and():
+    assert analyze(parse('digit exactly 2 times literally "-" letter'))['classes'] == \
+        ['[0-9]', '[0-9]', re.escape('-'), '[a-z]']
+    assert analyze(parse('digit once or more'))['classes'] is None
+    assert analyze(parse('begin with digit'))['classes'] is None
+    pattern = Builder.parse('digit exactly 3 times literally "-" digit exactly 4 times')
+    assert pattern.findall == pattern._automaton_findall
+    assert SRL('literally "-" digit').compiled.automaton is None
+    plain = re.compile(pattern.pattern)
+    rng = random.Random(8)
+    text = ''.join(rng.choice(['555-1234', '12-3456', ' ', 'x', '9']) for _ in range(600))
+    assert len(text) >= pattern.SHIFT_AND_MIN_TEXT
+    assert pattern.findall(text, 3) == plain.findall(text, 3)
+    assert [m.span() for m in pattern.finditer(text)] == [m.span() for m in plain.finditer(text)]
+    assert pattern.sub('#', text) == plain.sub('#', text)
+    assert pattern.split(text, 5) == plain.split(text, 5)
+    assert pattern.split(text, -1) == [text]
+    assert pattern.subn('#', text, -2) == (text, 0)
+    assert pattern.findall('555-1234') == ['555-1234']
+    # The prefilter still runs for search, and switching it off keeps the scan.
+    pattern.bypass()
+    assert pattern.findall == pattern._automaton_findall
+    assert pattern.search('x555-1234').span() == (1, 9)
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+import random
+
+from srl import SRL, PatternSet
+from srl.builder import Builder
+
+QUERIES = [
+    'begin with literally "auth:" whitespace letter once or more',
+    'capture (letter once or more) as "key" literally "=" capture (digit once or more) as "value"',
+    'literally "error" case insensitive',
+    'begin with literally "#" digit exactly 3 times must end multi line',
+    'capture (digit once or more) as "value" literally "ms"',
+    'any of (literally "get", literally "post") whitespace',
+]
+
+def test_agrees_with_a_loop():
+    rng = random.Random(11)
+    patterns = PatternSet(QUERIES)
+    compiled = [SRL(query) for query in QUERIES]
+    words = ['auth:', ' ', 'bob', 'x=12', 'ERROR', 'error', '\n#123', '\n', '45ms', 'get ',
+             'post', '=', '9']
+    for _ in range(300):
+        text = ''.join(rng.choice(words) for _ in range(rng.randint(0, 8)))
+        expected = [index for index, query in enumerate(compiled) if query.search(text)]
+        assert patterns.matches(text) == expected, text
+        assert patterns.first(text) == (expected[0] if expected else None), text
+        leftmost = None
+        for pos in range(len(text) + 1):
+            for index, query in enumerate(compiled):
+                match = query.match(text, pos)
+                if match:
+                    leftmost = index, match.span()
+                    break
+            if leftmost:
+                break
+        found = patterns.search(text)
+        assert (found and (found[0], found[1].span())) == leftmost, text
+
+def test_ids_and_matches():
+    patterns = PatternSet({
+        'status': 'literally "status=" digit exactly 3 times',
+        'user': Builder().literally('user=').letter().onceOrMore(),
+        'slow': 'digit once or more literally "ms"',
+    })
+    line = 'user=ann status=500 took 1200ms'
+    assert len(patterns) == 3
+    assert patterns.matches(line) == ['status', 'user', 'slow']
+    assert patterns.first(line) == 'status'
+    assert [(key, match.group()) for key, match in patterns.finditer(line)] == \
+        [('user', 'user=ann'), ('status', 'status=500'), ('slow', '1200ms')]
+    assert patterns.search('nothing here') is None
+    assert patterns.matches('') == [] and patterns.first('') is None
+    assert PatternSet([]).matches('abc') == []
+
+def test_queries_an_automaton_cannot_run():
+    followed = Builder().digit().onceOrMore().ifFollowedBy(lambda q: q.literally('%'))
+    patterns = PatternSet([followed, 'literally "%"', Builder().raw('b+')])
+    assert patterns.matches('50%') == [0, 1]
+    assert patterns.matches('50 bb') == [2]
+    assert patterns.first('bb 50%') == 0
+    assert patterns.search('bb 50%')[0] == 2
+
+def test_literal_queries():
+    words = ['%s%d' % (name, number) for name in ('get', 'put', 'del') for number in range(20)]
+    patterns = PatternSet(['literally "%s" case insensitive' % word for word in words])
+    assert patterns._literals is not None
+    text = 'PUT1 get13 del19 get1'
+    assert [(words[key], match.group()) for key, match in patterns.finditer(text)] == \
+        [('put1', 'PUT1'), ('get1', 'get1'), ('del1', 'del1'), ('get1', 'get1')]
+    assert patterns.search(text, 5)[1].span() == (5, 9)
+    assert patterns.matches(text) == sorted(words.index(word) for word in
+                                            ('put1', 'get1', 'get13', 'del1', 'del19'))
+    mixed = PatternSet(['any of (literally "ab", literally "cd")', 'digit once or more'])
+    assert mixed._literals is None
+    assert mixed.matches('xcd') == [0] and mixed.first('1 ab') == 0
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+import random
+import re
+
+import pytest
+
+from srl.builder import Builder, FrozenBuilder
+from srl.emitter import emit
+from srl.redos import ATOMIC_GROUPS, atomic, complexity
+
+def nested(last='!'):
+    return Builder().capture(lambda q: q.anyCharacter().onceOrMore()).onceOrMore().literally(last)
+
+QUERIES = [
+    ('capture (letter once or more) literally "=" capture (digit once or more)', 'linear'),
+    ('any character once or more, whitespace, any character once or more', 'linear'),
+    ('digit once or more literally "." digit once or more', 'linear'),
+    ('any of (literally "ab", literally "ac") never or more', 'linear'),
+    ('begin with capture (anything once or more) whitespace capture (anything once or more) '
+     'must end', 'polynomial'),
+    ('letter once or more, any character once or more', 'polynomial'),
+    ('any of (digit, letter, one of "._%+-") once or more literally "@" '
+     'any of (digit, letter, one of ".-") once or more literally "." letter at least 2 times',
+     'polynomial'),
+    ('capture (any character once or more) once or more, literally "!"', 'exponential'),
+    ('any of (literally "a", literally "aa") never or more literally "b"', 'exponential'),
+    ('any of (whitespace never or more, letter never or more) never or more', 'exponential'),
+    # The lookahead retakes what the first repeat gives back (no DSL syntax).
+    (Builder().anyCharacter().onceOrMore()
+     .ifFollowedBy(lambda q: q.anyCharacter().onceOrMore().literally('!')), 'polynomial'),
+    (Builder().digit().onceOrMore()
+     .ifFollowedBy(lambda q: q.letter().onceOrMore().literally('!')), 'linear'),
+]
+
+def to_ir(query):
+    return query.to_ir() if isinstance(query, Builder) else Builder.parse_ir(query)
+
+def test_complexity():
+    for query, expected in QUERIES:
+        assert complexity(to_ir(query)) == expected, query
+    assert nested().complexity() == 'exponential'
+    assert Builder().letter().onceOrMore().literally('@').complexity() == 'linear'
+    # Raw fragments are not analyzed.
+    assert Builder().raw('(a+)+').complexity() == 'exponential'
+    assert Builder().raw('a').literally('b').complexity() == 'exponential'
+    assert emit(atomic(Builder().raw('a').onceOrMore().literally('!').to_ir())) == 'a+(?:!)'
+
+def test_atomic_only_where_nothing_can_follow():
+    assert emit(atomic(nested().to_ir())) == r'(?>(\w+)+)(?:!)'
+    assert emit(atomic(nested('x').to_ir())) == r'(\w+)+(?:x)'
+    # $ only holds before a new line, ^ anywhere after one.
+    assert emit(atomic(Builder().anything().onceOrMore().mustEnd().to_ir())) == '(?>.+)$'
+    assert emit(atomic(Builder().letter().neverOrMore().startWith().to_ir())) == '[a-z]*^'
+    assert emit(atomic(Builder().anything().onceOrMore().mustEnd().to_ir(), re.DOTALL)) \
+        == '.+$'
+
+@pytest.mark.skipif(not ATOMIC_GROUPS, reason='atomic groups need Python 3.11')
+def test_atomic_keeps_matches():
+    rng = random.Random(5)
+    for query, _ in QUERIES:
+        pattern = to_ir(query)
+        expected = re.compile(emit(pattern), pattern.flags)
+        rewritten = re.compile(emit(atomic(pattern)), pattern.flags)
+        for _ in range(200):
+            text = ''.join(rng.choice('ab1 .@-_\n!') for _ in range(rng.randint(0, 16)))
+            assert [(m.span(), m.groups()) for m in rewritten.finditer(text)] == \
+                [(m.span(), m.groups()) for m in expected.finditer(text)], (query, text)
+
+def test_compile_redos():
+    hostile = 'a' * 100000 + '?'
+    route = nested().compile(redos='route')
+    assert type(route.compiled).__name__ == 'PikePattern'
+    assert route.match(hostile) is None
+    assert route.match('ab_1!').groups() == ('ab_1', )
+    # Linear queries stay with re.
+    assert Builder().letter().onceOrMore().compile(redos='route').compiled.pattern == '[a-z]+'
+    assert FrozenBuilder().letter().compile(redos='route').literally('!').redos == 'route'
+    frozen = FrozenBuilder().capture(lambda q: q.anyCharacter().onceOrMore()).onceOrMore() \
+        .literally('!')
+    routed = frozen.compile(redos='route')
+    assert type(routed.compiled).__name__ == 'PikePattern'
+    # The receiver is never modified.
+    assert frozen.redos is None and frozen.compiled is None
+    assert type(frozen.compile().compiled).__name__ == 'CompiledPattern'
+    assert routed.compile(redos='route') is routed
+    with pytest.raises(ValueError):
+        Builder().compile(redos='atomic')
+
+@pytest.mark.skipif(not ATOMIC_GROUPS, reason='atomic groups need Python 3.11')
+def test_compile_redos_rewrite():
+    rewrite = nested().compile(redos='rewrite')
+    assert rewrite.compiled.pattern == r'(?>(\w+)+)(?:!)'
+    assert rewrite.match('a' * 100000 + '?') is None
+    # Atomic groups would change this one: it goes to the pike engine.
+    assert type(nested('x').compile(redos='rewrite').compiled).__name__ == 'PikePattern'